@@ -16,10 +16,11 @@ from collections import namedtuple
 
 from datetime import datetime
 
-from .support.environment import is_path_source_root
+from .support.environment import get_build_tag, is_path_source_root
 
 from .support.mode_names import \
-    get_composing_mode_name, get_configuring_mode_name, get_preset_mode_name
+    get_benchmarking_mode_name, get_composing_mode_name, \
+    get_configuring_mode_name, get_preset_mode_name
 
 from .support.platform_names import \
     get_darwin_system_name, get_linux_system_name, get_windows_system_name
@@ -135,6 +136,8 @@ def _resolve_running_function(mode, argument_parser):
         return modes.run_in_configuring_mode
     elif mode == get_composing_mode_name():
         return modes.run_in_composing_mode
+    elif mode == get_benchmarking_mode_name():
+        return modes.run_in_benchmarking_mode
     else:
         def _(_1, _2):
             argument_parser.error("{} wasn't in valid mode".format(
@@ -208,7 +211,8 @@ def _main():
         sys.exit(1)
 
     if arguments.composer_mode == get_configuring_mode_name() or \
-            arguments.composer_mode == get_composing_mode_name():
+            arguments.composer_mode == get_composing_mode_name() or \
+            arguments.composer_mode == get_benchmarking_mode_name():
         # If no project version is got from command line, it
         # should be read from the source root.
         default_version = str(get_project_version(
@@ -308,8 +312,13 @@ def _main():
                 "future version of Couplet Composer"
             )
 
-        # Only configuring and composing modes have the option
-        # for host target.
+        arguments.build_tag = get_build_tag(
+            build_tag=arguments.build_tag,
+            tune=arguments.tune
+        )
+
+        # Only configuring, composing, and benchmarking modes
+        # have the option for host target.
         host_target = parse_target_from_argument_string(arguments.host_target)
 
         if host_target.system == get_linux_system_name():
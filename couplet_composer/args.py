@@ -5,6 +5,12 @@
 
 import argparse
 import multiprocessing
+import re
+import shlex
+
+from .support.artefact_formats import \
+    get_artefact_format_names, get_tar_gz_artefact_format_name, \
+    get_zip_artefact_format_name
 
 from .support.build_variant import \
     get_build_variant_names, get_debug_variant_name, \
@@ -27,11 +33,61 @@ from .support.project_values import \
     get_anthem_binaries_base_name, get_anthem_name, \
     get_ode_binaries_base_name, get_ode_name
 
+from .util.lto import get_lto_names
+
 from .util.target import current_platform, resolve_host_target
 
 from .__version__ import __version__
 
 
+def _shard(value):
+    """
+    Parses a shard given as 'index/count' into a tuple of the
+    one-based index and the number of the shards.
+    """
+    try:
+        index, count = [int(part) for part in value.split("/")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "'{}' isn't a shard of the form 'index/count'".format(value)
+        )
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            "the shard index of '{}' must be between 1 and the number of the "
+            "shards".format(value)
+        )
+    return index, count
+
+
+def _shootout_configuration(value):
+    """
+    Parses a configuration of the benchmark shootout given as
+    'name=options' into a tuple of the name and the list of the
+    composing mode options of the configuration.
+    """
+    name, separator, options = value.partition("=")
+    if not separator or not re.match(r"^[A-Za-z0-9._-]+$", name):
+        raise argparse.ArgumentTypeError(
+            "'{}' isn't a configuration of the form 'name=options' with a "
+            "name that contains only letters, digits, dots, dashes, and "
+            "underscores".format(value)
+        )
+    return name, shlex.split(options)
+
+
+def _tune_value(value):
+    """
+    Checks that the CPU given for tuning the build can be used in
+    the names of the build directories.
+    """
+    if not re.match(r"^[A-Za-z0-9._+-]+$", value):
+        raise argparse.ArgumentTypeError(
+            "'{}' isn't a CPU name that contains only letters, digits, dots, "
+            "dashes, underscores, and plus signs".format(value)
+        )
+    return value
+
+
 def _add_common_arguments(parser):
     """
     Adds the options common to all parsers to the given parser.
@@ -174,6 +230,45 @@ def _add_common_build_arguments(parser):
         help="set the version of {}".format(get_anthem_name())
     )
 
+    parser.add_argument(
+        "--build-tag",
+        default=None,
+        metavar="TAG",
+        help="use separate build, destination, and running directories "
+             "that are marked with the given tag so that differently "
+             "configured builds of the same variant don't overwrite each "
+             "other"
+    )
+
+    parser.add_argument(
+        "--bolt",
+        action="store_true",
+        help="optimize the layout of the {} executable and the {} shared "
+             "library with BOLT by using a profile recorded with perf after "
+             "the build".format(get_anthem_name(), get_ode_name())
+    )
+
+    parser.add_argument(
+        "--tune",
+        default=None,
+        type=_tune_value,
+        metavar="CPU",
+        help="compile the project and the dependencies for the given CPU "
+             "with '-march', or for the CPU of this machine with 'native'; "
+             "the tuned builds are kept in their own build and dependency "
+             "directories and they aren't packaged without "
+             "'--package-tuned'"
+    )
+
+    parser.add_argument(
+        "--lto",
+        default=None,
+        choices=get_lto_names(),
+        help="build the project with the given link-time optimization "
+             "mode; ThinLTO keeps its cache in the build directory so the "
+             "incremental release links are fast"
+    )
+
     # --------------------------------------------------------- #
     # Build variant options
 
@@ -432,7 +527,7 @@ def create_argument_parser():
     subparsers = parser.add_subparsers(dest="composer_mode")
 
     preset = _add_common_arguments(subparsers.add_parser("preset"))
-    configure = _add_common_build_arguments(  # noqa: F841
+    configure = _add_common_build_arguments(
         _add_common_arguments(
             subparsers.add_parser("configure")
         )
@@ -440,6 +535,9 @@ def create_argument_parser():
     compose = _add_common_build_arguments(
         _add_common_arguments(subparsers.add_parser("compose"))
     )
+    benchmark = _add_common_build_arguments(
+        _add_common_arguments(subparsers.add_parser("benchmark"))
+    )
 
     # --------------------------------------------------------- #
     # Preset: Positional arguments
@@ -482,6 +580,37 @@ def create_argument_parser():
              "run it"
     )
 
+    # --------------------------------------------------------- #
+    # Configure: Dependency options
+
+    configure.add_argument(
+        "--lto-dependencies",
+        action="store_true",
+        help="build the static dependencies that support it with the "
+             "link-time optimization mode set with '--lto'; the project "
+             "must then be composed with link-time optimization too"
+    )
+
+    configure.add_argument(
+        "--optimized-dependencies",
+        default=None,
+        nargs="+",
+        metavar="DEPENDENCY",
+        help="build the given dependencies in the release variant with "
+             "debug information regardless of the build variant of the "
+             "project; the dependencies are given by their keys in the "
+             "dependency data, or 'all' selects all of them; with MSVC, "
+             "only the C dependencies can be mixed with a debug build"
+    )
+
+    configure.add_argument(
+        "--share-dependencies",
+        action="store_true",
+        help="install the dependencies that don't depend on the build "
+             "variant into a shared store in the build directory and hard "
+             "link them to the dependency directory of the build variant"
+    )
+
     # --------------------------------------------------------- #
     # Compose: Common build options
 
@@ -530,12 +659,126 @@ def create_argument_parser():
              "path of which is given relative to the source root"
     )
 
+    compose.add_argument(
+        "--lint-since",
+        default=None,
+        metavar="REV",
+        help="run clang-tidy with --lint only on the translation units that "
+             "are affected by the changes since the given Git revision"
+    )
+
+    compose.add_argument(
+        "--lint-timeout",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help="stop clang-tidy on a translation unit if it runs longer than "
+             "the given time and consider the file failed"
+    )
+
+    compose.add_argument(
+        "--lint-shard",
+        default=None,
+        type=_shard,
+        metavar="INDEX/COUNT",
+        help="run clang-tidy with --lint only on the given shard of the "
+             "translation units, balanced by their previous durations, and "
+             "write the results of the shard to the build directory"
+    )
+
+    compose.add_argument(
+        "--lint-timings",
+        default=None,
+        metavar="PATH",
+        help="read and store the durations of the clang-tidy runs in the "
+             "given file instead of the build directory"
+    )
+
+    compose.add_argument(
+        "--lint-merge",
+        default=None,
+        nargs="+",
+        metavar="PATH",
+        help="merge the results of the given lint shards, export their fixes "
+             "and store their durations instead of composing the project"
+    )
+
+    compose.add_argument(
+        "--split-debug-info",
+        action="store_true",
+        help="build the {} and {} variants with split DWARF and package the "
+             "debug symbols separately from the binaries into their own "
+             "artefact (only on Linux)".format(
+                 get_debug_variant_name(),
+                 get_release_with_debuginfo_variant_name()
+             )
+    )
+
+    compose.add_argument(
+        "--strip-binaries",
+        action="store_true",
+        help="strip the symbols from the binaries before creating the "
+             "artefacts"
+    )
+
+    compose.add_argument(
+        "--keep-debug-links",
+        action="store_true",
+        help="keep the links to the separated debug symbols when stripping "
+             "the binaries"
+    )
+
+    compose.add_argument(
+        "--sync-checksum",
+        action="store_true",
+        help="compare the contents of the files instead of their sizes and "
+             "modification times when installing the built products"
+    )
+
+    default_artefact_format = get_tar_gz_artefact_format_name() \
+        if current_platform() != get_windows_system_name() \
+        else get_zip_artefact_format_name()
+
+    compose.add_argument(
+        "--artefact-format",
+        default=default_artefact_format,
+        choices=get_artefact_format_names(),
+        help="create the artefacts in the given archive format (default: "
+             "{})".format(default_artefact_format)
+    )
+
+    compose.add_argument(
+        "--artefact-compression-level",
+        default=None,
+        type=int,
+        choices=range(0, 20),
+        metavar="LEVEL",
+        help="compress the artefacts using the given level (0-9, or 1-19 "
+             "for tar.zst) instead of the default level of the artefact "
+             "format"
+    )
+
+    compose.add_argument(
+        "--artefact-delta-base",
+        default=None,
+        metavar="PATH",
+        help="create also a delta artefact that contains only the files "
+             "changed since the given previous artefact or its manifest"
+    )
+
     compose.add_argument(
         "--use-artefact-directory",
         action="store_true",
         help="copy the artefact files to a directory instead of archiving them"
     )
 
+    compose.add_argument(
+        "--skip-artefacts",
+        action="store_true",
+        help="don't separate the debug symbols, strip the binaries, or create "
+             "the artefacts after the build"
+    )
+
     # --------------------------------------------------------- #
     # Compose: C++ standard options
 
@@ -610,6 +853,74 @@ def create_argument_parser():
         dest="assertions"
     )
 
+    compose.add_argument(
+        "--extra-compiler-flags",
+        default="",
+        metavar="FLAGS",
+        help="pass the given additional flags to the C and C++ compilers; "
+             "give the flags as '--extra-compiler-flags=FLAGS' if they start "
+             "with a dash"
+    )
+
+    compose.add_argument(
+        "--extra-linker-flags",
+        default="",
+        metavar="FLAGS",
+        help="pass the given additional flags to the linker; give the flags "
+             "as '--extra-linker-flags=FLAGS' if they start with a dash"
+    )
+
+    compose.add_argument(
+        "--pgo",
+        action="store_true",
+        help="build the project with profile-guided optimization by "
+             "training a profile with an instrumented build, or by using the "
+             "cached profile of the current source revision"
+    )
+
+    compose.add_argument(
+        "--pgo-training-command",
+        default=None,
+        metavar="COMMAND",
+        help="run the given command in the binary directory of the "
+             "instrumented build to train the profile of --pgo instead of "
+             "running the benchmarks"
+    )
+
+    compose.add_argument(
+        "--pgo-profile",
+        default=None,
+        metavar="PATH",
+        help="build the project with profile-guided optimization by using the "
+             "given merged profile instead of training one"
+    )
+
+    compose.add_argument(
+        "--pgo-retrain",
+        action="store_true",
+        help="train the profile of --pgo again even if it's cached"
+    )
+
+    compose.add_argument(
+        "--package-tuned",
+        action="store_true",
+        help="create the artefacts even if the build is tuned for a CPU with "
+             "'--tune' and it may not run on other machines"
+    )
+
+    compose.add_argument(
+        "--bolt-training-command",
+        default=None,
+        metavar="COMMAND",
+        help="run the given command in the binary directory to record the "
+             "profile of --bolt and to measure its speedup instead of running "
+             "the benchmarks"
+    )
+
+    # The instrumented build of the profile-guided optimization
+    # sets this internally.
+    compose.set_defaults(pgo_instrument=False)
+
     compose.add_argument(
         "-D",
         "--developer-build",
@@ -617,6 +928,56 @@ def create_argument_parser():
         help="enable developer features in the built executables"
     )
 
+    compose.add_argument(
+        "--run-tests",
+        action="store_true",
+        help="run the built tests in parallel shards after building them"
+    )
+
+    compose.add_argument(
+        "--affected-tests",
+        action="store_true",
+        help="run only the test suites that are affected by the changes "
+             "since the previous successful test run according to the "
+             "dependency information of the build, and fall back to running "
+             "all of the tests if the selection isn't safe"
+    )
+
+    compose.add_argument(
+        "--affected-tests-since",
+        default=None,
+        metavar="REV",
+        help="with --affected-tests, select the tests that are affected by "
+             "the changes since the common ancestor of the given Git "
+             "revision and the current work tree"
+    )
+
+    compose.add_argument(
+        "--test-shards",
+        default=None,
+        type=int,
+        metavar="N",
+        help="split the tests into the given number of shards when they are "
+             "run with --run-tests (default: the number of parallel jobs)"
+    )
+
+    compose.add_argument(
+        "--xvfb-idle-timeout",
+        default=600,
+        type=float,
+        metavar="SECONDS",
+        help="stop the persistent X virtual frame buffer servers that are "
+             "used with --enable-xvfb after they have been idle for the given "
+             "time (default: 600)"
+    )
+
+    compose.add_argument(
+        "--stop-xvfb",
+        action="store_true",
+        help="stop the persistent X virtual frame buffer servers instead of "
+             "composing the project"
+    )
+
     compose.add_argument(
         "--test-logging",
         action="store_true",
@@ -624,6 +985,85 @@ def create_argument_parser():
              "built"
     )
 
+    # --------------------------------------------------------- #
+    # Benchmark: Benchmark options
+
+    benchmark.add_argument(
+        "--benchmark-repetitions",
+        default=10,
+        type=int,
+        metavar="N",
+        help="run each benchmark the given number of times (default: 10)"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-filter",
+        default=None,
+        metavar="REGEX",
+        help="run only the benchmarks that match the given regular expression"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-min-time",
+        default=None,
+        metavar="SECONDS",
+        help="run each repetition of the benchmarks at least for the given "
+             "time"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-label",
+        default=None,
+        metavar="NAME",
+        help="store the benchmark results in the history with the given label"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-no-save",
+        action="store_true",
+        help="don't store the benchmark results in the history"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-baseline",
+        default="latest",
+        metavar="RUN",
+        help="compare the benchmark results with the stored run that has the "
+             "given ID, label, or commit, or with the latest run of the same "
+             "target and build variant (default: latest)"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-alpha",
+        default=0.05,
+        type=float,
+        metavar="P",
+        help="use the given significance level in the Mann-Whitney U test of "
+             "the benchmark results (default: 0.05)"
+    )
+
+    benchmark.add_argument(
+        "--benchmark-threshold",
+        default=5.0,
+        type=float,
+        metavar="PERCENT",
+        help="report only the changes of the median benchmark times that are "
+             "larger than the given percentage (default: 5)"
+    )
+
+    benchmark.add_argument(
+        "--shootout",
+        action="append",
+        default=[],
+        type=_shootout_configuration,
+        metavar="NAME=OPTIONS",
+        help="build the benchmarks in a separate build with the given "
+             "composing mode options, such as the compiler toolchain and the "
+             "extra compiler flags, and compare the configurations given with "
+             "this option by running them with interleaved repetitions; the "
+             "first configuration is the reference of the speedups"
+    )
+
     return parser
 
 
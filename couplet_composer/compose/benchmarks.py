@@ -0,0 +1,331 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for running the
+benchmarks of the project and tracking their results.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+
+from ..support.platform_names import get_windows_system_name
+
+from ..util.benchmark_results import \
+    compare_benchmarks, format_table, format_time, read_benchmark_samples
+
+from ..util import shell
+
+
+def get_benchmark_directory(build_root):
+    """
+    Gives the path to the directory where the history of the
+    benchmark results is kept.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(build_root, "benchmarks")
+
+
+def get_benchmark_history_directory(build_root):
+    """
+    Gives the path to the directory that contains the stored
+    benchmark runs.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(get_benchmark_directory(build_root), "history")
+
+
+def find_benchmark_executables(host_system, destination_root):
+    """
+    Gives the sorted list of the installed benchmark executables.
+
+    host_system -- The system this script is run on.
+
+    destination_root -- The directory where the built product is
+    placed in.
+    """
+    bin_dir = os.path.join(destination_root, "bin")
+    if not os.path.isdir(bin_dir):
+        return []
+    suffix = ".exe" if host_system == get_windows_system_name() else ""
+    return sorted(
+        os.path.join(bin_dir, name) for name in os.listdir(bin_dir)
+        if name.startswith("benchmark")
+        and name.endswith(suffix)
+        and os.path.isfile(os.path.join(bin_dir, name))
+        and os.access(os.path.join(bin_dir, name), os.X_OK)
+    )
+
+
+def _get_benchmark_name(executable, name):
+    """
+    Gives the name of the benchmark that is unique between the
+    benchmark executables.
+    """
+    return "{}::{}".format(
+        os.path.splitext(os.path.basename(executable))[0],
+        name
+    )
+
+
+def run_benchmark_executable(arguments, executable, repetitions):
+    """
+    Runs the given benchmark executable with the JSON output and
+    the given number of repetitions. Gives a dictionary that maps
+    the names of the benchmarks to the lists of their times in
+    nanoseconds. This function isn't pure as it runs the
+    benchmarks.
+
+    arguments -- The parsed command line arguments of the run.
+
+    executable -- The path to the benchmark executable.
+
+    repetitions -- The number of the repetitions of each
+    benchmark.
+    """
+    command = [
+        executable,
+        "--benchmark_format=json",
+        "--benchmark_repetitions={}".format(repetitions),
+        "--benchmark_report_aggregates_only=false"
+    ]
+    if arguments.benchmark_filter:
+        command.append("--benchmark_filter={}".format(
+            arguments.benchmark_filter
+        ))
+    if arguments.benchmark_min_time:
+        command.append("--benchmark_min_time={}".format(
+            arguments.benchmark_min_time
+        ))
+    output = shell.capture(
+        command,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+    if arguments.dry_run:
+        return {}
+    samples = read_benchmark_samples(json.loads(output))
+    return {
+        _get_benchmark_name(executable, name): times
+        for name, times in samples.items()
+    }
+
+
+def _get_commit(arguments, project_root):
+    """
+    Gives the current commit of the project or None if it can't
+    be resolved.
+    """
+    output = shell.capture(
+        ["git", "-C", project_root, "rev-parse", "HEAD"],
+        stderr=shell.get_dev_null(),
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug,
+        optional=True
+    )
+    return output.strip() if output else None
+
+
+def read_benchmark_history(build_root):
+    """
+    Reads the stored benchmark runs. Gives the list of the runs
+    from the oldest to the newest.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    history_dir = get_benchmark_history_directory(build_root)
+    if not os.path.isdir(history_dir):
+        return []
+    runs = []
+    for name in sorted(os.listdir(history_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(history_dir, name)) as f:
+                runs.append(json.load(f))
+    return sorted(runs, key=lambda run: run["id"])
+
+
+def _write_benchmark_run(build_root, run):
+    """Stores the given benchmark run in the history."""
+    history_dir = get_benchmark_history_directory(build_root)
+    if not os.path.isdir(history_dir):
+        os.makedirs(history_dir)
+    with open(os.path.join(history_dir, "{}.json".format(run["id"])), "w") \
+            as f:
+        json.dump(run, f, indent=2, sort_keys=True)
+
+
+def _select_baseline(history, baseline, target, build_variant):
+    """
+    Selects the baseline run from the history. The baseline is
+    either the latest run of the same target and build variant, or
+    the latest run the ID, label, or commit of which matches the
+    given value. Gives None if there is no such run.
+    """
+    for run in reversed(history):
+        if baseline == "latest":
+            if run["target"] == target \
+                    and run["build_variant"] == build_variant:
+                return run
+        elif baseline in (run["id"], run.get("label")) or (
+            run.get("commit") and run["commit"].startswith(baseline)
+        ):
+            return run
+    return None
+
+
+def log_benchmark_comparison(comparisons, baseline_title, current_title):
+    """
+    Prints the table of the benchmark comparisons.
+
+    comparisons -- The comparisons of the benchmarks.
+
+    baseline_title -- The title of the baseline column.
+
+    current_title -- The title of the current column.
+    """
+    logging.info(
+        "The benchmark results compared to %s:\n%s",
+        baseline_title,
+        format_table(
+            ["benchmark", baseline_title, current_title, "change", "p",
+             "status"],
+            [
+                [
+                    c.name,
+                    format_time(c.baseline),
+                    format_time(c.current),
+                    "{:+.1f} %".format(c.change * 100),
+                    "{:.3f}".format(c.p_value),
+                    c.status
+                ] for c in comparisons
+            ]
+        )
+    )
+
+
+def run_benchmarks(
+    arguments,
+    host_system,
+    project_root,
+    build_root,
+    destination_root
+):
+    """
+    Runs the installed benchmarks, stores the results in the
+    history, and compares them with the selected baseline. Exits
+    with an error if a benchmark has regressed significantly. This
+    function isn't pure as it runs the benchmarks and modifies the
+    history.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    project_root -- The root directory of the project this script
+    acts on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    destination_root -- The directory where the built product is
+    placed in.
+    """
+    executables = find_benchmark_executables(
+        host_system=host_system,
+        destination_root=destination_root
+    )
+
+    if not executables:
+        logging.critical(
+            "Couldn't find the benchmark executables in %s, build them with "
+            "the option '--benchmark' first",
+            os.path.join(destination_root, "bin")
+        )
+        sys.exit(1)
+
+    history = read_benchmark_history(build_root)
+
+    samples = {}
+
+    for executable in executables:
+        logging.info(
+            "Running %s with %d repetitions",
+            os.path.basename(executable),
+            arguments.benchmark_repetitions
+        )
+        samples.update(run_benchmark_executable(
+            arguments=arguments,
+            executable=executable,
+            repetitions=arguments.benchmark_repetitions
+        ))
+
+    if arguments.dry_run:
+        return
+
+    run_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    existing_ids = set(run["id"] for run in history)
+    suffix = 1
+
+    while run_id in existing_ids:
+        run_id = "{}-{}".format(run_id.split("-")[0], suffix)
+        suffix += 1
+
+    run = {
+        "id": run_id,
+        "label": arguments.benchmark_label,
+        "commit": _get_commit(arguments, project_root),
+        "target": arguments.host_target,
+        "build_variant": arguments.build_variant,
+        "repetitions": arguments.benchmark_repetitions,
+        "samples": samples
+    }
+
+    if not arguments.benchmark_no_save:
+        _write_benchmark_run(build_root, run)
+        logging.info("Stored the benchmark results as %s", run["id"])
+
+    baseline = _select_baseline(
+        history=history,
+        baseline=arguments.benchmark_baseline,
+        target=arguments.host_target,
+        build_variant=arguments.build_variant
+    )
+
+    if not baseline:
+        logging.info(
+            "Couldn't find the baseline '%s' in the benchmark history",
+            arguments.benchmark_baseline
+        )
+        return
+
+    comparisons = compare_benchmarks(
+        baseline=baseline["samples"],
+        current=samples,
+        alpha=arguments.benchmark_alpha,
+        threshold=arguments.benchmark_threshold / 100.0
+    )
+
+    log_benchmark_comparison(
+        comparisons=comparisons,
+        baseline_title=baseline.get("label") or baseline["id"],
+        current_title=run.get("label") or run["id"]
+    )
+
+    regressions = [c for c in comparisons if c.status == "regressed"]
+
+    if regressions:
+        logging.critical(
+            "%d benchmarks regressed significantly compared to %s: %s",
+            len(regressions),
+            baseline.get("label") or baseline["id"],
+            ", ".join(c.name for c in regressions)
+        )
+        sys.exit(1)
@@ -0,0 +1,381 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for optimizing the
+layout of the built binaries with BOLT. A profile of the training
+workload is recorded with perf, BOLT rewrites the binaries by
+using it, and the optimized binaries replace the installed ones.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+
+from ..support.platform_names import get_linux_system_name
+
+from ..util.elf import is_elf_binary
+
+from ..util.statistics import median
+
+from ..util.which import which
+
+from ..util import shell
+
+from . import training
+
+
+def get_bolt_directory(build_root):
+    """
+    Gives the path to the directory where the profiles and the
+    results of BOLT are kept.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(build_root, "bolt")
+
+
+def should_use_bolt(toolchain, host_system):
+    """
+    Tells whether BOLT can be used with the toolchain of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+    """
+    return host_system == get_linux_system_name() \
+        and bool(toolchain.bolt) and os.path.isfile(toolchain.bolt) \
+        and bool(toolchain.perf)
+
+
+def _find_bolt_tool(toolchain, name):
+    """
+    Gives the path to the given BOLT tool. The tools are looked for
+    next to llvm-bolt first.
+    """
+    local_tool = os.path.join(os.path.dirname(toolchain.bolt), name)
+    if os.access(local_tool, os.X_OK):
+        return local_tool
+    return which(name)
+
+
+def _find_optimized_binaries(arguments, destination_root):
+    """
+    Gives the list of the installed binaries that are optimized,
+    i.e. the executable of the project and the shared library of
+    the engine.
+    """
+    candidates = [
+        os.path.join(destination_root, "bin", arguments.anthem_binaries_name)
+    ]
+    lib_dir = os.path.join(destination_root, "lib")
+    if os.path.isdir(lib_dir):
+        prefix = "lib{}.so".format(arguments.ode_binaries_name)
+        candidates.extend(sorted(
+            os.path.join(lib_dir, name) for name in os.listdir(lib_dir)
+            if name.startswith(prefix)
+        ))
+    return [path for path in candidates if is_elf_binary(path)]
+
+
+def _supports_lbr(arguments, toolchain, run_dir):
+    """
+    Tells whether perf can record the last branch records on this
+    machine. Without them, BOLT uses the plain samples.
+    """
+    probe_path = os.path.join(run_dir, "lbr-probe.data")
+    output = shell.capture(
+        [
+            toolchain.perf,
+            "record",
+            "-e",
+            "cycles:u",
+            "-j",
+            "any,u",
+            "-o",
+            probe_path,
+            "--",
+            "true"
+        ],
+        stderr=shell.get_dev_null(),
+        echo=arguments.print_debug,
+        optional=True
+    )
+    if os.path.exists(probe_path):
+        os.remove(probe_path)
+    return output is not None
+
+
+def _time_workload(
+    arguments,
+    toolchain,
+    build_root,
+    destination_root,
+    commands,
+    repetitions
+):
+    """
+    Runs the training workload the given number of times and gives
+    the list of its wall times in seconds.
+    """
+    return [
+        training.run_training_workload(
+            arguments=arguments,
+            toolchain=toolchain,
+            build_root=build_root,
+            destination_root=destination_root,
+            commands=commands
+        ) for _ in range(repetitions)
+    ]
+
+
+def _create_profile(arguments, toolchain, binary, perf_files, lbr, run_dir):
+    """
+    Converts the perf profiles into a BOLT profile of the given
+    binary. Gives the path to the profile, or None if the workload
+    didn't run any code of the binary.
+    """
+    name = os.path.basename(binary)
+    profiles = []
+    for index, perf_file in enumerate(perf_files):
+        profile = os.path.join(run_dir, "{}-{}.fdata".format(name, index))
+        command = [
+            _find_bolt_tool(toolchain, "perf2bolt"),
+            "-p",
+            perf_file,
+            "-o",
+            profile
+        ]
+        if not lbr:
+            command.append("-nl")
+        shell.call(
+            command + [binary],
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        if arguments.dry_run or os.path.getsize(profile) > 0:
+            profiles.append(profile)
+    if not profiles:
+        return None
+    if len(profiles) == 1:
+        return profiles[0]
+    merged_profile = os.path.join(run_dir, "{}.fdata".format(name))
+    shell.call(
+        [_find_bolt_tool(toolchain, "merge-fdata")] + profiles
+        + ["-o", merged_profile],
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+    return merged_profile
+
+
+def optimize_binaries(
+    arguments,
+    toolchain,
+    host_system,
+    build_root,
+    destination_root,
+    repetitions=3
+):
+    """
+    Records a profile of the training workload with perf, optimizes
+    the executable of the project and the shared library of the
+    engine with BOLT, and replaces the installed binaries with the
+    optimized ones. The speedup of the workload is measured by
+    running it the given number of times before and after the
+    optimization and it's stored in the BOLT directory. This
+    function isn't pure as it runs the workload and modifies the
+    installed binaries.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    destination_root -- The directory where the built product is
+    placed in.
+
+    repetitions -- The number of the timed runs of the workload
+    before and after the optimization.
+    """
+    binaries = _find_optimized_binaries(
+        arguments=arguments,
+        destination_root=destination_root
+    )
+
+    if not binaries and not arguments.dry_run:
+        logging.critical(
+            "Couldn't find the binaries for BOLT in %s",
+            destination_root
+        )
+        sys.exit(1)
+
+    commands = training.get_training_commands(
+        arguments=arguments,
+        host_system=host_system,
+        destination_root=destination_root,
+        training_command=arguments.bolt_training_command
+    )
+
+    run_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    run_dir = os.path.join(get_bolt_directory(build_root), run_id)
+
+    shell.makedirs(
+        run_dir,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+    before = _time_workload(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        destination_root=destination_root,
+        commands=commands,
+        repetitions=repetitions
+    )
+
+    lbr = not arguments.dry_run and _supports_lbr(
+        arguments=arguments,
+        toolchain=toolchain,
+        run_dir=run_dir
+    )
+
+    if not lbr:
+        logging.info(
+            "perf can't record the last branch records on this machine so "
+            "BOLT uses the plain samples"
+        )
+
+    perf_files = [
+        os.path.join(run_dir, "perf-{}.data".format(index))
+        for index in range(len(commands))
+    ]
+
+    training.run_training_workload(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        destination_root=destination_root,
+        commands=commands,
+        wrap=lambda index, command: [
+            toolchain.perf,
+            "record",
+            "-e",
+            "cycles:u",
+            "-o",
+            perf_files[index]
+        ] + (["-j", "any,u"] if lbr else []) + ["--"] + command
+    )
+
+    optimized = []
+
+    for binary in binaries:
+        profile = _create_profile(
+            arguments=arguments,
+            toolchain=toolchain,
+            binary=binary,
+            perf_files=perf_files,
+            lbr=lbr,
+            run_dir=run_dir
+        )
+        if not profile:
+            logging.info(
+                "The workload didn't run %s so it isn't optimized",
+                os.path.basename(binary)
+            )
+            continue
+        optimized_binary = os.path.join(
+            run_dir,
+            "{}.bolt".format(os.path.basename(binary))
+        )
+        shell.call(
+            [
+                toolchain.bolt,
+                binary,
+                "-o",
+                optimized_binary,
+                "-data={}".format(profile),
+                "-reorder-blocks=ext-tsp",
+                "-reorder-functions=hfsort",
+                "-split-functions",
+                "-split-all-cold",
+                "-split-eh",
+                "-dyno-stats"
+            ],
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        optimized.append((binary, optimized_binary))
+
+    for perf_file in perf_files:
+        if os.path.exists(perf_file):
+            shell.rm(perf_file, echo=arguments.print_debug)
+
+    # The binaries are replaced only after all of them have been
+    # optimized so that a failure doesn't leave a mixed build.
+    for binary, optimized_binary in optimized:
+        shell.copy(
+            optimized_binary,
+            binary,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        shell.rm(
+            optimized_binary,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+
+    if arguments.dry_run:
+        return
+
+    after = _time_workload(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        destination_root=destination_root,
+        commands=commands,
+        repetitions=repetitions
+    )
+
+    speedup = median(before) / median(after) if median(after) else 0.0
+
+    logging.info(
+        "BOLT optimized %s; the workload took %.3f seconds before and %.3f "
+        "seconds after the optimization (%.2fx)",
+        ", ".join(os.path.basename(binary) for binary, _ in optimized)
+        or "no binaries",
+        median(before),
+        median(after),
+        speedup
+    )
+
+    if speedup and speedup < 1.0:
+        logging.warning("The binaries optimized with BOLT are slower")
+
+    result_path = os.path.join(run_dir, "bolt.json")
+
+    with open(result_path, "w") as f:
+        json.dump({
+            "target": arguments.host_target,
+            "build_variant": arguments.build_variant,
+            "training": arguments.bolt_training_command or "benchmarks",
+            "last_branch_records": lbr,
+            "binaries": [
+                os.path.relpath(binary, destination_root)
+                for binary, _ in optimized
+            ],
+            "before": before,
+            "after": after,
+            "speedup": speedup
+        }, f, indent=2, sort_keys=True)
+
+    logging.info("The BOLT results are in %s", result_path)
@@ -0,0 +1,241 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for reading the
+compilation database and the dependency information of the
+build.
+"""
+
+import json
+import logging
+import os
+import shlex
+
+from ..support.cmake_generators import get_ninja_cmake_generator_name
+
+from ..util.depfile import parse_depfile, parse_ninja_deps
+
+from ..util import shell
+
+
+def get_compilation_database_path(composing_root):
+    """
+    Gives the path to the compilation database of the build.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    return os.path.join(composing_root, "compile_commands.json")
+
+
+def read_compilation_database(composing_root):
+    """
+    Reads the entries of the compilation database of the build.
+    Gives an empty list if the database doesn't exist.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    database_path = get_compilation_database_path(composing_root)
+    if not os.path.isfile(database_path):
+        logging.warning(
+            "The compilation database %s doesn't exist",
+            database_path
+        )
+        return []
+    with open(database_path) as f:
+        return json.load(f)
+
+
+def _get_absolute_path(path, directory):
+    """
+    Gives the normalized absolute path of the given path that may
+    be relative to the given directory.
+    """
+    return os.path.normpath(os.path.join(directory, path))
+
+
+def get_entry_arguments(entry):
+    """
+    Gives the arguments of the compile command of the given entry
+    of the compilation database.
+
+    entry -- The entry of the compilation database.
+    """
+    if "arguments" in entry:
+        return entry["arguments"]
+    return shlex.split(entry["command"])
+
+
+def get_entry_source(entry):
+    """
+    Gives the absolute path to the source file of the given entry
+    of the compilation database.
+
+    entry -- The entry of the compilation database.
+    """
+    return _get_absolute_path(entry["file"], entry["directory"])
+
+
+def get_entry_output(entry):
+    """
+    Gives the absolute path to the object file of the given entry
+    of the compilation database, or None if the output can't be
+    resolved.
+
+    entry -- The entry of the compilation database.
+    """
+    if "output" in entry:
+        return _get_absolute_path(entry["output"], entry["directory"])
+    arguments = get_entry_arguments(entry)
+    for i, argument in enumerate(arguments):
+        if argument == "-o" and i + 1 < len(arguments):
+            return _get_absolute_path(arguments[i + 1], entry["directory"])
+        if argument.startswith("/Fo"):
+            return _get_absolute_path(argument[3:], entry["directory"])
+    return None
+
+
+def _read_depfile_dependencies(output):
+    """
+    Reads the dependencies of the given object file from the
+    depfile next to it. Gives None if there is no depfile.
+    """
+    for depfile in ["{}.d".format(output), "{}.d".format(
+        os.path.splitext(output)[0]
+    )]:
+        if os.path.isfile(depfile):
+            with open(depfile) as f:
+                dependencies = parse_depfile(f.read())
+            return [dep for deps in dependencies.values() for dep in deps]
+    return None
+
+
+def read_dependencies(arguments, toolchain, composing_root, entries):
+    """
+    Reads the header dependencies of the translation units from
+    the dependency information of the previous build. Gives a
+    dictionary that maps the absolute paths of the source files to
+    the lists of the absolute paths of their dependencies. The
+    source files that haven't been built yet are left out.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+
+    entries -- The entries of the compilation database.
+    """
+    ninja_deps = {}
+
+    if arguments.cmake_generator == get_ninja_cmake_generator_name() \
+            and toolchain.build_system \
+            and os.path.isfile(os.path.join(composing_root, ".ninja_deps")):
+        output = shell.capture(
+            [toolchain.build_system, "-C", composing_root, "-t", "deps"],
+            stderr=shell.get_dev_null(),
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug,
+            optional=True
+        )
+        if output:
+            ninja_deps = {
+                _get_absolute_path(target, composing_root): [
+                    _get_absolute_path(dep, composing_root) for dep in deps
+                ] for target, deps in parse_ninja_deps(output).items()
+            }
+
+    dependencies = {}
+
+    for entry in entries:
+        output = get_entry_output(entry)
+        if output is None:
+            continue
+        if output in ninja_deps:
+            deps = ninja_deps[output]
+        else:
+            deps = _read_depfile_dependencies(output)
+            if deps is None:
+                continue
+            deps = [
+                _get_absolute_path(dep, entry["directory"]) for dep in deps
+            ]
+        dependencies[get_entry_source(entry)] = sorted(set(deps))
+
+    return dependencies
+
+
+def map_dependencies_to_sources(dependencies):
+    """
+    Gives a dictionary that maps the absolute paths of the
+    dependencies to the sets of the source files that depend on
+    them.
+
+    dependencies -- The dependencies of the translation units as
+    given by 'read_dependencies'.
+    """
+    sources = {}
+    for source, deps in dependencies.items():
+        for dep in deps:
+            sources.setdefault(dep, set()).add(source)
+    return sources
+
+
+def find_changed_files(arguments, project_root, revision):
+    """
+    Gives the set of the absolute paths of the files that are
+    changed since the common ancestor of the given revision and
+    the current work tree, including the untracked files. This
+    function isn't pure as it runs Git.
+
+    arguments -- The parsed command line arguments of the run.
+
+    project_root -- The root directory of the project.
+
+    revision -- The base revision of the changes.
+    """
+    top_level = shell.capture(
+        ["git", "-C", project_root, "rev-parse", "--show-toplevel"],
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    ).strip()
+    merge_base = shell.capture(
+        ["git", "-C", project_root, "merge-base", revision, "HEAD"],
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    ).strip()
+    output = shell.capture(
+        [
+            "git",
+            "-C",
+            project_root,
+            "diff",
+            "--name-only",
+            "--diff-filter=d",
+            merge_base
+        ],
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+    # The new files aren't in the diff until they are added to the
+    # index.
+    untracked = shell.capture(
+        [
+            "git",
+            "-C",
+            project_root,
+            "ls-files",
+            "--others",
+            "--exclude-standard",
+            "--full-name"
+        ],
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+    return set(
+        os.path.normpath(os.path.join(top_level, line))
+        for line in (output + untracked).splitlines() if line.strip()
+    )
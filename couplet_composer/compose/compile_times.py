@@ -0,0 +1,101 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for reporting the
+compile times of the builds.
+"""
+
+import json
+import logging
+import os
+
+from ..util.ninja_log import is_compile_output, parse_ninja_log
+
+
+def _get_compile_times_path(composing_root):
+    """
+    Gives the path to the file that contains the compile times of
+    the previous builds.
+    """
+    return os.path.join(composing_root, "compile-times.json")
+
+
+def report_compile_times(arguments, composing_root, configuration):
+    """
+    Reports how long compiling the translation units took in the
+    latest build according to the Ninja build log and compares the
+    mean compile time of a translation unit with the previous
+    builds of the other configurations. The mean is compared as an
+    incremental build compiles only some of the translation units.
+    This function isn't pure as it reads the build log and updates
+    the stored compile times.
+
+    arguments -- The parsed command line arguments of the run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+
+    configuration -- The name of the configuration of the build
+    that the compile times are stored by.
+    """
+    log_path = os.path.join(composing_root, ".ninja_log")
+
+    if arguments.dry_run or not os.path.isfile(log_path):
+        return
+
+    with open(log_path) as f:
+        builds = parse_ninja_log(f.read())
+
+    if not builds:
+        return
+
+    durations = [
+        (end - start) / 1000.0 for start, end, output in builds[-1]
+        if is_compile_output(output)
+    ]
+
+    if not durations:
+        logging.info("Nothing was compiled in the build")
+        return
+
+    total = sum(durations)
+    mean = total / len(durations)
+    times_path = _get_compile_times_path(composing_root)
+    compile_times = {}
+
+    if os.path.isfile(times_path):
+        with open(times_path) as f:
+            compile_times = json.load(f)
+
+    messages = [
+        "Compiling {} translation units took {:.2f} seconds with {} "
+        "({:.2f} seconds per translation unit)".format(
+            len(durations),
+            total,
+            configuration,
+            mean
+        )
+    ]
+
+    for other in sorted(compile_times):
+        if other == configuration or not compile_times[other]["mean"]:
+            continue
+        messages.append(
+            "{:+.1f}% per translation unit compared to the previous build "
+            "with {}".format(
+                (mean / compile_times[other]["mean"] - 1.0) * 100.0,
+                other
+            )
+        )
+
+    logging.info(", ".join(messages))
+
+    compile_times[configuration] = {
+        "translation_units": len(durations),
+        "total": total,
+        "mean": mean
+    }
+
+    with open(times_path, "w") as f:
+        json.dump(compile_times, f, indent=2, sort_keys=True)
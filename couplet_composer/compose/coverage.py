@@ -0,0 +1,330 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for creating the code
+coverage reports of the project. The tests are run in parallel
+shards, the raw profiles are merged in parallel, and the reports
+of the source directories are exported concurrently.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from multiprocessing.pool import ThreadPool
+
+from ..support.compiler_toolchains import get_clang_toolchain_name
+
+from ..util.elf import find_elf_binaries
+
+from ..util import shell
+
+from . import build_graph, tests
+
+
+def get_coverage_directory(composing_root):
+    """
+    Gives the path to the directory where the coverage data and
+    reports are written to.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    return os.path.join(composing_root, "coverage")
+
+
+def should_run_coverage(arguments, toolchain):
+    """
+    Tells whether Couplet Composer can create the coverage reports
+    itself instead of using the coverage target of the project.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+    """
+    return arguments.coverage \
+        and arguments.compiler_toolchain == get_clang_toolchain_name() \
+        and bool(toolchain.profdata) \
+        and bool(toolchain.coverage)
+
+
+def _hash_files(paths):
+    """Gives the combined SHA-256 hash of the given files."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_coverage_cache(coverage_dir):
+    """Reads the fingerprints of the previous coverage run."""
+    cache_path = os.path.join(coverage_dir, "cache.json")
+    if not os.path.isfile(cache_path):
+        return {"profile": None, "reports": {}}
+    with open(cache_path) as f:
+        return json.load(f)
+
+
+def _write_coverage_cache(coverage_dir, cache):
+    """Writes the fingerprints of the coverage run."""
+    with open(os.path.join(coverage_dir, "cache.json"), "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def _find_source_directories(project_root, composing_root):
+    """
+    Gives the top-level directories of the project that contain
+    the source files in the compilation database, mapped to the
+    source files in them.
+    """
+    directories = {}
+    for entry in build_graph.read_compilation_database(composing_root):
+        source = build_graph.get_entry_source(entry)
+        relpath = os.path.relpath(source, project_root)
+        if relpath.startswith(os.pardir) or os.sep not in relpath:
+            continue
+        directory = relpath.split(os.sep)[0]
+        directories.setdefault(directory, []).append(source)
+    return directories
+
+
+def _run_to_file(command, path):
+    """
+    Runs the given command and writes its output to the given
+    file. Gives the exit status of the command.
+    """
+    with open(path, "wb") as f:
+        return subprocess.call(command, stdout=f)
+
+
+def run_coverage(
+    arguments,
+    toolchain,
+    host_system,
+    project_root,
+    build_root,
+    destination_root,
+    composing_root
+):
+    """
+    Runs the tests with the coverage instrumentation in parallel
+    shards and creates the coverage reports of the source
+    directories. The tests aren't run again if the test executable
+    and the libraries next to it haven't changed, and the report of
+    a directory isn't exported again if neither the profile nor the
+    sources in it have changed. This function isn't pure as it runs
+    the tests and the LLVM tools.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    project_root -- The root directory of the project this script
+    acts on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    destination_root -- The directory where the built product is
+    placed in.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    coverage_dir = get_coverage_directory(composing_root)
+    profiles_dir = os.path.join(coverage_dir, "profiles")
+    reports_dir = os.path.join(coverage_dir, "reports")
+    profile = os.path.join(coverage_dir, "coverage.profdata")
+    test_executable = tests.get_test_executable(
+        arguments=arguments,
+        host_system=host_system,
+        destination_root=destination_root
+    )
+
+    shell.makedirs(
+        reports_dir,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+    cache = {"profile": None, "reports": {}} if arguments.dry_run \
+        else _read_coverage_cache(coverage_dir)
+    # The libraries next to the test executable are included in the
+    # fingerprint as the tests run their code too.
+    binary_fingerprint = None if arguments.dry_run else _hash_files(
+        set(find_elf_binaries(os.path.dirname(test_executable)))
+        | set([test_executable])
+    )
+
+    if binary_fingerprint and cache["profile"] == binary_fingerprint \
+            and os.path.isfile(profile):
+        logging.info(
+            "The test executable hasn't changed, using the cached coverage "
+            "profile"
+        )
+    else:
+        if os.path.exists(profiles_dir):
+            shell.rmtree(
+                profiles_dir,
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+        shell.makedirs(
+            profiles_dir,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        tests.run_tests(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=host_system,
+            build_root=build_root,
+            destination_root=destination_root,
+            composing_root=composing_root,
+            shard_env=lambda index: {
+                "LLVM_PROFILE_FILE": os.path.join(
+                    profiles_dir,
+                    "shard-{}-%p.profraw".format(index)
+                )
+            }
+        )
+        raw_profiles = sorted(
+            glob.glob(os.path.join(profiles_dir, "*.profraw"))
+        )
+        if not raw_profiles and not arguments.dry_run:
+            logging.critical(
+                "The tests didn't write any coverage profiles to %s",
+                profiles_dir
+            )
+            sys.exit(1)
+        shell.call(
+            [
+                toolchain.profdata,
+                "merge",
+                "-sparse",
+                "-j",
+                str(arguments.jobs),
+                "-o",
+                profile
+            ] + raw_profiles,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        cache["profile"] = binary_fingerprint
+
+    database_path = build_graph.get_compilation_database_path(
+        composing_root
+    )
+    if not arguments.dry_run and not os.path.isfile(database_path):
+        logging.critical(
+            "The coverage reports can't be created as the compilation "
+            "database %s doesn't exist",
+            database_path
+        )
+        sys.exit(1)
+
+    directories = _find_source_directories(
+        project_root=project_root,
+        composing_root=composing_root
+    )
+    commands = []
+    fingerprints = {}
+
+    for directory, sources in sorted(directories.items()):
+        fingerprint = None if arguments.dry_run \
+            else _hash_files(sources + [profile, test_executable])
+        fingerprints[directory] = fingerprint
+        report_path = os.path.join(reports_dir, "{}.txt".format(directory))
+        lcov_path = os.path.join(reports_dir, "{}.lcov".format(directory))
+        if fingerprint and cache["reports"].get(directory) == fingerprint \
+                and os.path.isfile(report_path) \
+                and os.path.isfile(lcov_path):
+            logging.debug("The coverage of %s is cached", directory)
+            continue
+        path = os.path.join(project_root, directory)
+        commands.append((
+            [
+                toolchain.coverage,
+                "report",
+                test_executable,
+                "-instr-profile={}".format(profile),
+                path
+            ],
+            report_path
+        ))
+        commands.append((
+            [
+                toolchain.coverage,
+                "export",
+                test_executable,
+                "-format=lcov",
+                "-instr-profile={}".format(profile),
+                path
+            ],
+            lcov_path
+        ))
+
+    if arguments.dry_run or arguments.print_debug:
+        for command, path in commands:
+            shell.echo_command(
+                command + [">", path],
+                dry_run=arguments.dry_run
+            )
+
+    if arguments.dry_run:
+        return
+
+    logging.info(
+        "Exporting the coverage reports of %d of %d directories",
+        len(set(path for _, path in commands)) // 2,
+        len(directories)
+    )
+
+    pool = ThreadPool(arguments.jobs)
+
+    try:
+        results = pool.map(lambda item: _run_to_file(*item), commands)
+    finally:
+        pool.close()
+        pool.join()
+
+    failed = [
+        path for (_, path), returncode in zip(commands, results)
+        if returncode != 0
+    ]
+
+    cache["reports"] = {
+        directory: fingerprint
+        for directory, fingerprint in fingerprints.items()
+        if not any(
+            os.path.basename(path).startswith("{}.".format(directory))
+            for path in failed
+        )
+    }
+
+    _write_coverage_cache(coverage_dir, cache)
+
+    for directory in sorted(directories):
+        report_path = os.path.join(reports_dir, "{}.txt".format(directory))
+        if os.path.isfile(report_path):
+            with open(report_path) as f:
+                lines = f.read().strip().splitlines()
+            if lines:
+                logging.info("Coverage of %s: %s", directory, lines[-1])
+
+    if failed:
+        logging.critical(
+            "Couldn't export the coverage reports:\n%s",
+            "\n".join(failed)
+        )
+        sys.exit(1)
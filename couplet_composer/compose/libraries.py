@@ -36,40 +36,22 @@ def copy_scripts(path, arguments, project_root):
         get_scripts_base_directory_name(coverage=arguments.coverage)
     )
 
-    if os.path.exists(script_dest_dir):
-        shell.rmtree(
-            script_dest_dir,
-            dry_run=arguments.dry_run,
-            echo=arguments.print_debug
-        )
+    sources = []
+    for script_dir in ["anthem", "ode"]:
+        sources.extend([
+            (os.path.join(project_root, "script", script_dir), script_dir),
+            (
+                os.path.join(project_root, "script", "test", script_dir),
+                script_dir
+            )
+        ])
 
-    shell.makedirs(
+    shell.sync(
+        sources,
         script_dest_dir,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-
-    shell.copytree(
-        os.path.join(project_root, "script", "anthem"),
-        os.path.join(script_dest_dir, "anthem"),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.copytree(
-        os.path.join(project_root, "script", "ode"),
-        os.path.join(script_dest_dir, "ode"),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.copytree(
-        os.path.join(project_root, "script", "test", "anthem"),
-        os.path.join(script_dest_dir, "anthem"),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.copytree(
-        os.path.join(project_root, "script", "test", "ode"),
-        os.path.join(script_dest_dir, "ode"),
+        checksum=arguments.sync_checksum,
+        ignore=["CMakeLists.txt"],
+        jobs=arguments.jobs,
         dry_run=arguments.dry_run,
         echo=arguments.print_debug
     )
@@ -78,14 +60,7 @@ def copy_scripts(path, arguments, project_root):
 
     for dirpath, _, filenames in os.walk(script_dest_dir):
         for filename in filenames:
-            if filename == "CMakeLists.txt":
-                shell.rm(
-                    os.path.join(dirpath, filename),
-                    dry_run=arguments.dry_run,
-                    echo=arguments.print_debug
-                )
-            else:
-                lua_scripts.append(os.path.join(dirpath, filename))
+            lua_scripts.append(os.path.join(dirpath, filename))
 
     logging.debug("The Lua scripts are:\n\n%s", "\n".join(lua_scripts))
 
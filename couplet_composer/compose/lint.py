@@ -0,0 +1,683 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for running clang-tidy
+on the project. The results are cached per translation unit so
+that only the changed translation units are linted again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from multiprocessing.pool import ThreadPool
+
+import yaml
+
+from ..util.diagnostics import deduplicate_diagnostics
+
+from ..util.sharding import partition_by_cost
+
+from ..util import shell
+
+from . import build_graph
+
+
+def get_lint_cache_path(composing_root):
+    """
+    Gives the path to the file that contains the cached results of
+    clang-tidy.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    return os.path.join(composing_root, "lint-cache.json")
+
+
+def _read_lint_cache(composing_root):
+    """Reads the cached results of clang-tidy."""
+    cache_path = get_lint_cache_path(composing_root)
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except ValueError:
+        logging.warning("The lint cache %s is corrupted", cache_path)
+        return {}
+
+
+def _write_lint_cache(composing_root, cache):
+    """Writes the cached results of clang-tidy."""
+    with open(get_lint_cache_path(composing_root), "w") as f:
+        json.dump(cache, f, sort_keys=True)
+
+
+class _FileHasher(object):
+    """
+    A helper that calculates and remembers the hashes of the files
+    and of the clang-tidy configurations of the directories.
+    """
+
+    def __init__(self):
+        self._files = {}
+        self._configs = {}
+
+    def hash_file(self, path):
+        """
+        Gives the SHA-256 hash of the given file, or None if the
+        file doesn't exist.
+        """
+        if path not in self._files:
+            try:
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(chunk)
+                self._files[path] = digest.hexdigest()
+            except (IOError, OSError):
+                self._files[path] = None
+        return self._files[path]
+
+    def hash_config(self, directory):
+        """
+        Gives the combined hash of the '.clang-tidy' files that
+        clang-tidy reads for the sources in the given directory.
+        """
+        if directory not in self._configs:
+            parent = os.path.dirname(directory)
+            parent_hash = self.hash_config(parent) \
+                if parent != directory else ""
+            config_hash = self.hash_file(
+                os.path.join(directory, ".clang-tidy")
+            )
+            self._configs[directory] = hashlib.sha256("{}:{}".format(
+                parent_hash,
+                config_hash
+            ).encode("utf-8")).hexdigest()
+        return self._configs[directory]
+
+
+def _create_fingerprint(entry, dependencies, version, hasher):
+    """
+    Creates the fingerprint of the input of a translation unit.
+    Gives None if the header dependencies of the translation unit
+    aren't known, as the result can't be cached then.
+
+    entry -- The entry of the compilation database.
+
+    dependencies -- The header dependencies of the translation
+    unit.
+
+    version -- The version output of clang-tidy.
+
+    hasher -- The helper for hashing the files.
+    """
+    if dependencies is None:
+        return None
+    source = build_graph.get_entry_source(entry)
+    data = {
+        "source": hasher.hash_file(source),
+        "dependencies": [[dep, hasher.hash_file(dep)] for dep in dependencies],
+        "command": build_graph.get_entry_arguments(entry),
+        "directory": entry["directory"],
+        "config": hasher.hash_config(os.path.dirname(source)),
+        "version": version
+    }
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _wait_for_process(process, timeout):
+    """
+    Waits for the given process to exit and kills it if it doesn't
+    exit within the timeout. Gives a tuple containing the exit
+    status of the process, whether it timed out, and its peak
+    memory usage in kibibytes or None if the usage isn't available.
+    """
+    deadline = time.time() + timeout if timeout else None
+    timed_out = False
+
+    if not hasattr(os, "wait4"):
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            timed_out = True
+        return process.returncode, timed_out, None
+
+    # The process is reaped with wait4 so that its resource usage
+    # can be read. The status is polled as wait4 has no timeout.
+    interval = 0.01
+    while True:
+        pid, status, usage = os.wait4(
+            process.pid,
+            os.WNOHANG if deadline else 0
+        )
+        if pid == process.pid:
+            break
+        if time.time() >= deadline:
+            process.kill()
+            pid, status, usage = os.wait4(process.pid, 0)
+            timed_out = True
+            break
+        time.sleep(interval)
+        interval = min(interval * 2, 0.1)
+
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+
+    # The maximum resident set size is given in bytes on macOS and
+    # in kibibytes elsewhere.
+    max_rss = usage.ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024
+
+    return process.returncode, timed_out, max_rss
+
+
+def _run_clang_tidy(source, linter, composing_root, timeout):
+    """
+    Runs clang-tidy on a single translation unit. Gives a
+    dictionary containing the exit status, the output, the
+    exported fixes, the wall time, and the peak memory usage of the
+    run. The output is written to a temporary file instead of a
+    pipe so that it isn't buffered in the memory of the script
+    while clang-tidy runs.
+    """
+    handle, fixes_path = tempfile.mkstemp(suffix=".yaml")
+    os.close(handle)
+    output_file = tempfile.TemporaryFile()
+    start_time = time.time()
+    try:
+        process = subprocess.Popen(
+            [
+                linter,
+                "-p={}".format(composing_root),
+                "-quiet",
+                "-export-fixes={}".format(fixes_path),
+                source
+            ],
+            stdout=output_file,
+            stderr=subprocess.STDOUT
+        )
+        returncode, timed_out, max_rss = _wait_for_process(
+            process=process,
+            timeout=timeout
+        )
+        duration = time.time() - start_time
+        output_file.seek(0)
+        output = output_file.read().decode("utf-8", "replace")
+        with open(fixes_path) as f:
+            fixes = f.read()
+    finally:
+        output_file.close()
+        os.remove(fixes_path)
+    if timed_out:
+        output += "{}: error: clang-tidy timed out after {} seconds\n".format(
+            source,
+            timeout
+        )
+    return {
+        "returncode": returncode,
+        "timed_out": timed_out,
+        "output": output,
+        "fixes": fixes,
+        "duration": duration,
+        "max_rss": max_rss
+    }
+
+
+def _merge_fixes(results, export_path):
+    """
+    Merges the fixes exported by clang-tidy from the results of
+    the translation units into a single file.
+    """
+    merged = []
+    for result in results:
+        if not result["fixes"]:
+            continue
+        content = yaml.safe_load(result["fixes"])
+        if content:
+            merged.extend(content.get("Diagnostics", []))
+    with open(export_path, "w") as f:
+        if merged:
+            # The main source file is required by
+            # clang-apply-replacements but its value isn't used.
+            yaml.safe_dump({"MainSourceFile": "", "Diagnostics": merged}, f)
+
+
+def get_lint_timings_path(arguments, composing_root):
+    """
+    Gives the path to the file that contains the durations of the
+    previous clang-tidy runs of the translation units.
+
+    arguments -- The parsed command line arguments of the run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    if arguments.lint_timings:
+        return arguments.lint_timings
+    return os.path.join(composing_root, "lint-timings.json")
+
+
+def _read_lint_timings(path):
+    """
+    Reads the durations of the previous clang-tidy runs. The
+    durations are keyed by the paths of the source files relative
+    to the project root so that they can be shared between
+    machines.
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _update_lint_timings(path, durations):
+    """Updates the durations of the clang-tidy runs in the file."""
+    timings = _read_lint_timings(path)
+    timings.update(durations)
+    with open(path, "w") as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def get_lint_shard_path(composing_root, shard):
+    """
+    Gives the path to the file where the results of a lint shard
+    are written to.
+
+    composing_root -- The directory for the actual build of the
+    project.
+
+    shard -- A tuple containing the one-based index of the shard
+    and the number of the shards.
+    """
+    return os.path.join(
+        composing_root,
+        "lint-shard-{}-of-{}.json".format(shard[0], shard[1])
+    )
+
+
+def _select_shard_entries(entries, shard, timings, project_root):
+    """
+    Gives the entries of the compilation database that belong to
+    the given shard. The partition is balanced by the previous
+    durations of the translation units.
+    """
+    index, count = shard
+    sources = {
+        os.path.relpath(build_graph.get_entry_source(e), project_root): e
+        for e in entries
+    }
+    shard_sources = partition_by_cost(
+        list(sources),
+        timings,
+        count
+    )[index - 1]
+    return [sources[source] for source in shard_sources]
+
+
+def _select_changed_entries(entries, changed_files, dependencies):
+    """
+    Gives the entries of the compilation database that are
+    affected by the changed files. A translation unit is affected
+    if its source file or one of its headers is changed. If a
+    changed file isn't a known dependency of any translation unit,
+    the translation units the dependencies of which aren't known
+    are considered affected too.
+
+    entries -- The entries of the compilation database.
+
+    changed_files -- The absolute paths of the changed files.
+
+    dependencies -- The header dependencies of the translation
+    units.
+    """
+    dependents = build_graph.map_dependencies_to_sources(dependencies)
+    sources = set(build_graph.get_entry_source(e) for e in entries)
+    affected = set()
+    unresolved = False
+    for path in changed_files:
+        if path in sources:
+            affected.add(path)
+        elif path in dependents:
+            affected.update(dependents[path])
+        else:
+            unresolved = True
+    if unresolved:
+        affected.update(source for source in sources if source not in (
+            dependencies
+        ))
+    return [e for e in entries if build_graph.get_entry_source(e) in affected]
+
+
+def lint_project(
+    arguments,
+    toolchain,
+    source_root,
+    project_root,
+    composing_root
+):
+    """
+    Runs clang-tidy on the translation units in the compilation
+    database. The translation units the fingerprints of which
+    haven't changed since the previous run aren't linted again, but
+    their cached results are printed instead. This function isn't
+    pure as it runs clang-tidy and modifies the cache.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+
+    project_root -- The root directory of the project this script
+    acts on.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    entries = build_graph.read_compilation_database(composing_root)
+    all_sources = [build_graph.get_entry_source(e) for e in entries]
+    dependencies = {}
+
+    if arguments.lint_since and not arguments.dry_run:
+        dependencies = build_graph.read_dependencies(
+            arguments=arguments,
+            toolchain=toolchain,
+            composing_root=composing_root,
+            entries=entries
+        )
+        entries = _select_changed_entries(
+            entries=entries,
+            changed_files=build_graph.find_changed_files(
+                arguments=arguments,
+                project_root=project_root,
+                revision=arguments.lint_since
+            ),
+            dependencies=dependencies
+        )
+        logging.info(
+            "%d of %d translation units are affected by the changes since "
+            "%s",
+            len(entries),
+            len(all_sources),
+            arguments.lint_since
+        )
+
+    timings_path = get_lint_timings_path(
+        arguments=arguments,
+        composing_root=composing_root
+    )
+
+    if arguments.lint_shard:
+        shard_entries = len(entries)
+        entries = _select_shard_entries(
+            entries=entries,
+            shard=arguments.lint_shard,
+            timings=_read_lint_timings(timings_path),
+            project_root=project_root
+        )
+        logging.info(
+            "Linting %d of %d translation units in the shard %d/%d",
+            len(entries),
+            shard_entries,
+            arguments.lint_shard[0],
+            arguments.lint_shard[1]
+        )
+
+    if arguments.dry_run:
+        for entry in entries:
+            shell.call(
+                [
+                    toolchain.linter,
+                    "-p={}".format(composing_root),
+                    "-quiet",
+                    build_graph.get_entry_source(entry)
+                ],
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+        return
+
+    version = shell.capture([toolchain.linter, "--version"])
+
+    if not arguments.lint_since:
+        dependencies = build_graph.read_dependencies(
+            arguments=arguments,
+            toolchain=toolchain,
+            composing_root=composing_root,
+            entries=entries
+        )
+
+    hasher = _FileHasher()
+    cache = _read_lint_cache(composing_root)
+    # The results of the translation units that aren't linted in
+    # this run are kept as long as they are in the database.
+    new_cache = {
+        source: cache[source] for source in all_sources if source in cache
+    }
+    results = {}
+    changed = []
+
+    for entry in entries:
+        source = build_graph.get_entry_source(entry)
+        fingerprint = _create_fingerprint(
+            entry=entry,
+            dependencies=dependencies.get(source),
+            version=version,
+            hasher=hasher
+        )
+        cached = cache.get(source)
+        if fingerprint and cached and cached["fingerprint"] == fingerprint:
+            results[source] = cached
+            new_cache[source] = cached
+        else:
+            changed.append((source, fingerprint))
+
+    logging.info(
+        "Running clang-tidy on %d of %d translation units, %d results are "
+        "cached",
+        len(changed),
+        len(entries),
+        len(entries) - len(changed)
+    )
+
+    # The diagnostics in the headers are reported only once even
+    # though they are found in every translation unit that
+    # includes the header.
+    seen_diagnostics = set()
+
+    for source in sorted(results):
+        sys.stdout.write(deduplicate_diagnostics(
+            results[source]["output"],
+            seen_diagnostics
+        ))
+
+    sys.stdout.flush()
+
+    # Every clang-tidy runs in its own process, and the threads of
+    # the pool only wait for them.
+    pool = ThreadPool(arguments.jobs)
+
+    def _lint(item):
+        source, fingerprint = item
+        result = _run_clang_tidy(
+            source=source,
+            linter=toolchain.linter,
+            composing_root=composing_root,
+            timeout=arguments.lint_timeout
+        )
+        result["fingerprint"] = None if result["timed_out"] else fingerprint
+        return source, result
+
+    durations = {}
+
+    try:
+        # The results are printed as soon as they are ready.
+        for source, result in pool.imap_unordered(_lint, changed):
+            sys.stdout.write(deduplicate_diagnostics(
+                result["output"],
+                seen_diagnostics
+            ))
+            sys.stdout.flush()
+            logging.debug(
+                "Linted %s in %.2f seconds with the peak memory usage of %s "
+                "KiB",
+                source,
+                result["duration"],
+                result["max_rss"]
+            )
+            results[source] = result
+            durations[os.path.relpath(source, project_root)] = \
+                result["duration"]
+            if result["fingerprint"]:
+                new_cache[source] = result
+    finally:
+        pool.close()
+        pool.join()
+
+    _log_slowest_results(results)
+
+    _write_lint_cache(composing_root, new_cache)
+    _update_lint_timings(timings_path, durations)
+
+    if arguments.lint_shard:
+        shard_path = get_lint_shard_path(composing_root, arguments.lint_shard)
+        logging.info("Writing the results of the lint shard to %s", shard_path)
+        with open(shard_path, "w") as f:
+            json.dump(
+                {
+                    os.path.relpath(source, project_root): result
+                    for source, result in results.items()
+                },
+                f,
+                sort_keys=True
+            )
+
+    _finish_lint(
+        results=results,
+        arguments=arguments,
+        source_root=source_root
+    )
+
+
+def _log_slowest_results(results):
+    """Logs the translation units that took the longest to lint."""
+    slowest = sorted(
+        [
+            (result["duration"], source, result.get("max_rss"))
+            for source, result in results.items() if "duration" in result
+        ],
+        reverse=True
+    )[:5]
+    if slowest:
+        logging.info(
+            "The slowest translation units to lint were:\n%s",
+            "\n".join(
+                "{:.2f} s, {} KiB: {}".format(
+                    duration,
+                    "?" if max_rss is None else max_rss,
+                    source
+                )
+                for duration, source, max_rss in slowest
+            )
+        )
+
+
+def _finish_lint(results, arguments, source_root):
+    """
+    Exports the fixes of the given clang-tidy results and stops the
+    execution if clang-tidy failed on any of the files.
+    """
+    if arguments.export_linter_fixes:
+        export_path = os.path.join(source_root, arguments.export_linter_fixes)
+        logging.info("Writing the fixes of clang-tidy to %s", export_path)
+        _merge_fixes(
+            [results[source] for source in sorted(results)],
+            export_path
+        )
+
+    failed = sorted(
+        source for source, result in results.items()
+        if result["returncode"] != 0
+    )
+
+    if failed:
+        logging.critical(
+            "clang-tidy failed on the following files:\n%s",
+            "\n".join(failed)
+        )
+        sys.exit(1)
+
+
+def merge_lint_shards(arguments, source_root, composing_root):
+    """
+    Merges the results of the lint shards that are run on
+    different machines. The diagnostics of all of the shards are
+    printed, the exported fixes are merged, and the durations of
+    the translation units are stored for balancing the next runs.
+    This function isn't pure as it reads and writes files.
+
+    arguments -- The parsed command line arguments of the run.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    results = {}
+
+    for shard_path in arguments.lint_merge:
+        with open(shard_path) as f:
+            results.update(json.load(f))
+
+    logging.info(
+        "Merging the lint results of %d translation units from %d shards",
+        len(results),
+        len(arguments.lint_merge)
+    )
+
+    seen_diagnostics = set()
+
+    for source in sorted(results):
+        sys.stdout.write(deduplicate_diagnostics(
+            results[source]["output"],
+            seen_diagnostics
+        ))
+
+    _log_slowest_results(results)
+
+    if not arguments.dry_run:
+        _update_lint_timings(
+            get_lint_timings_path(
+                arguments=arguments,
+                composing_root=composing_root
+            ),
+            {
+                source: result["duration"]
+                for source, result in results.items()
+                if "duration" in result
+            }
+        )
+
+    _finish_lint(
+        results=results,
+        arguments=arguments,
+        source_root=source_root
+    )
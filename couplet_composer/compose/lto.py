@@ -0,0 +1,159 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for building the
+project with link-time optimization and for reporting the link
+times of the builds.
+"""
+
+import json
+import logging
+import os
+
+from ..support.environment import get_lto_cache_directory
+
+from ..support.platform_names import get_darwin_system_name
+
+from ..util.lto import \
+    find_lld_or_gold, get_lto_flags, get_thin_lto_cache_flags, \
+    get_thin_lto_name, is_clang_compiler
+
+from ..util.ninja_log import is_link_output, parse_ninja_log
+
+
+def create_lto_flags(arguments, compiler, host_system, build_root, linker):
+    """
+    Creates the compiler and linker flags of the link-time
+    optimization. Gives a tuple of the list of the compiler flags
+    and the list of the linker flags. This function isn't pure as
+    it looks for the linker from the system.
+
+    arguments -- The parsed command line arguments of the run.
+
+    compiler -- The path to the C++ compiler.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    linker -- The linker that is already selected with
+    '-fuse-ld', or None if the default linker is used.
+    """
+    flags = get_lto_flags(arguments.lto, compiler)
+    linker_flags = list(flags)
+
+    if not is_clang_compiler(compiler) \
+            or host_system == get_darwin_system_name():
+        if arguments.lto == get_thin_lto_name() \
+                and host_system == get_darwin_system_name():
+            linker_flags.extend(get_thin_lto_cache_flags(
+                cache_directory=get_lto_cache_directory(build_root),
+                linker=None,
+                host_system=host_system
+            ))
+        return flags, linker_flags
+
+    # The default BFD linker can't link the LLVM bitcode.
+    if not linker:
+        linker = find_lld_or_gold()
+        if linker:
+            linker_flags.append("-fuse-ld={}".format(linker))
+        else:
+            logging.warning(
+                "Neither LLD nor gold was found so the linking with "
+                "link-time optimization may fail"
+            )
+
+    if arguments.lto == get_thin_lto_name():
+        linker_flags.extend(get_thin_lto_cache_flags(
+            cache_directory=get_lto_cache_directory(build_root),
+            linker=linker,
+            host_system=host_system
+        ))
+
+    return flags, linker_flags
+
+
+def _get_link_times_path(composing_root):
+    """
+    Gives the path to the file that contains the link times of the
+    previous builds.
+    """
+    return os.path.join(composing_root, "link-times.json")
+
+
+def report_link_times(arguments, composing_root):
+    """
+    Reports how long linking took in the latest build according to
+    the Ninja build log and compares it with the previous build of
+    the same link-time optimization mode and with the previous
+    build without link-time optimization. This function isn't pure
+    as it reads the build log and updates the stored link times.
+
+    arguments -- The parsed command line arguments of the run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    log_path = os.path.join(composing_root, ".ninja_log")
+
+    if arguments.dry_run or not os.path.isfile(log_path):
+        return
+
+    with open(log_path) as f:
+        builds = parse_ninja_log(f.read())
+
+    if not builds:
+        return
+
+    durations = {}
+
+    for start, end, output in builds[-1]:
+        if not is_link_output(output):
+            continue
+        path = os.path.join(composing_root, output)
+        if not os.path.splitext(output)[1] and not os.access(path, os.X_OK):
+            continue
+        durations[output] = (end - start) / 1000.0
+
+    if not durations:
+        logging.info("Nothing was linked in the build")
+        return
+
+    mode = arguments.lto or "none"
+    total = sum(durations.values())
+    times_path = _get_link_times_path(composing_root)
+    link_times = {}
+
+    if os.path.isfile(times_path):
+        with open(times_path) as f:
+            link_times = json.load(f)
+
+    messages = ["Linking {} outputs took {:.2f} seconds with {}".format(
+        len(durations),
+        total,
+        "no link-time optimization" if mode == "none"
+        else "{} link-time optimization".format(mode)
+    )]
+
+    if mode in link_times:
+        messages.append(
+            "{:+.2f} seconds compared to the previous build".format(
+                total - link_times[mode]
+            )
+        )
+
+    if mode != "none" and "none" in link_times:
+        messages.append(
+            "{:+.2f} seconds compared to the previous build without "
+            "link-time optimization".format(total - link_times["none"])
+        )
+
+    logging.info(", ".join(messages))
+
+    link_times[mode] = total
+
+    with open(times_path, "w") as f:
+        json.dump(link_times, f, indent=2, sort_keys=True)
@@ -0,0 +1,247 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for creating the
+profiles of the profile-guided optimization. The profile is
+created by building an instrumented variant of the project,
+running a training workload with it, and merging the raw
+profiles. The merged profiles are cached by the source revision.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+from ..support.compiler_toolchains import get_clang_toolchain_name
+
+from ..support.environment import get_build_root
+
+from ..util import shell
+
+from . import training
+
+
+def get_pgo_directory(build_root):
+    """
+    Gives the path to the directory where the profiles of the
+    profile-guided optimization are cached.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(build_root, "pgo")
+
+
+def get_pgo_build_tag(arguments):
+    """
+    Gives the build tag of the instrumented build.
+
+    arguments -- The parsed command line arguments of the run.
+    """
+    if arguments.build_tag:
+        return "{}-pgo-instrumented".format(arguments.build_tag)
+    return "pgo-instrumented"
+
+
+def should_use_pgo(arguments, toolchain):
+    """
+    Tells whether the profile-guided optimization can be used with
+    the toolchain of the run.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+    """
+    return arguments.compiler_toolchain == get_clang_toolchain_name() \
+        and bool(toolchain.profdata)
+
+
+def _get_compiler(toolchain):
+    """Gives the C++ compiler of the toolchain."""
+    if isinstance(toolchain.compiler, dict):
+        return toolchain.compiler["cxx"]
+    return toolchain.compiler
+
+
+def _get_profile_key(arguments, toolchain, project_root):
+    """
+    Gives the key of the cached profile. The key consists of the
+    source revision, the uncommitted changes, the compiler version,
+    the build configuration, and the training workload. Gives None
+    if the source revision can't be resolved.
+    """
+    commit = shell.capture(
+        ["git", "-C", project_root, "rev-parse", "HEAD"],
+        stderr=shell.get_dev_null(),
+        echo=arguments.print_debug,
+        optional=True
+    )
+    if not commit:
+        return None
+    changes = shell.capture(
+        ["git", "-C", project_root, "diff", "HEAD"],
+        stderr=shell.get_dev_null(),
+        echo=arguments.print_debug,
+        optional=True
+    ) or ""
+    compiler_version = shell.capture(
+        [_get_compiler(toolchain), "--version"],
+        stderr=shell.get_dev_null(),
+        echo=arguments.print_debug,
+        optional=True
+    ) or ""
+    digest = hashlib.sha256()
+    for value in [
+        commit.strip(),
+        changes,
+        compiler_version,
+        arguments.host_target,
+        arguments.build_variant,
+        arguments.pgo_training_command or "benchmarks"
+    ]:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return "{}-{}".format(commit.strip()[:12], digest.hexdigest()[:12])
+
+
+def prepare_pgo_profile(
+    arguments,
+    toolchain,
+    host_system,
+    source_root,
+    project_root,
+    compose
+):
+    """
+    Gives the path to the merged profile of the profile-guided
+    optimization. If there is no cached profile for the current
+    source revision, the instrumented variant is built in its own
+    composing root with the given composing function, the training
+    workload is run, and the raw profiles are merged. This function
+    isn't pure as it builds the project and runs the training.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+
+    project_root -- The root directory of the project this script
+    acts on.
+
+    compose -- The function that builds the project with the given
+    arguments and returns the destination root of the build.
+    """
+    build_root = get_build_root(
+        source_root=source_root,
+        in_tree_build=arguments.in_tree_build
+    )
+    key = _get_profile_key(
+        arguments=arguments,
+        toolchain=toolchain,
+        project_root=project_root
+    )
+    profile_dir = os.path.join(
+        get_pgo_directory(build_root),
+        key or "unversioned"
+    )
+    profile_path = os.path.join(profile_dir, "merged.profdata")
+
+    if key and os.path.isfile(profile_path) and not arguments.pgo_retrain:
+        logging.info(
+            "Using the cached profile %s for the profile-guided "
+            "optimization",
+            profile_path
+        )
+        return profile_path
+
+    if not key:
+        logging.warning(
+            "Couldn't resolve the source revision so the profile of the "
+            "profile-guided optimization isn't cached"
+        )
+
+    instrumented_arguments = argparse.Namespace(**vars(arguments))
+    instrumented_arguments.build_tag = get_pgo_build_tag(arguments)
+    instrumented_arguments.pgo_instrument = True
+    instrumented_arguments.pgo_profile = None
+    instrumented_arguments.build_benchmark = \
+        arguments.build_benchmark or not arguments.pgo_training_command
+    instrumented_arguments.lint = False
+    instrumented_arguments.coverage = False
+
+    logging.info("Building the instrumented variant for the training")
+
+    start_time = time.time()
+    destination_root = compose(instrumented_arguments)
+
+    raw_dir = os.path.join(profile_dir, "raw")
+
+    if os.path.isdir(raw_dir):
+        shell.rmtree(
+            raw_dir,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+
+    shell.makedirs(
+        raw_dir,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+    training.run_training_workload(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        destination_root=destination_root,
+        commands=training.get_training_commands(
+            arguments=arguments,
+            host_system=host_system,
+            destination_root=destination_root,
+            training_command=arguments.pgo_training_command
+        ),
+        env={
+            "LLVM_PROFILE_FILE": os.path.join(raw_dir, "pgo-%p-%m.profraw")
+        }
+    )
+
+    raw_profiles = sorted(glob.glob(os.path.join(raw_dir, "*.profraw")))
+
+    if not raw_profiles and not arguments.dry_run:
+        logging.critical("The training workload didn't write any profiles")
+        sys.exit(1)
+
+    shell.call(
+        [toolchain.profdata, "merge", "-o", profile_path] + raw_profiles,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+    if not arguments.dry_run:
+        with open(os.path.join(profile_dir, "profile.json"), "w") as f:
+            json.dump({
+                "key": key,
+                "compiler": _get_compiler(toolchain),
+                "training": arguments.pgo_training_command or "benchmarks",
+                "raw_profiles": len(raw_profiles),
+                "duration": time.time() - start_time
+            }, f, indent=2, sort_keys=True)
+        shell.rmtree(raw_dir, echo=arguments.print_debug)
+
+    logging.info(
+        "Created the profile %s in %.1f seconds",
+        profile_path,
+        time.time() - start_time
+    )
+
+    return profile_path
@@ -0,0 +1,381 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for comparing the
+benchmark results of the project built with different compilers
+and flags.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from multiprocessing.pool import ThreadPool
+
+from ..args import create_argument_parser
+
+from ..support.environment import get_build_tag, get_destination_directory
+
+from ..util.benchmark_results import \
+    compare_benchmarks, format_table, format_time
+
+from ..util.statistics import median
+
+from ..util.target import parse_target_from_argument_string
+
+from ..util import shell
+
+from . import benchmarks
+
+
+def get_shootout_directory(build_root):
+    """
+    Gives the path to the directory where the build logs and the
+    results of the benchmark shootouts are written to.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(
+        benchmarks.get_benchmark_directory(build_root),
+        "shootouts"
+    )
+
+
+def get_shootout_build_tag(name):
+    """
+    Gives the build tag of the given shootout configuration.
+
+    name -- The name of the configuration.
+    """
+    return "shootout-{}".format(name)
+
+
+def _get_build_jobs(arguments):
+    """
+    Gives a tuple of the number of the configurations that are
+    built at the same time and the number of the parallel jobs of
+    each build. Every build gets at least four jobs.
+    """
+    builds = max(1, min(len(arguments.shootout), arguments.jobs // 4))
+    return builds, max(1, arguments.jobs // builds)
+
+
+def _create_compose_arguments(arguments, name, options, jobs):
+    """
+    Creates the command line arguments of the composing mode that
+    builds the benchmarks of the given configuration.
+    """
+    compose_arguments = [
+        "compose",
+        "--benchmark",
+        "--build-variant",
+        arguments.build_variant,
+        "--cmake-generator",
+        arguments.cmake_generator,
+        "--host-target",
+        arguments.host_target,
+        "--jobs",
+        str(jobs),
+        "--build-tag",
+        get_shootout_build_tag(name),
+        # Only the benchmarks are needed from the builds.
+        "--skip-artefacts"
+    ]
+    if arguments.in_tree_build:
+        compose_arguments.append("--in-tree-build")
+    if arguments.print_debug:
+        compose_arguments.append("--print-debug")
+    return compose_arguments + options
+
+
+def _create_compose_command(arguments, name, options, jobs):
+    """
+    Creates the command that builds the benchmarks of the given
+    configuration.
+    """
+    return [sys.executable, "-m", "couplet_composer"] \
+        + _create_compose_arguments(
+            arguments=arguments,
+            name=name,
+            options=options,
+            jobs=jobs
+        )
+
+
+def _get_configuration_build_tag(arguments, name, options):
+    """
+    Gives the build tag that the composing mode uses for the given
+    configuration. The options of the configuration may, for
+    example, tune the build and change its tag.
+    """
+    composing_arguments, _ = create_argument_parser().parse_known_args(
+        _create_compose_arguments(
+            arguments=arguments,
+            name=name,
+            options=options,
+            jobs=arguments.jobs
+        )
+    )
+    return get_build_tag(
+        build_tag=composing_arguments.build_tag,
+        tune=composing_arguments.tune
+    )
+
+
+def _build_configurations(arguments, source_root, build_root):
+    """
+    Builds the benchmarks of the shootout configurations in
+    parallel. The output of each build is written to its own log
+    file, which is printed if the build fails.
+    """
+    builds, jobs = _get_build_jobs(arguments)
+    shootout_dir = get_shootout_directory(build_root)
+    env = dict(os.environ)
+
+    # The composing mode is run as a module so the package of this
+    # run must be found by the child processes.
+    package_root = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_root] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+
+    commands = [
+        (name, _create_compose_command(
+            arguments=arguments,
+            name=name,
+            options=options,
+            jobs=jobs
+        )) for name, options in arguments.shootout
+    ]
+
+    if arguments.dry_run or arguments.print_debug:
+        for _, command in commands:
+            shell.echo_command(command, dry_run=arguments.dry_run)
+
+    if arguments.dry_run:
+        return
+
+    if not os.path.isdir(shootout_dir):
+        os.makedirs(shootout_dir)
+
+    logging.info(
+        "Building %d configurations, %d at a time with %d jobs each",
+        len(commands),
+        builds,
+        jobs
+    )
+
+    def _build(item):
+        name, command = item
+        log_path = os.path.join(shootout_dir, "{}.log".format(name))
+        start_time = time.time()
+        with open(log_path, "wb") as log_file:
+            returncode = subprocess.call(
+                command,
+                env=env,
+                cwd=source_root,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+        return name, returncode, time.time() - start_time, log_path
+
+    pool = ThreadPool(builds)
+    failed = []
+
+    try:
+        for name, returncode, duration, log_path in pool.imap_unordered(
+            _build,
+            commands
+        ):
+            logging.info(
+                "Built the configuration '%s' in %.1f seconds with status %d",
+                name,
+                duration,
+                returncode
+            )
+            if returncode != 0:
+                failed.append(name)
+                with open(log_path, "rb") as f:
+                    sys.stdout.write(f.read().decode("utf-8", "replace"))
+                sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+
+    if failed:
+        logging.critical(
+            "Building the configurations %s failed",
+            ", ".join(sorted(failed))
+        )
+        sys.exit(1)
+
+
+def _find_configuration_executables(arguments, host_system, build_root):
+    """
+    Gives a dictionary that maps the names of the configurations
+    to the lists of their benchmark executables.
+    """
+    build_target = parse_target_from_argument_string(arguments.host_target)
+    executables = {}
+    for name, options in arguments.shootout:
+        executables[name] = benchmarks.find_benchmark_executables(
+            host_system=host_system,
+            destination_root=get_destination_directory(
+                build_root=build_root,
+                target=build_target,
+                cmake_generator=arguments.cmake_generator,
+                build_variant=arguments.build_variant,
+                version=arguments.anthem_version,
+                build_tag=_get_configuration_build_tag(
+                    arguments=arguments,
+                    name=name,
+                    options=options
+                )
+            )
+        )
+        if not executables[name]:
+            logging.critical(
+                "The configuration '%s' has no benchmark executables",
+                name
+            )
+            sys.exit(1)
+    return executables
+
+
+def _run_interleaved(arguments, executables):
+    """
+    Runs the benchmarks of the configurations by interleaving the
+    repetitions so that every round runs each configuration once.
+    The order of the configurations is rotated between the rounds
+    so that none of them is always run first. Gives a dictionary
+    that maps the names of the configurations to their samples.
+    """
+    names = [name for name, _ in arguments.shootout]
+    samples = {name: {} for name in names}
+    for repetition in range(arguments.benchmark_repetitions):
+        logging.info(
+            "Running the round %d of %d of the benchmarks",
+            repetition + 1,
+            arguments.benchmark_repetitions
+        )
+        offset = repetition % len(names)
+        for name in names[offset:] + names[:offset]:
+            for executable in executables[name]:
+                results = benchmarks.run_benchmark_executable(
+                    arguments=arguments,
+                    executable=executable,
+                    repetitions=1
+                )
+                for benchmark, times in results.items():
+                    samples[name].setdefault(benchmark, []).extend(times)
+    return samples
+
+
+def _log_shootout_table(arguments, samples):
+    """
+    Prints the table of the median times of the benchmarks in each
+    configuration and their speedups compared to the first
+    configuration. The significant speedups are marked with an
+    asterisk.
+    """
+    names = [name for name, _ in arguments.shootout]
+    reference = names[0]
+    comparisons = {
+        name: {
+            c.name: c for c in compare_benchmarks(
+                baseline=samples[reference],
+                current=samples[name],
+                alpha=arguments.benchmark_alpha,
+                threshold=arguments.benchmark_threshold / 100.0
+            )
+        } for name in names[1:]
+    }
+    header = ["benchmark"] + names + [
+        "{} vs {}".format(name, reference) for name in names[1:]
+    ]
+    rows = []
+    for benchmark in sorted(samples[reference]):
+        row = [benchmark]
+        for name in names:
+            times = samples[name].get(benchmark)
+            row.append(format_time(median(times)) if times else "-")
+        for name in names[1:]:
+            comparison = comparisons[name].get(benchmark)
+            if not comparison or not comparison.current:
+                row.append("-")
+                continue
+            row.append("{:.2f}x{}".format(
+                comparison.baseline / comparison.current,
+                "*" if comparison.status != "unchanged" else " "
+            ))
+        rows.append(row)
+    logging.info(
+        "The benchmark speedups compared to '%s' (* significant):\n%s",
+        reference,
+        format_table(header, rows)
+    )
+
+
+def run_shootout(arguments, host_system, source_root, build_root):
+    """
+    Builds the benchmarks with each configuration of the shootout
+    in its own build directories, runs them on this machine with
+    interleaved repetitions, and prints the comparison of the
+    configurations. The results are written to the shootout
+    directory. This function isn't pure as it builds the project
+    and runs the benchmarks.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    _build_configurations(
+        arguments=arguments,
+        source_root=source_root,
+        build_root=build_root
+    )
+
+    if arguments.dry_run:
+        return
+
+    samples = _run_interleaved(
+        arguments=arguments,
+        executables=_find_configuration_executables(
+            arguments=arguments,
+            host_system=host_system,
+            build_root=build_root
+        )
+    )
+
+    _log_shootout_table(arguments=arguments, samples=samples)
+
+    result_path = os.path.join(
+        get_shootout_directory(build_root),
+        "{}.json".format(time.strftime("%Y%m%dT%H%M%S", time.gmtime()))
+    )
+
+    with open(result_path, "w") as f:
+        json.dump({
+            "target": arguments.host_target,
+            "build_variant": arguments.build_variant,
+            "repetitions": arguments.benchmark_repetitions,
+            "configurations": [
+                {"name": name, "options": options, "samples": samples[name]}
+                for name, options in arguments.shootout
+            ]
+        }, f, indent=2, sort_keys=True)
+
+    logging.info("The shootout results are in %s", result_path)
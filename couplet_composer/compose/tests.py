@@ -0,0 +1,534 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for running the tests
+of the project in parallel shards.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from contextlib import contextmanager
+
+from multiprocessing.pool import ThreadPool
+
+from ..support.platform_names import get_windows_system_name
+
+from ..util.gtest_xml import \
+    find_failed_tests, find_slowest_tests, merge_test_reports, \
+    write_test_report
+
+from ..util.test_selection import create_gtest_filter, find_test_suites
+
+from ..util import shell
+
+from . import build_graph, xvfb
+
+
+def get_test_executable(arguments, host_system, destination_root):
+    """
+    Gives the path to the installed test executable.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    destination_root -- The directory where the built product is
+    placed in.
+    """
+    return os.path.join(
+        destination_root,
+        "bin",
+        "test-{}{}".format(
+            arguments.anthem_binaries_name,
+            ".exe" if host_system == get_windows_system_name() else ""
+        )
+    )
+
+
+def get_test_results_directory(composing_root):
+    """
+    Gives the path to the directory where the results of the test
+    shards are written to.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    return os.path.join(composing_root, "test-results")
+
+
+def get_test_stamp_path(composing_root):
+    """
+    Gives the path to the file the modification time of which
+    tells when the tests were last run successfully.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    return os.path.join(composing_root, "tests.stamp")
+
+
+def mark_tests_run(arguments, composing_root):
+    """
+    Updates the modification time of the stamp file of the tests
+    after a successful test run. This function isn't pure as it
+    modifies the stamp file.
+
+    arguments -- The parsed command line arguments of the run.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    if arguments.dry_run:
+        return
+    with open(get_test_stamp_path(composing_root), "w"):
+        pass
+
+
+def _is_test_source(path, project_root):
+    """
+    Tells whether the given source file belongs to the tests of
+    the project.
+    """
+    relative_path = os.path.relpath(path, project_root)
+    if relative_path.startswith(os.pardir):
+        return False
+    return any(
+        part in ("test", "tests")
+        for part in relative_path.split(os.sep)[:-1]
+    )
+
+
+def _get_header_stems(path):
+    """
+    Gives the header files that have the same stem as the given
+    source file.
+    """
+    stem = os.path.splitext(path)[0]
+    return set(
+        stem + extension for extension in (".h", ".hh", ".hpp", ".hxx")
+    )
+
+
+def _find_modified_files(paths, stamp_time):
+    """
+    Gives the set of the given files that are modified after the
+    given time.
+    """
+    return set(
+        path for path in paths
+        if os.path.isfile(path) and os.path.getmtime(path) > stamp_time
+    )
+
+
+def select_affected_tests(
+    arguments,
+    toolchain,
+    project_root,
+    composing_root
+):
+    """
+    Selects the googletest test suites that are affected by the
+    changes since the given revision or, if no revision is given,
+    since the previous successful test run. The changed files are
+    mapped to the test translation units by using the dependency
+    information of the build. Gives the googletest filter of the
+    affected suites, an empty string if no tests are affected, or
+    None if the selection isn't safe and all of the tests should be
+    run.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    project_root -- The root directory of the project this script
+    acts on.
+
+    composing_root -- The directory for the actual build of the
+    project.
+    """
+    if arguments.dry_run:
+        return None
+
+    entries = build_graph.read_compilation_database(composing_root)
+    sources = set(build_graph.get_entry_source(e) for e in entries)
+    test_sources = set(
+        source for source in sources
+        if _is_test_source(source, project_root)
+    )
+
+    if not test_sources:
+        logging.warning(
+            "Couldn't find the test sources in the compilation database, "
+            "running all of the tests"
+        )
+        return None
+
+    dependencies = build_graph.read_dependencies(
+        arguments=arguments,
+        toolchain=toolchain,
+        composing_root=composing_root,
+        entries=entries
+    )
+    missing = sorted(test_sources.difference(dependencies))
+
+    if missing:
+        logging.warning(
+            "The dependencies of %s aren't known, running all of the tests",
+            ", ".join(os.path.relpath(p, project_root) for p in missing)
+        )
+        return None
+
+    if arguments.affected_tests_since:
+        changed_files = build_graph.find_changed_files(
+            arguments=arguments,
+            project_root=project_root,
+            revision=arguments.affected_tests_since
+        )
+    else:
+        stamp_path = get_test_stamp_path(composing_root)
+        if not os.path.isfile(stamp_path):
+            logging.info(
+                "The tests haven't been run successfully before, running all "
+                "of the tests"
+            )
+            return None
+        changed_files = _find_modified_files(
+            paths=sources.union(*dependencies.values()),
+            stamp_time=os.path.getmtime(stamp_path)
+        )
+
+    dependents = build_graph.map_dependencies_to_sources(dependencies)
+    affected = set()
+
+    for path in changed_files:
+        if path in test_sources:
+            affected.add(path)
+        elif path in sources:
+            headers = _get_header_stems(path).intersection(dependents)
+            if not headers:
+                logging.info(
+                    "Couldn't map %s to the tests, running all of the tests",
+                    os.path.relpath(path, project_root)
+                )
+                return None
+            for header in headers:
+                affected.update(dependents[header].intersection(test_sources))
+        elif path in dependents:
+            affected.update(dependents[path].intersection(test_sources))
+        elif os.path.splitext(path)[1] not in (".md", ".rst"):
+            logging.info(
+                "Couldn't map %s to the tests, running all of the tests",
+                os.path.relpath(path, project_root)
+            )
+            return None
+
+    suites = []
+
+    for path in sorted(affected):
+        with open(path) as f:
+            found = find_test_suites(f.read())
+        if not found:
+            logging.info(
+                "Couldn't find the test suites in %s, running all of the "
+                "tests",
+                os.path.relpath(path, project_root)
+            )
+            return None
+        suites.extend(found)
+
+    logging.info(
+        "%d of %d test translation units are affected by the changes",
+        len(affected),
+        len(test_sources)
+    )
+
+    return create_gtest_filter(suites)
+
+
+def get_first_xvfb_display():
+    """
+    Gives the number of the X display of the first test shard.
+    """
+    return 99
+
+
+def _get_xvfb_server_arguments():
+    """Gives the arguments of the X virtual frame buffer server."""
+    return "-screen 0 1920x1080x24 +extension GLX"
+
+
+def _run_test_shard(command, env, cwd, log_path):
+    """
+    Runs a single test shard and writes its output to the given
+    log file. Gives the exit status and the duration of the shard.
+    """
+    start_time = time.time()
+    with open(log_path, "wb") as log_file:
+        try:
+            returncode = subprocess.call(
+                command,
+                env=env,
+                cwd=cwd,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+        except OSError as e:
+            log_file.write("Couldn't run the test shard: {}\n".format(
+                e.strerror
+            ).encode("utf-8"))
+            returncode = 1
+    return returncode, time.time() - start_time
+
+
+def _run_test_shards(
+    arguments,
+    toolchain,
+    test_executable,
+    results_dir,
+    shard_count,
+    displays,
+    shard_env,
+    gtest_filter
+):
+    """
+    Runs the test shards in parallel. Gives the list of the indices
+    of the failed shards.
+    """
+    shards = []
+
+    for index in range(shard_count):
+        env = {
+            "GTEST_TOTAL_SHARDS": str(shard_count),
+            "GTEST_SHARD_INDEX": str(index),
+            "GTEST_OUTPUT": "xml:{}".format(
+                os.path.join(results_dir, "shard-{}.xml".format(index))
+            )
+        }
+        if gtest_filter:
+            env["GTEST_FILTER"] = gtest_filter
+        if shard_env:
+            env.update(shard_env(index))
+        command = []
+        if displays:
+            env.update({
+                "SDL_VIDEODRIVER": "x11",
+                "DISPLAY": ":{}.0".format(displays[index])
+            })
+        elif arguments.enable_xvfb and toolchain.xvfb:
+            display = get_first_xvfb_display() + index
+            env.update({
+                "SDL_VIDEODRIVER": "x11",
+                "DISPLAY": ":{}.0".format(display)
+            })
+            command.extend([
+                toolchain.xvfb,
+                "-n",
+                str(display),
+                "--server-args",
+                _get_xvfb_server_arguments(),
+                "-e",
+                "/dev/stdout"
+            ])
+        command.append(test_executable)
+        shards.append((index, command, env))
+
+    if arguments.dry_run or arguments.print_debug:
+        for _, command, env in shards:
+            shell.echo_command(command, env=env, dry_run=arguments.dry_run)
+
+    if arguments.dry_run:
+        return []
+
+    logging.info("Running the tests in %d shards", shard_count)
+
+    pool = ThreadPool(min(shard_count, arguments.jobs))
+
+    def _run(shard):
+        index, command, env = shard
+        shard_env = dict(os.environ)
+        shard_env.update(env)
+        log_path = os.path.join(results_dir, "shard-{}.log".format(index))
+        returncode, duration = _run_test_shard(
+            command=command,
+            env=shard_env,
+            cwd=os.path.dirname(test_executable),
+            log_path=log_path
+        )
+        return index, returncode, duration, log_path
+
+    failed_shards = []
+
+    try:
+        for index, returncode, duration, log_path in pool.imap_unordered(
+            _run,
+            shards
+        ):
+            logging.info(
+                "The test shard %d finished in %.2f seconds with status %d",
+                index,
+                duration,
+                returncode
+            )
+            if returncode != 0:
+                failed_shards.append(index)
+                with open(log_path, "rb") as f:
+                    sys.stdout.write(f.read().decode("utf-8", "replace"))
+                sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+
+    return failed_shards
+
+
+@contextmanager
+def lease_test_displays(arguments, toolchain, build_root, count):
+    """
+    Leases the X displays for the tests from the pool of the
+    persistent X virtual frame buffer servers. Yields the list of
+    the display numbers, or None if the pool isn't used and the
+    tests should be wrapped in xvfb-run instead.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    count -- The number of the displays.
+    """
+    if arguments.enable_xvfb and toolchain.xvfb_server \
+            and xvfb.is_pool_supported():
+        with xvfb.lease_displays(
+            arguments=arguments,
+            toolchain=toolchain,
+            build_root=build_root,
+            count=count
+        ) as displays:
+            yield displays
+    else:
+        yield None
+
+
+def run_tests(
+    arguments,
+    toolchain,
+    host_system,
+    build_root,
+    destination_root,
+    composing_root,
+    shard_env=None,
+    gtest_filter=None
+):
+    """
+    Runs the tests by splitting the test executable into shards
+    that are run in parallel. Every shard has its own X display if
+    the X virtual frame buffer is used. The XML reports of the
+    shards are merged and the slowest tests are reported. This
+    function isn't pure as it runs the tests.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    destination_root -- The directory where the built product is
+    placed in.
+
+    composing_root -- The directory for the actual build of the
+    project.
+
+    shard_env -- An optional function that gives the additional
+    environment variables of the shard with the given index.
+
+    gtest_filter -- An optional googletest filter that selects the
+    tests that are run.
+    """
+    test_executable = get_test_executable(
+        arguments=arguments,
+        host_system=host_system,
+        destination_root=destination_root
+    )
+    results_dir = get_test_results_directory(composing_root)
+    shard_count = arguments.test_shards or arguments.jobs
+
+    if os.path.exists(results_dir):
+        shell.rmtree(
+            results_dir,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+
+    shell.makedirs(
+        results_dir,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+    with lease_test_displays(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        count=shard_count
+    ) as displays:
+        failed_shards = _run_test_shards(
+            arguments=arguments,
+            toolchain=toolchain,
+            test_executable=test_executable,
+            results_dir=results_dir,
+            shard_count=shard_count,
+            displays=displays,
+            shard_env=shard_env,
+            gtest_filter=gtest_filter
+        )
+
+    if arguments.dry_run:
+        return
+
+    reports = []
+
+    for index in range(shard_count):
+        report_path = os.path.join(results_dir, "shard-{}.xml".format(index))
+        if os.path.isfile(report_path):
+            with open(report_path, "rb") as f:
+                reports.append(f.read())
+
+    merged_report = merge_test_reports(reports)
+    merged_path = os.path.join(results_dir, "tests.xml")
+
+    write_test_report(merged_report, merged_path)
+
+    logging.info(
+        "Ran %s tests, the merged report is in %s",
+        merged_report.get("tests"),
+        merged_path
+    )
+
+    slowest = find_slowest_tests(merged_report, 10)
+
+    if slowest:
+        logging.info(
+            "The slowest tests were:\n%s",
+            "\n".join(
+                "{:.3f} s: {}".format(duration, name)
+                for duration, name in slowest
+            )
+        )
+
+    if failed_shards:
+        logging.critical(
+            "The tests failed in the shards %s:\n%s",
+            ", ".join(str(index) for index in sorted(failed_shards)),
+            "\n".join(find_failed_tests(merged_report))
+        )
+        sys.exit(1)
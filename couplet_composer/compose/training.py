@@ -0,0 +1,140 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for running the
+training workloads that the profile-driven optimizations use.
+The workload is either a given command or the installed
+benchmark executables.
+"""
+
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+from ..util import shell
+
+from . import benchmarks, tests
+
+
+def get_training_commands(
+    arguments,
+    host_system,
+    destination_root,
+    training_command
+):
+    """
+    Gives the list of the commands of the training workload. Exits
+    if the workload consists of the benchmarks and none of them is
+    installed.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    destination_root -- The directory where the built product is
+    placed in.
+
+    training_command -- The command given for the training, or None
+    if the benchmarks are run.
+    """
+    if training_command:
+        return [shlex.split(training_command)]
+    executables = benchmarks.find_benchmark_executables(
+        host_system=host_system,
+        destination_root=destination_root
+    )
+    if not executables and not arguments.dry_run:
+        logging.critical(
+            "Couldn't find the benchmark executables for the training "
+            "workload in %s",
+            os.path.join(destination_root, "bin")
+        )
+        sys.exit(1)
+    return [[executable] for executable in executables]
+
+
+def run_training_workload(
+    arguments,
+    toolchain,
+    build_root,
+    destination_root,
+    commands,
+    env=None,
+    wrap=None
+):
+    """
+    Runs the commands of the training workload in the binary
+    directory of the given destination root. The commands are run
+    on an X virtual frame buffer if one is available. Gives the
+    wall time of the workload in seconds. This function isn't pure
+    as it runs the workload.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    destination_root -- The directory where the built product is
+    placed in.
+
+    commands -- The commands of the workload.
+
+    env -- Additional environment variables of the workload.
+
+    wrap -- An optional function that is given the index and the
+    command of the workload and that gives the command that is run.
+    """
+    workload_env = dict(env or {})
+    duration = 0.0
+
+    with tests.lease_test_displays(
+        arguments=arguments,
+        toolchain=toolchain,
+        build_root=build_root,
+        count=1
+    ) as displays:
+        if displays:
+            workload_env.update({
+                "SDL_VIDEODRIVER": "x11",
+                "DISPLAY": ":{}.0".format(displays[0])
+            })
+        for index, command in enumerate(commands):
+            if not displays and arguments.enable_xvfb and toolchain.xvfb:
+                command = [toolchain.xvfb, "-a"] + command
+            if wrap:
+                command = wrap(index, command)
+            logging.info(
+                "Running the training workload %s",
+                shell.quote_command(command)
+            )
+            if arguments.dry_run or arguments.print_debug:
+                shell.echo_command(
+                    command,
+                    env=workload_env,
+                    dry_run=arguments.dry_run
+                )
+            if arguments.dry_run:
+                continue
+            process_env = dict(os.environ)
+            process_env.update(workload_env)
+            start_time = time.time()
+            returncode = subprocess.call(
+                command,
+                env=process_env,
+                cwd=os.path.join(destination_root, "bin")
+            )
+            duration += time.time() - start_time
+            if returncode != 0:
+                logging.critical(
+                    "The training workload ended with status %d",
+                    returncode
+                )
+                sys.exit(returncode)
+
+    return duration
@@ -0,0 +1,338 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions for managing a pool of
+persistent X virtual frame buffer servers. The servers are reused
+between the test runs and leased to the test workers. A watchdog
+process stops the servers that have been idle for too long.
+
+The module can be run as a script to start the watchdog.
+"""
+
+import errno
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ..util import shell
+
+
+def is_pool_supported():
+    """
+    Tells whether the pool of the servers can be used on this
+    system. The state of the pool is locked with the file locks of
+    POSIX.
+    """
+    return fcntl is not None
+
+
+def get_xvfb_pool_state_path(build_root):
+    """
+    Gives the path to the file that contains the state of the pool
+    of the X virtual frame buffer servers.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    return os.path.join(build_root, "xvfb-pool.json")
+
+
+def _get_first_display():
+    """Gives the number of the first display of the pool."""
+    return 99
+
+
+def _get_server_arguments():
+    """Gives the arguments of the X virtual frame buffer servers."""
+    return [
+        "-screen",
+        "0",
+        "1920x1080x24",
+        "+extension",
+        "GLX",
+        "-nolisten",
+        "tcp"
+    ]
+
+
+def _get_display_socket(display):
+    """Gives the path to the socket of the given X display."""
+    return "/tmp/.X11-unix/X{}".format(display)
+
+
+def _get_display_lock(display):
+    """Gives the path to the lock file of the given X display."""
+    return "/tmp/.X{}-lock".format(display)
+
+
+def _is_process_running(pid):
+    """Tells whether a process with the given ID is running."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def _is_server_healthy(display, server):
+    """
+    Tells whether the server of the given display is running and
+    accepts connections.
+    """
+    return _is_process_running(server["pid"]) \
+        and os.path.exists(_get_display_socket(display))
+
+
+@contextmanager
+def _locked_state(build_root):
+    """
+    Locks the state of the pool and yields it. The state is written
+    back when the context is exited.
+    """
+    state_path = get_xvfb_pool_state_path(build_root)
+    with open("{}.lock".format(state_path), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            state = {"servers": {}, "watchdog": None}
+            if os.path.isfile(state_path):
+                with open(state_path) as f:
+                    state = json.load(f)
+            yield state
+            with open(state_path, "w") as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _stop_server(display, server):
+    """Stops the server of the given display."""
+    logging.debug("Stopping the X virtual frame buffer on :%s", display)
+    if _is_process_running(server["pid"]):
+        try:
+            os.kill(server["pid"], signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def _start_server(xvfb, display, dry_run, echo):
+    """
+    Starts a new X virtual frame buffer server on the given display
+    and waits for it to accept connections. Gives the process ID of
+    the server, or None if the server didn't start.
+    """
+    command = [xvfb, ":{}".format(display)] + _get_server_arguments()
+    if dry_run or echo:
+        shell.echo_command(command, dry_run=dry_run)
+    if dry_run:
+        return None
+    # The server is started in its own session so that it outlives
+    # the run of the script.
+    process = subprocess.Popen(
+        command,
+        stdin=shell.get_dev_null(),
+        stdout=shell.get_dev_null(),
+        stderr=shell.get_dev_null(),
+        preexec_fn=os.setsid
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return None
+        if os.path.exists(_get_display_socket(display)):
+            return process.pid
+        time.sleep(0.05)
+    process.kill()
+    return None
+
+
+def _ensure_watchdog(state, build_root, idle_timeout):
+    """
+    Starts the watchdog process that stops the idle servers if it
+    isn't running.
+    """
+    if _is_process_running(state.get("watchdog")):
+        return
+    watchdog = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            __name__,
+            build_root,
+            str(idle_timeout)
+        ],
+        cwd=os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ),
+        stdin=shell.get_dev_null(),
+        stdout=shell.get_dev_null(),
+        stderr=shell.get_dev_null(),
+        preexec_fn=os.setsid
+    )
+    state["watchdog"] = watchdog.pid
+
+
+def _remove_dead_servers(state):
+    """
+    Removes the servers that aren't running anymore from the state
+    and releases the leases of the processes that have exited.
+    """
+    for display, server in list(state["servers"].items()):
+        if not _is_server_healthy(display, server):
+            _stop_server(display, server)
+            del state["servers"][display]
+        elif not _is_process_running(server["lease"]):
+            server["lease"] = None
+
+
+def _find_free_display(state):
+    """Gives the number of a display that isn't used."""
+    display = _get_first_display()
+    while str(display) in state["servers"] \
+            or os.path.exists(_get_display_lock(display)) \
+            or os.path.exists(_get_display_socket(display)):
+        display += 1
+    return display
+
+
+@contextmanager
+def lease_displays(arguments, toolchain, build_root, count):
+    """
+    Leases the given number of X displays from the pool for the
+    duration of the context. The idle healthy servers are reused
+    and new servers are started when needed. Yields the list of the
+    leased display numbers. This function isn't pure as it starts
+    processes and modifies the state of the pool.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    count -- The number of the displays to lease.
+    """
+    if arguments.dry_run:
+        displays = [_get_first_display() + i for i in range(count)]
+        for display in displays:
+            _start_server(
+                toolchain.xvfb_server,
+                display,
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+        yield displays
+        return
+
+    displays = []
+
+    with _locked_state(build_root) as state:
+        _remove_dead_servers(state)
+        for display, server in sorted(
+            state["servers"].items(),
+            key=lambda item: int(item[0])
+        ):
+            if len(displays) == count:
+                break
+            if server["lease"] is None:
+                server["lease"] = os.getpid()
+                displays.append(int(display))
+        logging.debug("Reusing the X displays %s", displays)
+        while len(displays) < count:
+            display = _find_free_display(state)
+            pid = _start_server(
+                toolchain.xvfb_server,
+                display,
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+            if pid is None:
+                logging.critical(
+                    "Couldn't start the X virtual frame buffer on :%s",
+                    display
+                )
+                sys.exit(1)
+            state["servers"][str(display)] = {
+                "pid": pid,
+                "lease": os.getpid(),
+                "last_used": time.time()
+            }
+            displays.append(display)
+        _ensure_watchdog(state, build_root, arguments.xvfb_idle_timeout)
+
+    try:
+        yield displays
+    finally:
+        with _locked_state(build_root) as state:
+            for display in displays:
+                server = state["servers"].get(str(display))
+                if server and server["lease"] == os.getpid():
+                    server["lease"] = None
+                    server["last_used"] = time.time()
+
+
+def stop_xvfb_servers(arguments, build_root):
+    """
+    Stops all of the servers in the pool and the watchdog. This
+    function isn't pure as it stops processes and modifies the
+    state of the pool.
+
+    arguments -- The parsed command line arguments of the run.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    if arguments.dry_run or not is_pool_supported() \
+            or not os.path.isfile(get_xvfb_pool_state_path(build_root)):
+        return
+    with _locked_state(build_root) as state:
+        for display, server in state["servers"].items():
+            _stop_server(display, server)
+        if _is_process_running(state.get("watchdog")):
+            os.kill(state["watchdog"], signal.SIGTERM)
+        logging.info(
+            "Stopped %d X virtual frame buffer servers",
+            len(state["servers"])
+        )
+        state["servers"] = {}
+        state["watchdog"] = None
+
+
+def _watch(build_root, idle_timeout):
+    """
+    Stops the servers that haven't been leased within the idle
+    timeout. Returns when there are no servers left.
+    """
+    while True:
+        time.sleep(max(1.0, min(30.0, idle_timeout / 4.0)))
+        with _locked_state(build_root) as state:
+            if state.get("watchdog") != os.getpid():
+                return
+            _remove_dead_servers(state)
+            now = time.time()
+            for display, server in list(state["servers"].items()):
+                if server["lease"] is None \
+                        and now - server["last_used"] > idle_timeout:
+                    _stop_server(display, server)
+                    del state["servers"][display]
+            if not state["servers"]:
+                state["watchdog"] = None
+                return
+
+
+if __name__ == "__main__":
+    _watch(sys.argv[1], float(sys.argv[2]))
@@ -8,25 +8,40 @@ composing mode of the script.
 
 import logging
 import os
+import shlex
 import stat
 
-from .compose import libraries
+from .compose import \
+    compile_times, coverage, libraries, lint, lto, tests
 
-from .dependencies import googletest
+from .dependencies import googletest, luajit, spdlog
+
+from .support.artefact_formats import get_zip_artefact_format_name
+
+from .support.build_variant import \
+    get_debug_variant_name, get_release_with_debuginfo_variant_name
 
 from .support.cmake_generators import \
     get_ninja_cmake_generator_name, get_visual_studio_16_cmake_generator_name
 
 from .support.environment import \
     get_artefact_directory, get_build_root, get_composing_directory, \
-    get_destination_directory, get_documentation_directory, \
-    get_running_directory, get_temporary_directory
+    get_debug_symbols_directory, get_destination_directory, \
+    get_documentation_directory, get_running_directory
 
 from .support.platform_names import \
     get_darwin_system_name, get_linux_system_name, get_windows_system_name
 
 from .support.project_values import get_scripts_base_directory_name
 
+from .util.elf import find_elf_binaries, is_elf_shared_object
+
+from .util.lto import find_lld_or_gold
+
+from .util.tuning import get_tune_flags
+
+from .util import manifest
+
 from .util import shell
 
 
@@ -35,7 +50,8 @@ def create_composing_root(
     in_tree_build,
     target,
     cmake_generator,
-    build_variant
+    build_variant,
+    build_tag=None
 ):
     """
     Checks if the directory for the actual build of the project
@@ -53,6 +69,9 @@ def create_composing_root(
     cmake_generator -- The CMake generator that is used.
 
     build_variant -- The build variant used to build the project.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
     composing_root = get_composing_directory(
         build_root=get_build_root(
@@ -61,7 +80,8 @@ def create_composing_root(
         ),
         target=target,
         cmake_generator=cmake_generator,
-        build_variant=build_variant
+        build_variant=build_variant,
+        build_tag=build_tag
     )
     if not os.path.exists(composing_root):
         shell.makedirs(path=composing_root)
@@ -74,7 +94,8 @@ def create_destination_root(
     target,
     cmake_generator,
     build_variant,
-    version
+    version,
+    build_tag=None
 ):
     """
     Checks if the directory for the built products of the project
@@ -94,6 +115,9 @@ def create_destination_root(
     build_variant -- The build variant used to build the project.
 
     version -- The version number of the project.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
     destination_root = get_destination_directory(
         build_root=get_build_root(
@@ -103,18 +127,136 @@ def create_destination_root(
         target=target,
         cmake_generator=cmake_generator,
         build_variant=build_variant,
-        version=version
+        version=version,
+        build_tag=build_tag
     )
     if not os.path.exists(destination_root):
         shell.makedirs(path=destination_root)
     return destination_root
 
 
+def _should_split_debug_info(arguments, host_system):
+    """
+    Tells whether the debug information of the project is split
+    from the built objects and binaries.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+    """
+    return arguments.split_debug_info \
+        and host_system == get_linux_system_name() \
+        and arguments.build_variant in [
+            get_debug_variant_name(),
+            get_release_with_debuginfo_variant_name()
+        ]
+
+
+def _create_compiler_flags(arguments, toolchain, host_system, build_root):
+    """
+    Creates the additional compiler and linker flags that are
+    used to build the project. Returns a tuple containing the
+    list of the compiler flags and the list of the linker flags.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    compiler_flags = []
+    linker_flags = []
+    linker = None
+
+    if _should_split_debug_info(arguments=arguments, host_system=host_system):
+        compiler_flags.extend(["-gsplit-dwarf"])
+        # The default BFD linker doesn't support creating the GDB
+        # index so a linker that does is required.
+        gdb_index_linker = find_lld_or_gold()
+        if gdb_index_linker:
+            linker = gdb_index_linker
+            linker_flags.extend([
+                "-fuse-ld={}".format(gdb_index_linker),
+                "-Wl,--gdb-index"
+            ])
+        else:
+            logging.warning(
+                "Neither LLD nor gold was found so the GDB index isn't "
+                "created when linking"
+            )
+
+    if arguments.pgo_instrument:
+        compiler_flags.append("-fprofile-generate")
+        linker_flags.append("-fprofile-generate")
+    elif arguments.pgo_profile:
+        compiler_flags.extend([
+            "-fprofile-use={}".format(os.path.abspath(arguments.pgo_profile)),
+            "-Wno-profile-instr-unprofiled",
+            "-Wno-profile-instr-out-of-date"
+        ])
+        linker_flags.append(
+            "-fprofile-use={}".format(os.path.abspath(arguments.pgo_profile))
+        )
+
+    if arguments.tune:
+        compiler_flags.extend(get_tune_flags(arguments.tune))
+
+    # BOLT can reorder the functions only if the relocations are
+    # kept in the linked binaries.
+    if arguments.bolt and host_system == get_linux_system_name():
+        linker_flags.append("-Wl,--emit-relocs")
+
+    if arguments.lto:
+        lto_compiler_flags, lto_linker_flags = lto.create_lto_flags(
+            arguments=arguments,
+            compiler=toolchain.compiler["cxx"]
+            if isinstance(toolchain.compiler, dict) else toolchain.compiler,
+            host_system=host_system,
+            build_root=build_root,
+            linker=linker
+        )
+        compiler_flags.extend(lto_compiler_flags)
+        linker_flags.extend(lto_linker_flags)
+
+    compiler_flags.extend(shlex.split(arguments.extra_compiler_flags))
+    linker_flags.extend(shlex.split(arguments.extra_linker_flags))
+
+    return compiler_flags, linker_flags
+
+
+def _create_flags_option(variable, environment_variable, flags):
+    """
+    Creates the CMake options that set the given flags variable.
+    The flags are appended to the value of the environment variable
+    that CMake would use for the variable. If there are no flags,
+    the variable is removed from the CMake cache so that CMake
+    initializes it from the environment again instead of keeping
+    the flags of a previous run.
+
+    variable -- The name of the CMake variable.
+
+    environment_variable -- The name of the environment variable
+    that CMake initializes the variable with.
+
+    flags -- The list of the flags that are added.
+    """
+    if not flags:
+        return ["-U{}".format(variable)]
+    return ["-D{}={}".format(
+        variable,
+        " ".join([os.environ.get(environment_variable, "")] + flags).strip()
+    )]
+
+
 def _create_cmake_call(
     toolchain,
     arguments,
     host_system,
     project_root,
+    build_root,
     destination_root,
     dependencies_root
 ):
@@ -131,6 +273,9 @@ def _create_cmake_call(
     project_root -- The root directory of the project this script
     acts on.
 
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
     destination_root -- The directory where the built product is
     placed in.
 
@@ -181,6 +326,12 @@ def _create_cmake_call(
             ) else "OFF"
         ),
         "-DODE_CXX_VERSION={}".format(arguments.std),
+        "-DODE_LUA_BACKEND={}".format(
+            "LuaJIT" if luajit.find_library(
+                dependencies_root=dependencies_root,
+                host_system=host_system
+            ) else "Lua"
+        ),
         "-DODE_DEPENDENCY_PREFIX={}".format(
             dependencies_root.replace("\\", "/")
             if host_system == get_windows_system_name() else dependencies_root
@@ -215,6 +366,35 @@ def _create_cmake_call(
             ["-DCMAKE_MAKE_PROGRAM={}".format(toolchain.build_system)]
         )
 
+    if host_system != get_windows_system_name():
+        compiler_flags, linker_flags = _create_compiler_flags(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=host_system,
+            build_root=build_root
+        )
+        spdlog_library = spdlog.find_compiled_library(
+            dependencies_root=dependencies_root
+        )
+        if spdlog_library:
+            compiler_flags.append("-DSPDLOG_COMPILED_LIB")
+        # The library is always set so that the library of an earlier
+        # build with the compiled spdlog doesn't stay in the cache.
+        cmake_call.extend([
+            "-DCMAKE_CXX_STANDARD_LIBRARIES={}".format(spdlog_library or "")
+        ])
+        for variable, environment_variable, flags in [
+            ("CMAKE_C_FLAGS", "CFLAGS", compiler_flags),
+            ("CMAKE_CXX_FLAGS", "CXXFLAGS", compiler_flags),
+            ("CMAKE_EXE_LINKER_FLAGS", "LDFLAGS", linker_flags),
+            ("CMAKE_SHARED_LINKER_FLAGS", "LDFLAGS", linker_flags)
+        ]:
+            cmake_call.extend(_create_flags_option(
+                variable=variable,
+                environment_variable=environment_variable,
+                flags=flags
+            ))
+
     if host_system == get_darwin_system_name():
         cmake_call.extend(["-DODE_RPATH=@loader_path"])
     elif host_system == get_linux_system_name():
@@ -245,6 +425,10 @@ def _create_cmake_call(
                 "Couplet Composer should perform linting, but clang-tidy "
                 "wasn't found"
             )
+    elif arguments.coverage or arguments.affected_tests:
+        # The coverage reports and the selection of the affected tests
+        # find the sources from the compilation database.
+        cmake_call.extend(["-DCMAKE_EXPORT_COMPILE_COMMANDS=ON"])
     else:
         cmake_call.extend(["-DCMAKE_EXPORT_COMPILE_COMMANDS=OFF"])
 
@@ -301,6 +485,7 @@ def compose_project(
         arguments=arguments,
         host_system=host_system,
         project_root=project_root,
+        build_root=build_root,
         destination_root=destination_root,
         dependencies_root=dependencies_root
     )
@@ -324,44 +509,12 @@ def compose_project(
             echo=arguments.print_debug
         )
         if arguments.lint and toolchain.linter:
-            run_clang_tidy = os.path.join(
-                os.path.dirname(__file__),
-                "llvm",
-                "run-clang-tidy.py"
-            )
-            shell.chmod(
-                run_clang_tidy,
-                stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH,
-                dry_run=arguments.dry_run,
-                echo=arguments.print_debug
-            )
-            clang_tidy_call = [
-                run_clang_tidy,
-                "-clang-tidy-binary",
-                toolchain.linter,
-                "-j",
-                str(arguments.jobs)
-            ]
-            if arguments.export_linter_fixes:
-                if toolchain.linter_replacements:
-                    clang_tidy_call.extend([
-                        "-clang-apply-replacements-binary",
-                        toolchain.linter_replacements,
-                        "-export-fixes",
-                        os.path.join(
-                            source_root,
-                            arguments.export_linter_fixes
-                        )
-                    ])
-                else:
-                    logging.warning(
-                        "Couplet Composer should export diagnostics from "
-                        "clang-tidy, but clang-apply-replacements wasn't found"
-                    )
-            shell.call(
-                clang_tidy_call,
-                dry_run=arguments.dry_run,
-                echo=arguments.print_debug
+            lint.lint_project(
+                arguments=arguments,
+                toolchain=toolchain,
+                source_root=source_root,
+                project_root=project_root,
+                composing_root=composing_root
             )
         if arguments.skip_build:
             return
@@ -448,12 +601,61 @@ def compose_project(
                 dry_run=arguments.dry_run,
                 echo=arguments.print_debug
             )
+            if arguments.cmake_generator \
+                    == get_ninja_cmake_generator_name():
+                lto.report_link_times(
+                    arguments=arguments,
+                    composing_root=composing_root
+                )
+                compile_times.report_compile_times(
+                    arguments=arguments,
+                    composing_root=composing_root,
+                    configuration="{} spdlog".format(
+                        "compiled" if spdlog.find_compiled_library(
+                            dependencies_root=dependencies_root
+                        ) else "header-only"
+                    )
+                )
             shell.call(
                 [toolchain.build_system, "install"],
                 dry_run=arguments.dry_run,
                 echo=arguments.print_debug
             )
-            if arguments.coverage:
+            if coverage.should_run_coverage(
+                arguments=arguments,
+                toolchain=toolchain
+            ):
+                # The tests are run next to the installed test
+                # executable so the scripts and the libraries they
+                # need are copied there first.
+                test_directory = os.path.dirname(tests.get_test_executable(
+                    arguments=arguments,
+                    host_system=host_system,
+                    destination_root=destination_root
+                ))
+                libraries.copy_scripts(
+                    path=test_directory,
+                    arguments=arguments,
+                    project_root=project_root
+                )
+                libraries.copy_sdl_libraries(
+                    path=test_directory,
+                    arguments=arguments,
+                    host_system=host_system,
+                    source_root=source_root,
+                    project_root=project_root,
+                    dependencies_root=dependencies_root
+                )
+                coverage.run_coverage(
+                    arguments=arguments,
+                    toolchain=toolchain,
+                    host_system=host_system,
+                    project_root=project_root,
+                    build_root=build_root,
+                    destination_root=destination_root,
+                    composing_root=composing_root
+                )
+            elif arguments.coverage:
                 libraries.copy_scripts(
                     path=composing_root,
                     arguments=arguments,
@@ -463,37 +665,53 @@ def compose_project(
                     path=composing_root,
                     arguments=arguments,
                     host_system=host_system,
+                    source_root=source_root,
                     project_root=project_root,
                     dependencies_root=dependencies_root
                 )
-                coverage_env = {}
-                coverage_call = []
-                if arguments.enable_xvfb:
-                    coverage_env.update({"SDL_VIDEODRIVER": "x11"})
-                    coverage_env.update({"DISPLAY": ":99.0"})
-                    coverage_call.extend([
-                        toolchain.xvfb,
-                        "-n",
-                        "99",
-                        "--server-args",
-                        "-screen 0 1920x1080x24 +extension GLX",
-                        "-e",
-                        "/dev/stdout"
-                    ])
-                coverage_call.extend([
+                coverage_call = [
                     toolchain.build_system,
                     "{}_coverage".format(arguments.anthem_binaries_name)
-                ])
-                shell.call(
-                    coverage_call,
-                    env=coverage_env,
-                    dry_run=arguments.dry_run,
-                    echo=arguments.print_debug
-                )
+                ]
+                with tests.lease_test_displays(
+                    arguments=arguments,
+                    toolchain=toolchain,
+                    build_root=build_root,
+                    count=1
+                ) as displays:
+                    coverage_env = {}
+                    if arguments.enable_xvfb:
+                        coverage_env.update({"SDL_VIDEODRIVER": "x11"})
+                    if displays:
+                        coverage_env.update({
+                            "DISPLAY": ":{}.0".format(displays[0])
+                        })
+                    elif arguments.enable_xvfb:
+                        coverage_env.update({"DISPLAY": ":99.0"})
+                        coverage_call = [
+                            toolchain.xvfb,
+                            "-n",
+                            "99",
+                            "--server-args",
+                            "-screen 0 1920x1080x24 +extension GLX",
+                            "-e",
+                            "/dev/stdout"
+                        ] + coverage_call
+                    shell.call(
+                        coverage_call,
+                        env=coverage_env,
+                        dry_run=arguments.dry_run,
+                        echo=arguments.print_debug
+                    )
 
-    shell.copytree(
+    # The directory contains the installed binaries so the files
+    # that aren't in the utility scripts mustn't be removed.
+    shell.sync(
         os.path.join(project_root, "util", "bin"),
         os.path.join(destination_root, "bin"),
+        checksum=arguments.sync_checksum,
+        delete=False,
+        jobs=arguments.jobs,
         dry_run=arguments.dry_run,
         echo=arguments.print_debug
     )
@@ -535,34 +753,19 @@ def install_running_copies(arguments, build_root, destination_root):
     destination_root -- The directory where the built product is
     placed in.
     """
-    running_path = get_running_directory(build_root=build_root)
-
-    if os.path.exists(running_path):
-        shell.rmtree(
-            running_path,
-            dry_run=arguments.dry_run,
-            echo=arguments.print_debug
-        )
-
-    shell.makedirs(
-        running_path,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
+    running_path = get_running_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
     )
-    shell.copytree(
-        os.path.join(destination_root, "bin"),
+
+    shell.sync(
+        [
+            (os.path.join(destination_root, "bin"), os.curdir),
+            (os.path.join(destination_root, "lib"), "lib")
+        ],
         running_path,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.makedirs(
-        os.path.join(running_path, "lib"),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.copytree(
-        os.path.join(destination_root, "lib"),
-        os.path.join(running_path, "lib"),
+        checksum=arguments.sync_checksum,
+        jobs=arguments.jobs,
         dry_run=arguments.dry_run,
         echo=arguments.print_debug
     )
@@ -580,53 +783,271 @@ def install_documentation(arguments, build_root, composing_root):
     composing_root -- The directory for the actual build of the
     project.
     """
-    docs_path = get_documentation_directory(build_root=build_root)
+    docs_path = get_documentation_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    )
     html_path = os.path.join(docs_path, "html")
 
-    if os.path.exists(html_path):
+    shell.sync(
+        os.path.join(composing_root, "docs", "doxygen", "html"),
+        html_path,
+        checksum=arguments.sync_checksum,
+        jobs=arguments.jobs,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
+    )
+
+
+def separate_debug_symbols(arguments, toolchain, host_system, build_root):
+    """
+    Separates the debug symbols from the binaries in the running
+    directory to the directory of the debug symbols. The binaries
+    in the running directory are left with a debug link to the
+    separated symbols.
+
+    arguments -- The parsed command line arguments of the run.
+
+    toolchain -- The toolchain object of the run.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+    """
+    if not _should_split_debug_info(
+        arguments=arguments,
+        host_system=host_system
+    ):
+        logging.warning(
+            "The debug symbols can be separated only from the %s and %s "
+            "builds on Linux",
+            get_debug_variant_name(),
+            get_release_with_debuginfo_variant_name()
+        )
+        return
+
+    if not toolchain.objcopy:
+        logging.warning(
+            "Couplet Composer should separate the debug symbols, but objcopy "
+            "wasn't found"
+        )
+        return
+
+    if not toolchain.dwp:
+        logging.warning(
+            "The DWARF packaging utility wasn't found so the split DWARF "
+            "objects aren't included in the debug symbols"
+        )
+
+    running_path = get_running_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    )
+    debug_path = get_debug_symbols_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    )
+
+    if os.path.exists(debug_path):
         shell.rmtree(
-            html_path,
+            debug_path,
             dry_run=arguments.dry_run,
             echo=arguments.print_debug
         )
 
     shell.makedirs(
-        html_path,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
-    )
-    shell.copytree(
-        os.path.join(composing_root, "docs", "doxygen", "html"),
-        html_path,
+        debug_path,
         dry_run=arguments.dry_run,
         echo=arguments.print_debug
     )
 
+    for binary in find_elf_binaries(running_path):
+        debug_file = "{}.debug".format(
+            os.path.join(debug_path, os.path.relpath(binary, running_path))
+        )
+        shell.makedirs(
+            os.path.dirname(debug_file),
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        # The split DWARF objects must be packaged before the
+        # skeleton debug information is stripped from the binary.
+        if toolchain.dwp:
+            shell.call(
+                [
+                    toolchain.dwp,
+                    "-e",
+                    binary,
+                    "-o",
+                    "{}.dwp".format(os.path.splitext(debug_file)[0])
+                ],
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+        shell.call(
+            [toolchain.objcopy, "--only-keep-debug", binary, debug_file],
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+        shell.call(
+            [
+                toolchain.objcopy,
+                "--strip-debug",
+                "--add-gnu-debuglink={}".format(debug_file),
+                binary
+            ],
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+
 
-def create_artefacts(arguments, host_system, build_root):
+def strip_binaries(arguments, toolchain, host_system, build_root):
     """
-    Creates the artefacts of the built products.
+    Strips the symbols from the ELF binaries in the running
+    directory in parallel and reports the size savings.
 
     arguments -- The parsed command line arguments of the run.
 
+    toolchain -- The toolchain object of the run.
+
     host_system -- The system this script is run on.
 
     build_root -- The path to the root directory that is used for
     all created files and directories.
     """
-    artefact_base_name = "{}-{}-{}".format(
-        arguments.anthem_artefacts_name,
-        arguments.anthem_version,
-        arguments.host_target
+    if host_system != get_linux_system_name():
+        logging.warning("The binaries can be stripped only on Linux")
+        return
+
+    if not toolchain.objcopy:
+        logging.warning(
+            "Couplet Composer should strip the binaries, but objcopy wasn't "
+            "found"
+        )
+        return
+
+    binaries = find_elf_binaries(get_running_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    ))
+    sizes = {binary: os.path.getsize(binary) for binary in binaries}
+    commands = []
+
+    for binary in binaries:
+        # The dynamic symbols of the shared objects must be kept.
+        command = [
+            toolchain.objcopy,
+            "--strip-unneeded" if is_elf_shared_object(binary)
+            else "--strip-all"
+        ]
+        if not arguments.keep_debug_links:
+            command.append("--remove-section=.gnu_debuglink")
+        commands.append(command + [binary])
+
+    shell.call_parallel(
+        commands,
+        jobs=arguments.jobs,
+        dry_run=arguments.dry_run,
+        echo=arguments.print_debug
     )
 
-    use_dir = arguments.use_artefact_directory
-    artefact_name = artefact_base_name if use_dir else "{}.{}".format(
-        artefact_base_name,
-        "zip" if host_system == get_windows_system_name() else "tar.gz"
+    if arguments.dry_run:
+        return
+
+    total_before = 0
+    total_after = 0
+
+    for binary in binaries:
+        before = sizes[binary]
+        after = os.path.getsize(binary)
+        total_before += before
+        total_after += after
+        logging.info(
+            "Stripped %s from %d to %d bytes (%.1f %% smaller)",
+            os.path.relpath(binary, get_running_directory(
+                build_root,
+                arguments.build_tag
+            )),
+            before,
+            after,
+            100.0 * (before - after) / before if before else 0.0
+        )
+
+    logging.info(
+        "Stripped %d binaries from %d to %d bytes in total (%.1f %% smaller)",
+        len(binaries),
+        total_before,
+        total_after,
+        100.0 * (total_before - total_after) / total_before
+        if total_before else 0.0
     )
-    artefact_dir = get_artefact_directory(build_root=build_root)
-    artefact_path = os.path.join(artefact_dir, artefact_name)
+
+
+def _get_source_date_epoch(arguments, project_root):
+    """
+    Gives the timestamp that is used for the entries of the
+    reproducible artefacts. The timestamp is read from the
+    environment variable 'SOURCE_DATE_EPOCH' or, if it isn't set,
+    from the latest commit of the project. This function isn't pure
+    as it reads the environment and runs Git.
+
+    arguments -- The parsed command line arguments of the run.
+
+    project_root -- The root directory of the project.
+    """
+    if "SOURCE_DATE_EPOCH" in os.environ:
+        return int(os.environ["SOURCE_DATE_EPOCH"])
+
+    commit_time = None
+
+    if os.path.isdir(project_root):
+        commit_time = shell.capture(
+            ["git", "-C", project_root, "log", "-1", "--format=%ct"],
+            stderr=shell.get_dev_null(),
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug,
+            optional=True
+        )
+
+    if commit_time and commit_time.strip().isdigit():
+        return int(commit_time.strip())
+
+    logging.warning(
+        "Couldn't resolve the time of the latest commit of the project, "
+        "using 1 January 1980 as the time of the artefact entries"
+    )
+
+    return 315532800
+
+
+def _create_artefact(
+    src,
+    artefact_path,
+    arguments,
+    host_system,
+    mtime,
+    files=None
+):
+    """
+    Creates an artefact from the given directory by archiving it
+    directly or by copying it to the artefact directory. The
+    previous artefact is replaced.
+
+    src -- The directory from which the artefact is created.
+
+    artefact_path -- The path to the created artefact.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    mtime -- The timestamp of the entries in the archive.
+
+    files -- The paths of the files relative to the given directory
+    that are put to the artefact instead of the whole directory.
+    """
+    use_dir = arguments.use_artefact_directory
 
     if os.path.exists(artefact_path):
         if use_dir:
@@ -642,71 +1063,239 @@ def create_artefacts(arguments, host_system, build_root):
                 echo=arguments.print_debug
             )
 
-    shell.makedirs(
-        artefact_dir,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
+    # The archives are created directly from the given directory
+    # without a staging copy. The artefact directory is never
+    # modified so the files are hard linked when possible.
+    if use_dir and files is None:
+        shell.copytree(
+            src,
+            artefact_path,
+            hardlink=True,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+    elif use_dir:
+        for name in files:
+            shell.makedirs(
+                os.path.dirname(os.path.join(artefact_path, name)),
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+            shell.copy(
+                os.path.join(src, name),
+                os.path.join(artefact_path, name),
+                hardlink=True,
+                dry_run=arguments.dry_run,
+                echo=arguments.print_debug
+            )
+    elif arguments.artefact_format == get_zip_artefact_format_name():
+        shell.create_zip(
+            src,
+            artefact_path,
+            level=arguments.artefact_compression_level,
+            mtime=mtime,
+            files=files,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+    else:
+        shell.create_tar(
+            src,
+            artefact_path,
+            compression=arguments.artefact_format.split(".")[-1],
+            level=arguments.artefact_compression_level,
+            jobs=arguments.jobs,
+            mtime=mtime,
+            files=files,
+            dry_run=arguments.dry_run,
+            echo=arguments.print_debug
+        )
+
+
+def _write_artefact_manifest(src, artefact_path, arguments):
+    """
+    Writes the manifest of the file hashes next to the given
+    artefact. Gives the created manifest.
+
+    src -- The directory from which the artefact is created.
+
+    artefact_path -- The path to the created artefact.
+
+    arguments -- The parsed command line arguments of the run.
+    """
+    if arguments.dry_run:
+        return None
+
+    artefact_manifest = manifest.create_manifest(src)
+
+    manifest.write_manifest(
+        artefact_manifest,
+        manifest.get_manifest_path(artefact_path)
+    )
+
+    return artefact_manifest
+
+
+def _create_delta_artefact(
+    src,
+    artefact_path,
+    artefact_manifest,
+    arguments,
+    host_system,
+    mtime
+):
+    """
+    Creates an artefact that contains only the files that are
+    changed since the previous artefact given by
+    '--artefact-delta-base'. The files that are removed since the
+    previous artefact are listed in the manifest of the delta
+    artefact.
+
+    src -- The directory from which the artefact is created.
+
+    artefact_path -- The path to the created delta artefact.
+
+    artefact_manifest -- The manifest of the full artefact.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    mtime -- The timestamp of the entries in the archive.
+    """
+    base = arguments.artefact_delta_base
+
+    if not os.path.exists(base):
+        logging.warning(
+            "The base of the delta artefact %s doesn't exist, skipping the "
+            "delta artefact",
+            base
+        )
+        return
+
+    changed, removed = manifest.compare_manifests(
+        manifest.read_manifest(base),
+        artefact_manifest
+    )
+
+    logging.info(
+        "The delta artefact has %d changed and %d removed files",
+        len(changed),
+        len(removed)
+    )
+
+    _create_artefact(
+        src=src,
+        artefact_path=artefact_path,
+        arguments=arguments,
+        host_system=host_system,
+        mtime=mtime,
+        files=[os.path.normpath(name) for name in changed]
     )
 
-    tmp_dir = get_temporary_directory(build_root=build_root)
-    tmp_subdir = "{}-{}-{}".format(
+    manifest.write_manifest(
+        {
+            "version": artefact_manifest["version"],
+            "files": {
+                name: artefact_manifest["files"][name] for name in changed
+            },
+            "removed": removed
+        },
+        manifest.get_manifest_path(artefact_path)
+    )
+
+
+def create_artefacts(arguments, host_system, build_root, project_root):
+    """
+    Creates the artefacts of the built products. The archives are
+    reproducible and a manifest of the file hashes is written next
+    to each artefact.
+
+    arguments -- The parsed command line arguments of the run.
+
+    host_system -- The system this script is run on.
+
+    build_root -- The path to the root directory that is used for
+    all created files and directories.
+
+    project_root -- The root directory of the project.
+    """
+    artefact_base_name = "{}-{}-{}".format(
         arguments.anthem_artefacts_name,
         arguments.anthem_version,
         arguments.host_target
     )
 
-    if os.path.exists(tmp_dir):
-        shell.rmtree(
-            tmp_dir,
-            dry_run=arguments.dry_run,
-            echo=arguments.print_debug
-        )
+    artefact_dir = get_artefact_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    )
+
+    def _artefact_path(base_name):
+        if arguments.use_artefact_directory:
+            return os.path.join(artefact_dir, base_name)
+        return os.path.join(artefact_dir, "{}.{}".format(
+            base_name,
+            arguments.artefact_format
+        ))
 
     shell.makedirs(
-        tmp_dir,
+        artefact_dir,
         dry_run=arguments.dry_run,
         echo=arguments.print_debug
     )
-    shell.makedirs(
-        os.path.join(tmp_dir, tmp_subdir),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
+
+    mtime = _get_source_date_epoch(
+        arguments=arguments,
+        project_root=project_root
     )
 
-    running_path = get_running_directory(build_root=build_root)
+    running_dir = get_running_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
+    )
 
-    shell.copytree(
-        running_path,
-        os.path.join(tmp_dir, tmp_subdir),
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
+    _create_artefact(
+        src=running_dir,
+        artefact_path=_artefact_path(artefact_base_name),
+        arguments=arguments,
+        host_system=host_system,
+        mtime=mtime
     )
 
-    if use_dir:
-        shell.copytree(
-            os.path.join(tmp_dir, tmp_subdir),
-            artefact_path,
-            dry_run=arguments.dry_run,
-            echo=arguments.print_debug
+    artefact_manifest = _write_artefact_manifest(
+        src=running_dir,
+        artefact_path=_artefact_path(artefact_base_name),
+        arguments=arguments
+    )
+
+    if arguments.artefact_delta_base and artefact_manifest:
+        _create_delta_artefact(
+            src=running_dir,
+            artefact_path=_artefact_path(
+                "{}-delta".format(artefact_base_name)
+            ),
+            artefact_manifest=artefact_manifest,
+            arguments=arguments,
+            host_system=host_system,
+            mtime=mtime
         )
-    else:
-        if host_system == get_windows_system_name():
-            shell.create_zip(
-                os.path.join(tmp_dir, tmp_subdir),
-                artefact_path,
-                dry_run=arguments.dry_run,
-                echo=arguments.print_debug
-            )
-        else:
-            shell.create_tar(
-                os.path.join(tmp_dir, tmp_subdir),
-                artefact_path,
-                dry_run=arguments.dry_run,
-                echo=arguments.print_debug
-            )
 
-    shell.rmtree(
-        tmp_dir,
-        dry_run=arguments.dry_run,
-        echo=arguments.print_debug
+    debug_path = get_debug_symbols_directory(
+        build_root=build_root,
+        build_tag=arguments.build_tag
     )
+
+    if _should_split_debug_info(
+        arguments=arguments,
+        host_system=host_system
+    ) and os.path.isdir(debug_path):
+        _create_artefact(
+            src=debug_path,
+            artefact_path=_artefact_path(
+                "{}-debug".format(artefact_base_name)
+            ),
+            arguments=arguments,
+            host_system=host_system,
+            mtime=mtime
+        )
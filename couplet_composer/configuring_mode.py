@@ -59,7 +59,8 @@ def create_dependencies_root(
     source_root,
     in_tree_build,
     target,
-    build_variant
+    build_variant,
+    tune=None
 ):
     """
     Checks if the directory for the dependencies exists and
@@ -75,6 +76,8 @@ def create_dependencies_root(
     Target.
 
     build_variant -- The build variant used to build the project.
+
+    tune -- The optional CPU the dependencies are tuned for.
     """
     dependencies_root = get_dependencies_directory(
         build_root=get_build_root(
@@ -82,7 +85,8 @@ def create_dependencies_root(
             in_tree_build=in_tree_build
         ),
         target=target,
-        build_variant=build_variant
+        build_variant=build_variant,
+        tune=tune
     )
     if not os.path.exists(dependencies_root):
         shell.makedirs(path=dependencies_root)
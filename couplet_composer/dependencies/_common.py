@@ -6,10 +6,23 @@ This support module contains the common functions related to the
 building and finding dependencies.
 """
 
+import json
+import logging
 import os
+import shlex
+
+from ..support.platform_names import get_windows_system_name
 
 from ..util.cache import cached
 
+from ..util.dependency_store import get_store_entry_name
+
+from ..util.lto import find_lto_archivers, get_lto_flags
+
+from ..util.tuning import get_tune_flags
+
+from ..util import shell
+
 
 @cached
 def should_install(path, dependencies_root, version, installed_version):
@@ -32,3 +45,247 @@ def should_install(path, dependencies_root, version, installed_version):
         return True
 
     return not os.path.exists(os.path.join(dependencies_root, path))
+
+
+def get_c_compiler(toolchain):
+    """
+    Gives the C compiler of the toolchain.
+
+    toolchain -- The toolchain object of the run.
+    """
+    if isinstance(toolchain.compiler, dict):
+        return toolchain.compiler["cc"]
+    return toolchain.compiler
+
+
+def get_compiler_flags(install_info):
+    """
+    Gives the list of the additional compiler flags of the
+    dependency for the link-time optimization, the tuning for a
+    CPU, and the configuration profile.
+
+    install_info -- The object containing the install information
+    for the dependency.
+    """
+    if install_info.host_system == get_windows_system_name():
+        return []
+    flags = []
+    if install_info.lto:
+        flags.extend(get_lto_flags(
+            install_info.lto,
+            get_c_compiler(install_info.toolchain)
+        ))
+    if install_info.tune:
+        flags.extend(get_tune_flags(install_info.tune))
+    flags.extend(shlex.split(install_info.profile.get("compilerFlags", "")))
+    return flags
+
+
+def create_build_variables(install_info):
+    """
+    Creates the variables that pass the additional compiler flags
+    to the build scripts of the dependency. Gives a dictionary that
+    contains the C compiler, its flags, the linker flags, and the
+    archiver and the index generator that understand the
+    intermediate code of the link-time optimization, or None if
+    there are no additional flags. This function isn't pure as it
+    looks for the tools from the system.
+
+    install_info -- The object containing the install information
+    for the dependency.
+    """
+    flags = get_compiler_flags(install_info)
+    if not flags:
+        return None
+    compiler = get_c_compiler(install_info.toolchain)
+    variables = {
+        "CC": compiler,
+        "CFLAGS": " ".join(flags),
+        "LDFLAGS": " ".join(flags)
+    }
+    archivers = find_lto_archivers(compiler) if install_info.lto else None
+    if archivers:
+        variables.update({"AR": archivers[0], "RANLIB": archivers[1]})
+    return variables
+
+
+def create_cmake_options(install_info, cmake_options=None):
+    """
+    Creates the CMake options of the dependency that include the
+    additional compiler flags. This function isn't pure as it
+    looks for the tools from the system.
+
+    install_info -- The object containing the install information
+    for the dependency.
+
+    cmake_options -- The other CMake options of the dependency.
+    """
+    options = dict(cmake_options or {})
+    variables = create_build_variables(install_info)
+    if variables:
+        options.update({
+            "CMAKE_C_FLAGS": variables["CFLAGS"],
+            "CMAKE_CXX_FLAGS": variables["CFLAGS"],
+            "CMAKE_EXE_LINKER_FLAGS": variables["LDFLAGS"],
+            "CMAKE_SHARED_LINKER_FLAGS": variables["LDFLAGS"]
+        })
+        if "AR" in variables:
+            options.update({
+                "CMAKE_AR": variables["AR"],
+                "CMAKE_RANLIB": variables["RANLIB"]
+            })
+    return options or None
+
+
+def get_lua_library_path(dependencies_root, host_system, jit=False):
+    """
+    Gives the path to the static library of the Lua backend.
+
+    dependencies_root -- The root directory of the dependencies
+    for the current build target.
+
+    host_system -- The system this script is run on.
+
+    jit -- Whether the path of LuaJIT is given instead of the path
+    of the reference implementation of Lua.
+    """
+    name = "luajit" if jit else "lua"
+    if host_system == get_windows_system_name():
+        return os.path.join(dependencies_root, "lib", "{}.lib".format(name))
+    return os.path.join(dependencies_root, "lib", "lib{}.a".format(name))
+
+
+def remove_lua_backends(dependencies_root, host_system, dry_run, print_debug):
+    """
+    Removes the libraries of the installed Lua backends and the
+    header of LuaJIT so that the backend that is installed next is
+    the only one in the root directory of the dependencies and the
+    other one is reinstalled if it's selected again.
+
+    dependencies_root -- The root directory of the dependencies
+    for the current build target.
+
+    host_system -- The system this script is run on.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    for path in [
+        get_lua_library_path(dependencies_root, host_system),
+        get_lua_library_path(dependencies_root, host_system, jit=True),
+        os.path.join(dependencies_root, "include", "luajit.h")
+    ]:
+        if os.path.exists(path):
+            shell.rm(path, dry_run=dry_run, echo=print_debug)
+
+
+def _remove_path(path, dry_run, print_debug):
+    """Removes the given file or directory if it exists."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shell.rmtree(path, dry_run=dry_run, echo=print_debug)
+    elif os.path.lexists(path):
+        shell.rm(path, dry_run=dry_run, echo=print_debug)
+
+
+def install_into_shared_store(
+    install_info,
+    name,
+    install,
+    paths,
+    values=None,
+    dry_run=None,
+    print_debug=None
+):
+    """
+    Installs a dependency that doesn't depend on the build variant
+    into the shared store unless it's already there, and links the
+    installed files to the root directory of the dependencies of
+    the build. The dependency is installed directly into the root
+    directory if the shared store isn't used.
+
+    install_info -- The object containing the install information
+    for the dependency.
+
+    name -- The name of the directory of the dependency in the
+    shared store.
+
+    install -- The function that installs the dependency into the
+    root directory given in the install information.
+
+    paths -- The relative paths of the installed files and
+    directories that are linked to the root directory of the
+    dependencies.
+
+    values -- The other values than the version and the
+    configuration profile that the installed files depend on.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    if not install_info.shared_root:
+        # The files may still be hard linked to the shared store by
+        # an earlier run, and the store must not be written through
+        # them.
+        for path in paths:
+            _remove_path(
+                os.path.join(install_info.dependencies_root, path),
+                dry_run=dry_run,
+                print_debug=print_debug
+            )
+        install(install_info)
+        return
+
+    entry = os.path.join(
+        install_info.shared_root,
+        name,
+        get_store_entry_name(
+            install_info.version,
+            [json.dumps(install_info.profile, sort_keys=True)]
+            + list(values or [])
+        )
+    )
+    marker = os.path.join(entry, ".complete")
+
+    if os.path.isfile(marker):
+        logging.info("Using %s from the shared store %s", name, entry)
+    else:
+        if os.path.isdir(entry):
+            shell.rmtree(entry, dry_run=dry_run, echo=print_debug)
+        shell.makedirs(entry, dry_run=dry_run, echo=print_debug)
+        install(install_info._replace(dependencies_root=entry))
+        if not dry_run:
+            with open(marker, "w") as f:
+                f.write("{}\n".format(install_info.version))
+
+    # The files are hard linked as they are never modified after
+    # the installation.
+    for path in paths:
+        source = os.path.join(entry, path)
+        destination = os.path.join(install_info.dependencies_root, path)
+        _remove_path(destination, dry_run=dry_run, print_debug=print_debug)
+        if not os.path.isdir(os.path.dirname(destination)):
+            shell.makedirs(
+                os.path.dirname(destination),
+                dry_run=dry_run,
+                echo=print_debug
+            )
+        if os.path.isdir(source):
+            shell.copytree(
+                source,
+                destination,
+                hardlink=True,
+                dry_run=dry_run,
+                echo=print_debug
+            )
+        else:
+            shell.copy(
+                source,
+                destination,
+                hardlink=True,
+                dry_run=dry_run,
+                echo=print_debug
+            )
@@ -26,6 +26,8 @@ from ..util.cache import cached
 
 from ..util import shell
 
+from . import _common
+
 
 ################################################################
 # DEPENDENCY DATA FUNCTIONS
@@ -125,7 +127,10 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
         target=install_info.target,
         host_system=install_info.host_system,
         build_variant=install_info.build_variant,
-        cmake_options={"BENCHMARK_ENABLE_GTEST_TESTS": False},
+        cmake_options=_common.create_cmake_options(
+            install_info,
+            {"BENCHMARK_ENABLE_GTEST_TESTS": False}
+        ),
         msbuild_target="ALL_BUILD.vcxproj",
         dry_run=dry_run,
         print_debug=print_debug
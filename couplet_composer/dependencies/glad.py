@@ -9,6 +9,8 @@ building and finding Glad.
 import os
 import sys
 
+from functools import partial
+
 from ..github import tag
 
 from ..support.environment import get_temporary_directory
@@ -60,18 +62,10 @@ def should_install(
     )
 
 
-def install_dependency(install_info, dry_run=None, print_debug=None):
+def _install(install_info, dry_run=None, print_debug=None):
     """
-    Installs the dependency by downloading and possibly building
-    it. Returns the path to the built dependency.
-
-    install_info -- The object containing the install information
-    for this tool.
-
-    dry_run -- Whether the commands are only printed instead of
-    running them.
-
-    print_debug -- Whether debug output should be printed.
+    Installs the dependency into the root directory given in the
+    install information.
     """
     temp_dir = get_temporary_directory(build_root=install_info.build_root)
 
@@ -101,7 +95,9 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
                 "glad",
                 "--profile=core",
                 "--api=gl={}".format(install_info.opengl_version),
-                "--generator=c-debug",
+                "--generator={}".format(
+                    install_info.profile.get("generator", "c-debug")
+                ),
                 "--spec=gl",
                 "--out-path={}".format(install_info.dependencies_root)
             ],
@@ -110,3 +106,31 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
         )
 
     shell.rmtree(temp_dir, dry_run=dry_run, echo=print_debug)
+
+
+def install_dependency(install_info, dry_run=None, print_debug=None):
+    """
+    Installs the dependency by downloading and possibly building
+    it. Returns the path to the built dependency.
+
+    install_info -- The object containing the install information
+    for this tool.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    _common.install_into_shared_store(
+        install_info=install_info,
+        name="glad",
+        install=partial(_install, dry_run=dry_run, print_debug=print_debug),
+        paths=[
+            os.path.join("include", "glad"),
+            os.path.join("include", "KHR"),
+            os.path.join("src", "glad.c")
+        ],
+        values=[install_info.opengl_version],
+        dry_run=dry_run,
+        print_debug=print_debug
+    )
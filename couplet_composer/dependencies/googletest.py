@@ -26,6 +26,8 @@ from ..util.cache import cached
 
 from ..util import shell
 
+from . import _common
+
 
 @cached
 def should_add_sources_to_project(host_system):
@@ -131,6 +133,7 @@ def _build(
     target,
     host_system,
     build_variant,
+    cmake_options=None,
     dry_run=None,
     print_debug=None
 ):
@@ -159,6 +162,8 @@ def _build(
 
     build_variant -- The build variant used to build the project.
 
+    cmake_options -- Additional options passed to CMake.
+
     dry_run -- Whether the commands are only printed instead of
     running them.
 
@@ -173,7 +178,7 @@ def _build(
         target=target,
         host_system=host_system,
         build_variant=build_variant,
-        cmake_options={"BUILD_GMOCK": False},
+        cmake_options=dict(cmake_options or {}, BUILD_GMOCK=False),
         msbuild_target="ALL_BUILD.vcxproj",
         dry_run=dry_run,
         print_debug=print_debug
@@ -339,6 +344,7 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
             target=install_info.target,
             host_system=install_info.host_system,
             build_variant=install_info.build_variant,
+            cmake_options=_common.create_cmake_options(install_info),
             dry_run=dry_run,
             print_debug=print_debug
         )
@@ -28,6 +28,7 @@ def _build_with_make(
     toolchain,
     dependencies_root,
     host_system,
+    build_variables,
     dry_run,
     print_debug
 ):
@@ -42,6 +43,9 @@ def _build_with_make(
 
     host_system -- The system this script is run on.
 
+    build_variables -- The variables that pass the additional
+    compiler flags to the Makefile, or None.
+
     dry_run -- Whether the commands are only printed instead of
     running them.
 
@@ -52,6 +56,17 @@ def _build_with_make(
         make_call.extend(["macosx"])
     elif host_system == get_linux_system_name():
         make_call.extend(["linux"])
+    if build_variables:
+        make_call.extend([
+            "CC={}".format(build_variables["CC"]),
+            "MYCFLAGS={}".format(build_variables["CFLAGS"]),
+            "MYLDFLAGS={}".format(build_variables["LDFLAGS"])
+        ])
+        if "AR" in build_variables:
+            make_call.extend([
+                "AR={} rcu".format(build_variables["AR"]),
+                "RANLIB={}".format(build_variables["RANLIB"])
+            ])
     shell.call(make_call, dry_run=dry_run, echo=print_debug)
     make_install_call = [
         toolchain.build_system,
@@ -138,6 +153,16 @@ def should_install(
     )
 
 
+def supports_lto(host_system):
+    """
+    Tells whether the dependency can be built with link-time
+    optimization.
+
+    host_system -- The system this script is run on.
+    """
+    return host_system != get_windows_system_name()
+
+
 def install_dependency(install_info, dry_run=None, print_debug=None):
     """
     Installs the dependency by downloading and possibly building
@@ -171,6 +196,13 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
 
     subdir = os.path.join(temp_dir, "lua-{}".format(install_info.version))
 
+    _common.remove_lua_backends(
+        dependencies_root=install_info.dependencies_root,
+        host_system=install_info.host_system,
+        dry_run=dry_run,
+        print_debug=print_debug
+    )
+
     with shell.pushd(subdir, dry_run=dry_run, echo=print_debug):
         if install_info.cmake_generator == get_make_cmake_generator_name() \
                 and install_info.host_system != get_windows_system_name():
@@ -178,6 +210,7 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
                 toolchain=install_info.toolchain,
                 dependencies_root=install_info.dependencies_root,
                 host_system=install_info.host_system,
+                build_variables=_common.create_build_variables(install_info),
                 dry_run=dry_run,
                 print_debug=print_debug
             )
@@ -201,6 +234,7 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
                 target=install_info.target,
                 host_system=install_info.host_system,
                 build_variant=install_info.build_variant,
+                cmake_options=_common.create_cmake_options(install_info),
                 do_install=install_info.host_system !=
                 get_windows_system_name(),
                 msbuild_target="lua.sln",
@@ -0,0 +1,267 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the functions related to the
+building and finding LuaJIT. LuaJIT is installed with the same
+headers as Lua so that it can be used as the Lua backend of the
+project instead of the reference implementation.
+"""
+
+import os
+
+from ..github import tag
+
+from ..support.build_variant import get_release_variant_name
+
+from ..support.environment import get_temporary_directory
+
+from ..support.github_data import GitHubData
+
+from ..support.platform_names import \
+    get_darwin_system_name, get_windows_system_name
+
+from ..util.cache import cached
+
+from ..util import shell
+
+from . import _common
+
+
+def _get_header_names():
+    """
+    Gives the names of the headers that are installed from the
+    source directory of LuaJIT.
+    """
+    return [
+        "lua.h",
+        "lualib.h",
+        "lauxlib.h",
+        "luaconf.h",
+        "lua.hpp",
+        "luajit.h"
+    ]
+
+
+def _build_with_make(install_info, source_directory, dry_run, print_debug):
+    """
+    Builds the static library of LuaJIT by using the Makefile
+    provided with the source code and gives the path to the built
+    library.
+
+    install_info -- The object containing the install information
+    for the dependency.
+
+    source_directory -- The root directory of the source code.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    make_call = [
+        install_info.toolchain.build_system,
+        "BUILDMODE=static",
+        "CC={}".format(_common.get_c_compiler(install_info.toolchain))
+    ]
+    if install_info.build_variant != get_release_variant_name():
+        make_call.extend(["CCDEBUG=-g"])
+    build_variables = _common.create_build_variables(install_info)
+    if build_variables:
+        make_call.extend([
+            "TARGET_CFLAGS={}".format(build_variables["CFLAGS"]),
+            "TARGET_LDFLAGS={}".format(build_variables["LDFLAGS"])
+        ])
+    env = None
+    if install_info.host_system == get_darwin_system_name():
+        env = {
+            "MACOSX_DEPLOYMENT_TARGET": os.getenv(
+                "MACOSX_DEPLOYMENT_TARGET",
+                "10.13"
+            )
+        }
+    with shell.pushd(source_directory, dry_run=dry_run, echo=print_debug):
+        shell.call(make_call, env=env, dry_run=dry_run, echo=print_debug)
+    return os.path.join(source_directory, "src", "libluajit.a")
+
+
+def _build_with_msvc(install_info, source_directory, dry_run, print_debug):
+    """
+    Builds the static library of LuaJIT by using the batch file
+    provided with the source code for MSVC and gives the path to
+    the built library.
+
+    install_info -- The object containing the install information
+    for the dependency.
+
+    source_directory -- The root directory of the source code.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    build_call = ["msvcbuild.bat"]
+    if install_info.build_variant != get_release_variant_name():
+        build_call.extend(["debug"])
+    build_call.extend(["static"])
+    with shell.pushd(
+        os.path.join(source_directory, "src"),
+        dry_run=dry_run,
+        echo=print_debug
+    ):
+        shell.call(build_call, dry_run=dry_run, echo=print_debug)
+    return os.path.join(source_directory, "src", "lua51.lib")
+
+
+################################################################
+# DEPENDENCY DATA FUNCTIONS
+################################################################
+
+
+@cached
+def should_install(
+    dependencies_root,
+    version,
+    target,
+    host_system,
+    installed_version
+):
+    """
+    Tells whether the build of the dependency should be skipped.
+
+    dependencies_root -- The root directory of the dependencies
+    for the current build target.
+
+    version -- The full version number of the dependency.
+
+    target -- The target system of the build represented by a
+    Target.
+
+    host_system -- The system this script is run on.
+
+    installed_version -- The version of the dependecy that is
+    written to the JSON file containing the currently installed
+    versions of the dependencies.
+    """
+    return _common.should_install(
+        path=os.path.join("lib", "luajit.lib")
+        if host_system == get_windows_system_name()
+        else os.path.join("lib", "libluajit.a"),
+        dependencies_root=dependencies_root,
+        version=version,
+        installed_version=installed_version
+    )
+
+
+def get_conflicting_dependencies():
+    """
+    Gives the keys of the dependencies that can't be installed
+    together with this dependency.
+    """
+    return ["lua"]
+
+
+def find_library(dependencies_root, host_system):
+    """
+    Gives the path to the static library of LuaJIT if LuaJIT is
+    the installed Lua backend, or None if it isn't.
+
+    dependencies_root -- The root directory of the dependencies
+    for the current build target.
+
+    host_system -- The system this script is run on.
+    """
+    path = _common.get_lua_library_path(
+        dependencies_root,
+        host_system,
+        jit=True
+    )
+    return path if os.path.isfile(path) else None
+
+
+def install_dependency(install_info, dry_run=None, print_debug=None):
+    """
+    Installs the dependency by downloading and possibly building
+    it. Returns the path to the built dependency.
+
+    install_info -- The object containing the install information
+    for this tool.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    temp_dir = get_temporary_directory(build_root=install_info.build_root)
+
+    shell.makedirs(temp_dir, dry_run=dry_run, echo=print_debug)
+
+    asset_path = tag.download_tag(
+        path=temp_dir,
+        git=install_info.toolchain.scm,
+        github_data=GitHubData(
+            owner="LuaJIT",
+            name="LuaJIT",
+            tag_name="v{}".format(install_info.version),
+            asset_name=None
+        ),
+        user_agent=install_info.github_user_agent,
+        api_token=install_info.github_api_token,
+        host_system=install_info.host_system,
+        dry_run=dry_run,
+        print_debug=print_debug
+    )
+
+    _common.remove_lua_backends(
+        dependencies_root=install_info.dependencies_root,
+        host_system=install_info.host_system,
+        dry_run=dry_run,
+        print_debug=print_debug
+    )
+
+    if install_info.host_system == get_windows_system_name():
+        library = _build_with_msvc(
+            install_info=install_info,
+            source_directory=asset_path,
+            dry_run=dry_run,
+            print_debug=print_debug
+        )
+    else:
+        library = _build_with_make(
+            install_info=install_info,
+            source_directory=asset_path,
+            dry_run=dry_run,
+            print_debug=print_debug
+        )
+
+    for directory in ["include", "lib"]:
+        if not os.path.isdir(
+            os.path.join(install_info.dependencies_root, directory)
+        ):
+            shell.makedirs(
+                os.path.join(install_info.dependencies_root, directory),
+                dry_run=dry_run,
+                echo=print_debug
+            )
+
+    shell.copy(
+        library,
+        _common.get_lua_library_path(
+            install_info.dependencies_root,
+            install_info.host_system,
+            jit=True
+        ),
+        dry_run=dry_run,
+        echo=print_debug
+    )
+
+    for header in _get_header_names():
+        shell.copy(
+            os.path.join(asset_path, "src", header),
+            os.path.join(install_info.dependencies_root, "include", header),
+            dry_run=dry_run,
+            echo=print_debug
+        )
+
+    shell.rmtree(temp_dir, dry_run=dry_run, echo=print_debug)
@@ -22,6 +22,8 @@ from ..util.cache import cached
 
 from ..util import http, shell
 
+from . import _common
+
 
 def _copy_visual_c_binaries(
     dependencies_root,
@@ -286,12 +288,15 @@ def _build(
     dependencies_root,
     temporary_directory,
     subdirectory,
+    build_variables=None,
     dry_run=None,
     print_debug=None
 ):
     """
     Builds SDL using the build scripts supplied with it.
 
+    toolchain -- The toolchain object of the run.
+
     dependencies_root -- The root directory of the dependencies
     for the current build target.
 
@@ -301,6 +306,9 @@ def _build(
     subdirectory -- The temporary directory where the SDL files
     are located.
 
+    build_variables -- The variables that pass the additional
+    compiler flags to the configure script, or None.
+
     dry_run -- Whether the commands are only printed instead of
     running them.
 
@@ -316,7 +324,12 @@ def _build(
     shell.makedirs(build_directory, dry_run=dry_run, echo=print_debug)
 
     with shell.pushd(build_directory):
-        shell.call(config_call, dry_run=dry_run, echo=print_debug)
+        shell.call(
+            config_call,
+            env=build_variables,
+            dry_run=dry_run,
+            echo=print_debug
+        )
         shell.call([toolchain.make], dry_run=dry_run, echo=print_debug)
         shell.call(
             [toolchain.make, "install"],
@@ -396,6 +409,16 @@ def should_install(
             return False
 
 
+def supports_lto(host_system):
+    """
+    Tells whether the dependency can be built with link-time
+    optimization.
+
+    host_system -- The system this script is run on.
+    """
+    return host_system != get_windows_system_name()
+
+
 def install_dependency(install_info, dry_run=None, print_debug=None):
     """
     Installs the dependency by downloading and possibly building
@@ -464,6 +487,7 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
             dependencies_root=install_info.dependencies_root,
             temporary_directory=temp_dir,
             subdirectory=subdir,
+            build_variables=_common.create_build_variables(install_info),
             dry_run=dry_run,
             print_debug=print_debug
         )
@@ -6,14 +6,23 @@ This support module contains the functions related to the
 building and finding spdlog.
 """
 
+import logging
 import os
+import sys
+
+from functools import partial
 
 from ..github import tag
 
 from ..support.environment import get_temporary_directory
 
+from ..support.cmake_generators import \
+    get_visual_studio_16_cmake_generator_name
+
 from ..support.github_data import GitHubData
 
+from ..util.build_util import build_with_cmake
+
 from ..util.cache import cached
 
 from ..util import shell
@@ -21,6 +30,120 @@ from ..util import shell
 from . import _common
 
 
+def _get_level_names():
+    """
+    Gives the names of the logging levels of spdlog that can be
+    set as the active level at compile time.
+    """
+    return ["trace", "debug", "info", "warn", "error", "critical", "off"]
+
+
+def _set_active_level(include_directory, level, dry_run, print_debug):
+    """
+    Sets the logging level below which the logging macros of
+    spdlog are compiled out by defining it in the header that
+    spdlog provides for the tweaks.
+
+    include_directory -- The directory that contains the installed
+    headers of spdlog.
+
+    level -- The name of the active logging level.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    if level not in _get_level_names():
+        logging.critical(
+            "The active logging level '%s' of spdlog isn't one of %s",
+            level,
+            ", ".join(_get_level_names())
+        )
+        sys.exit(1)
+    tweak_header = os.path.join(include_directory, "tweakme.h")
+    definition = "#define SPDLOG_ACTIVE_LEVEL SPDLOG_LEVEL_{}".format(
+        level.upper()
+    )
+    if dry_run or print_debug:
+        shell.echo_command(
+            ["echo", definition, ">>", tweak_header],
+            dry_run=dry_run
+        )
+    if dry_run:
+        return
+    with open(tweak_header, "a") as f:
+        f.write("\n// Set by the configuration profile of the dependency\n")
+        f.write("#ifndef SPDLOG_ACTIVE_LEVEL\n")
+        f.write("{}\n".format(definition))
+        f.write("#endif\n")
+
+
+def _get_library_names():
+    """
+    Gives the possible names of the static library of spdlog. The
+    debug builds of the library have the suffix 'd'.
+    """
+    return ["libspdlog.a", "libspdlogd.a"]
+
+
+def find_compiled_library(dependencies_root):
+    """
+    Gives the path to the static library of spdlog if spdlog is
+    installed in the compiled mode, or None if it's installed as a
+    header-only library.
+
+    dependencies_root -- The root directory of the dependencies
+    for the current build target.
+    """
+    for name in _get_library_names():
+        path = os.path.join(dependencies_root, "lib", name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _should_build_library(install_info):
+    """
+    Tells whether spdlog is built as a static library in the
+    compiled mode instead of installing it as a header-only
+    library. The compiled mode is selected with the key 'compiled'
+    of the configuration profile.
+    """
+    if not install_info.profile.get("compiled", False):
+        return False
+    if install_info.cmake_generator == \
+            get_visual_studio_16_cmake_generator_name():
+        logging.warning(
+            "spdlog can't be built in the compiled mode with %s so it's "
+            "installed as a header-only library",
+            install_info.cmake_generator
+        )
+        return False
+    return True
+
+
+def _remove_installed_files(dependencies_root, dry_run, print_debug):
+    """
+    Removes the previously installed headers, library, and CMake
+    package files of spdlog so that a switch between the
+    header-only and the compiled mode doesn't leave stale files.
+    """
+    paths = [
+        os.path.join(dependencies_root, "include", "spdlog"),
+        os.path.join(dependencies_root, "lib", "cmake", "spdlog"),
+        os.path.join(dependencies_root, "lib", "pkgconfig", "spdlog.pc")
+    ] + [
+        os.path.join(dependencies_root, "lib", name)
+        for name in _get_library_names()
+    ]
+    for path in paths:
+        if os.path.isdir(path):
+            shell.rmtree(path, dry_run=dry_run, echo=print_debug)
+        elif os.path.isfile(path):
+            shell.rm(path, dry_run=dry_run, echo=print_debug)
+
+
 ################################################################
 # DEPENDENCY DATA FUNCTIONS
 ################################################################
@@ -59,18 +182,11 @@ def should_install(
     )
 
 
-def install_dependency(install_info, dry_run=None, print_debug=None):
+def _install(install_info, build_library, dry_run=None, print_debug=None):
     """
-    Installs the dependency by downloading and possibly building
-    it. Returns the path to the built dependency.
-
-    install_info -- The object containing the install information
-    for this tool.
-
-    dry_run -- Whether the commands are only printed instead of
-    running them.
-
-    print_debug -- Whether debug output should be printed.
+    Installs the dependency into the root directory given in the
+    install information either as a header-only or as a static
+    library.
     """
     temp_dir = get_temporary_directory(build_root=install_info.build_root)
 
@@ -92,27 +208,100 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
         print_debug=print_debug
     )
 
-    if not os.path.isdir(
-        os.path.join(install_info.dependencies_root, "include")
-    ):
-        shell.makedirs(
-            os.path.join(install_info.dependencies_root, "include"),
+    if build_library:
+        build_with_cmake(
+            toolchain=install_info.toolchain,
+            cmake_generator=install_info.cmake_generator,
+            source_directory=asset_path,
+            temporary_root=temp_dir,
+            dependencies_root=install_info.dependencies_root,
+            target=install_info.target,
+            host_system=install_info.host_system,
+            build_variant=install_info.build_variant,
+            cmake_options=_common.create_cmake_options(
+                install_info,
+                {
+                    "SPDLOG_BUILD_SHARED": False,
+                    "SPDLOG_BUILD_EXAMPLE": False,
+                    "SPDLOG_BUILD_TESTS": False,
+                    "SPDLOG_BUILD_BENCH": False,
+                    "SPDLOG_INSTALL": True,
+                    # The library is linked into the shared library
+                    # of the engine.
+                    "CMAKE_POSITION_INDEPENDENT_CODE": True
+                }
+            ),
             dry_run=dry_run,
-            echo=print_debug
+            print_debug=print_debug
         )
-    if os.path.isdir(
-        os.path.join(install_info.dependencies_root, "include", "spdlog")
-    ):
-        shell.rmtree(
+    else:
+        if not os.path.isdir(
+            os.path.join(install_info.dependencies_root, "include")
+        ):
+            shell.makedirs(
+                os.path.join(install_info.dependencies_root, "include"),
+                dry_run=dry_run,
+                echo=print_debug
+            )
+        shell.copytree(
+            os.path.join(asset_path, "include", "spdlog"),
             os.path.join(install_info.dependencies_root, "include", "spdlog"),
             dry_run=dry_run,
             echo=print_debug
         )
-    shell.copytree(
-        os.path.join(asset_path, "include", "spdlog"),
-        os.path.join(install_info.dependencies_root, "include", "spdlog"),
+
+    if "activeLevel" in install_info.profile:
+        _set_active_level(
+            include_directory=os.path.join(
+                install_info.dependencies_root,
+                "include",
+                "spdlog"
+            ),
+            level=install_info.profile["activeLevel"],
+            dry_run=dry_run,
+            print_debug=print_debug
+        )
+
+    shell.rmtree(temp_dir, dry_run=dry_run, echo=print_debug)
+
+
+def install_dependency(install_info, dry_run=None, print_debug=None):
+    """
+    Installs the dependency by downloading and possibly building
+    it. Returns the path to the built dependency.
+
+    install_info -- The object containing the install information
+    for this tool.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    _remove_installed_files(
+        dependencies_root=install_info.dependencies_root,
         dry_run=dry_run,
-        echo=print_debug
+        print_debug=print_debug
     )
 
-    shell.rmtree(temp_dir, dry_run=dry_run, echo=print_debug)
+    if _should_build_library(install_info=install_info):
+        _install(
+            install_info=install_info,
+            build_library=True,
+            dry_run=dry_run,
+            print_debug=print_debug
+        )
+    else:
+        _common.install_into_shared_store(
+            install_info=install_info,
+            name="spdlog",
+            install=partial(
+                _install,
+                build_library=False,
+                dry_run=dry_run,
+                print_debug=print_debug
+            ),
+            paths=[os.path.join("include", "spdlog")],
+            dry_run=dry_run,
+            print_debug=print_debug
+        )
@@ -8,6 +8,8 @@ building and finding stb_image.
 
 import os
 
+from functools import partial
+
 from ..github import repository
 
 from ..support.environment import get_temporary_directory
@@ -59,18 +61,10 @@ def should_install(
     )
 
 
-def install_dependency(install_info, dry_run=None, print_debug=None):
+def _install(install_info, dry_run=None, print_debug=None):
     """
-    Installs the dependency by downloading and possibly building
-    it. Returns the path to the built dependency.
-
-    install_info -- The object containing the install information
-    for this tool.
-
-    dry_run -- Whether the commands are only printed instead of
-    running them.
-
-    print_debug -- Whether debug output should be printed.
+    Installs the dependency into the root directory given in the
+    install information.
     """
     temp_dir = get_temporary_directory(build_root=install_info.build_root)
 
@@ -119,3 +113,26 @@ def install_dependency(install_info, dry_run=None, print_debug=None):
     )
 
     shell.rmtree(temp_dir, dry_run=dry_run, echo=print_debug)
+
+
+def install_dependency(install_info, dry_run=None, print_debug=None):
+    """
+    Installs the dependency by downloading and possibly building
+    it. Returns the path to the built dependency.
+
+    install_info -- The object containing the install information
+    for this tool.
+
+    dry_run -- Whether the commands are only printed instead of
+    running them.
+
+    print_debug -- Whether debug output should be printed.
+    """
+    _common.install_into_shared_store(
+        install_info=install_info,
+        name="stb_image",
+        install=partial(_install, dry_run=dry_run, print_debug=print_debug),
+        paths=[os.path.join("include", "stb_image.h")],
+        dry_run=dry_run,
+        print_debug=print_debug
+    )
@@ -9,6 +9,9 @@ script acts on.
 
 import json
 import logging
+import sys
+
+from .support.build_variant import get_release_with_debuginfo_variant_name
 
 from .support.dependency_data import create_dependency_data
 
@@ -17,6 +20,8 @@ from .support.dependency_install_information import DependencyInstallInfo
 from .support.file_paths import \
     get_product_file_path, get_project_values_file_path
 
+from .util.dependency_profiles import get_profile_digest
+
 
 def construct_dependencies_data(data_file):
     """
@@ -43,6 +48,102 @@ def construct_dependencies_data(data_file):
         ) for key, node in dependency_data.items()]
 
 
+def _uses_lto(dependency, host_system, lto):
+    """
+    Tells whether the given dependency is built with link-time
+    optimization.
+
+    dependency -- The DependencyData object of the dependency.
+
+    host_system -- The system this script is run on.
+
+    lto -- The requested link-time optimization mode or None.
+    """
+    return bool(lto) and dependency.supports_lto is not None \
+        and dependency.supports_lto(host_system=host_system)
+
+
+def _get_build_variant(dependency, build_variant, optimized_dependencies):
+    """
+    Gives the build variant the given dependency is built with. The
+    optimized dependencies are built with debug information and
+    optimizations regardless of the build variant of the project,
+    and the configuration profile may set the build variant of the
+    other dependencies.
+
+    dependency -- The DependencyData object of the dependency.
+
+    build_variant -- The build variant used to build the project.
+
+    optimized_dependencies -- The list of the keys of the
+    dependencies that are built with optimizations, or None.
+    """
+    if optimized_dependencies and (
+        dependency.get_key() in optimized_dependencies
+        or "all" in optimized_dependencies
+    ):
+        return get_release_with_debuginfo_variant_name()
+    return dependency.get_profile(build_variant=build_variant).get(
+        "buildVariant",
+        build_variant
+    )
+
+
+def _get_recorded_version(
+    dependency,
+    target,
+    host_system,
+    build_variant,
+    lto,
+    optimized_dependencies
+):
+    """
+    Gives the version of the dependency that is written to the JSON
+    file containing the installed versions. The link-time
+    optimization mode and the digest of the configuration profile
+    are included in the version so that changing either of them
+    causes the dependency to be rebuilt. The build variant of the
+    dependency is included if it differs from the build variant of
+    the project.
+
+    dependency -- The DependencyData object of the dependency.
+
+    target -- The target system of the build represented by a
+    Target.
+
+    host_system -- The system this script is run on.
+
+    build_variant -- The build variant used to build the project.
+
+    lto -- The requested link-time optimization mode or None.
+
+    optimized_dependencies -- The list of the keys of the
+    dependencies that are built with optimizations, or None.
+    """
+    version = dependency.get_required_version(
+        target=target,
+        host_system=host_system
+    )
+    build_metadata = []
+    if _uses_lto(dependency=dependency, host_system=host_system, lto=lto):
+        build_metadata.extend(["lto", lto])
+    profile_digest = get_profile_digest(
+        dependency.get_profile(build_variant=build_variant)
+    )
+    if profile_digest:
+        build_metadata.extend(["profile", profile_digest])
+    dependency_variant = _get_build_variant(
+        dependency=dependency,
+        build_variant=build_variant,
+        optimized_dependencies=optimized_dependencies
+    )
+    if dependency_variant != build_variant:
+        build_metadata.extend(["variant", dependency_variant.lower()])
+    if build_metadata:
+        return "{}+{}".format(version, ".".join(build_metadata))
+    return version
+
+
 def _resolve_dependencies_to_install(
     dependencies_data,
     target,
@@ -50,7 +151,10 @@ def _resolve_dependencies_to_install(
     dependencies_root,
     build_test,
     build_benchmark,
-    version_data
+    build_variant,
+    version_data,
+    lto,
+    optimized_dependencies
 ):
     """
     Checks whether or not the dependencies required by the
@@ -75,8 +179,16 @@ def _resolve_dependencies_to_install(
     build_benchmark -- Whether or not the benchmarks should be
     built.
 
+    build_variant -- The build variant used to build the project.
+
     version_data -- The dictionary read from the JSON file containing the
     versions of the currently installed dependencies.
+
+    lto -- The link-time optimization mode the dependencies that
+    support it are built with, or None.
+
+    optimized_dependencies -- The list of the keys of the
+    dependencies that are built with optimizations, or None.
     """
     accumulated_not_to_install = [
         data for data in dependencies_data
@@ -84,9 +196,13 @@ def _resolve_dependencies_to_install(
             build_test=build_test,
             build_benchmark=build_benchmark,
             dependencies_root=dependencies_root,
-            version=data.get_required_version(
+            version=_get_recorded_version(
+                dependency=data,
                 target=target,
-                host_system=host_system
+                host_system=host_system,
+                build_variant=build_variant,
+                lto=lto,
+                optimized_dependencies=optimized_dependencies
             ),
             target=target,
             host_system=host_system,
@@ -100,9 +216,13 @@ def _resolve_dependencies_to_install(
             build_test=build_test,
             build_benchmark=build_benchmark,
             dependencies_root=dependencies_root,
-            version=data.get_required_version(
+            version=_get_recorded_version(
+                dependency=data,
                 target=target,
-                host_system=host_system
+                host_system=host_system,
+                build_variant=build_variant,
+                lto=lto,
+                optimized_dependencies=optimized_dependencies
             ),
             target=target,
             host_system=host_system,
@@ -129,7 +249,11 @@ def install_dependencies(
     build_test,
     build_benchmark,
     dry_run,
-    print_debug
+    print_debug,
+    lto=None,
+    tune=None,
+    optimized_dependencies=None,
+    shared_root=None
 ):
     """
     Installs the dependencies of the project.
@@ -177,7 +301,50 @@ def install_dependencies(
     running them.
 
     print_debug -- Whether debug output should be printed.
+
+    lto -- The link-time optimization mode the static dependencies
+    that support it are built with, or None.
+
+    tune -- The CPU the dependencies are tuned for, or None.
+
+    optimized_dependencies -- The list of the keys of the
+    dependencies that are built in the release variant with debug
+    information regardless of the build variant of the project, or
+    None. The key 'all' selects all of the dependencies.
+
+    shared_root -- The root directory of the shared store of the
+    dependencies that don't depend on the build variant, or None if
+    the store isn't used.
     """
+    for dependency in dependencies_data:
+        if dependency.get_conflicting_dependencies is None:
+            continue
+        conflicts = [
+            data.get_name() for data in dependencies_data
+            if data.get_key() in dependency.get_conflicting_dependencies()
+        ]
+        if conflicts:
+            logging.critical(
+                "%s can't be installed together with %s",
+                dependency.get_name(),
+                ", ".join(conflicts)
+            )
+            sys.exit(1)
+
+    unknown_dependencies = [
+        key for key in optimized_dependencies or []
+        if key != "all"
+        and key not in [data.get_key() for data in dependencies_data]
+    ]
+
+    if unknown_dependencies:
+        logging.critical(
+            "The optimized dependencies %s aren't dependencies of the "
+            "project",
+            ", ".join(unknown_dependencies)
+        )
+        sys.exit(1)
+
     version_data = {}
 
     try:
@@ -196,7 +363,10 @@ def install_dependencies(
         dependencies_root=dependencies_root,
         build_test=build_test,
         build_benchmark=build_benchmark,
-        version_data=version_data
+        build_variant=build_variant,
+        version_data=version_data,
+        lto=lto,
+        optimized_dependencies=optimized_dependencies
     )
 
     logging.debug(
@@ -205,6 +375,13 @@ def install_dependencies(
     )
 
     for dependency in to_install:
+        profile = dependency.get_profile(build_variant=build_variant)
+        if profile:
+            logging.info(
+                "Installing %s with the configuration profile %s",
+                dependency.get_name(),
+                json.dumps(profile, sort_keys=True)
+            )
         dependency.install_dependency(
             install_info=DependencyInstallInfo(
                 toolchain=toolchain,
@@ -217,18 +394,34 @@ def install_dependencies(
                 ),
                 target=target,
                 host_system=host_system,
-                build_variant=build_variant,
+                build_variant=_get_build_variant(
+                    dependency=dependency,
+                    build_variant=build_variant,
+                    optimized_dependencies=optimized_dependencies
+                ),
                 github_user_agent=github_user_agent,
                 github_api_token=github_api_token,
-                opengl_version=opengl_version
+                opengl_version=opengl_version,
+                lto=lto if _uses_lto(
+                    dependency=dependency,
+                    host_system=host_system,
+                    lto=lto
+                ) else None,
+                tune=tune,
+                profile=profile,
+                shared_root=shared_root
             ),
             dry_run=dry_run,
             print_debug=print_debug
         )
         version_data.update({
-            dependency.get_key(): dependency.get_required_version(
+            dependency.get_key(): _get_recorded_version(
+                dependency=dependency,
                 target=target,
-                host_system=host_system
+                host_system=host_system,
+                build_variant=build_variant,
+                lto=lto,
+                optimized_dependencies=optimized_dependencies
             )
         })
 
@@ -1,2 +0,0 @@
-# Copyright (c) 2020 Antti Kivi
-# Licensed under the MIT License
@@ -12,25 +12,34 @@ import logging
 import os
 import sys
 
+from .compose import benchmarks, bolt, lint, pgo, shootout, tests, xvfb
+
 from .github.access import get_api_access_values
 
+from .support.artefact_formats import get_zip_artefact_format_name
+
+from .support.compiler_toolchains import get_clang_toolchain_name
+
 from .support.environment import \
     get_build_root, get_composing_directory, \
     get_dependency_version_data_file, get_destination_directory, \
-    get_project_root, get_tools_directory
+    get_project_root, get_shared_dependencies_directory, get_tools_directory
 
 from .support.file_paths import \
     get_preset_file_path, get_project_dependencies_file_path
 
 from .support.project_names import get_ode_repository_name, get_project_name
 
+from .util.compression import get_compression_level_range
+
 from .util.target import current_platform, parse_target_from_argument_string
 
 from .util import shell
 
 from .composing_mode import \
     compose_project, create_artefacts, create_composing_root, \
-    create_destination_root, install_documentation, install_running_copies
+    create_destination_root, install_documentation, install_running_copies, \
+    separate_debug_symbols, strip_binaries
 
 from .configuring_mode import create_dependencies_root, create_tools_root
 
@@ -108,6 +117,13 @@ def run_in_configuring_mode(arguments, source_root):
     source_root -- Path to the directory that is the root of the
     script run.
     """
+    if arguments.lto_dependencies and not arguments.lto:
+        logging.critical(
+            "The option '--lto-dependencies' requires the link-time "
+            "optimization mode to be set with '--lto'"
+        )
+        sys.exit(1)
+
     if arguments.clean:
         run.clean(arguments=arguments, source_root=source_root)
 
@@ -158,7 +174,8 @@ def run_in_configuring_mode(arguments, source_root):
         source_root=source_root,
         in_tree_build=arguments.in_tree_build,
         target=build_target,
-        build_variant=arguments.build_variant
+        build_variant=arguments.build_variant,
+        tune=arguments.tune
     )
 
     install_dependencies(
@@ -184,17 +201,82 @@ def run_in_configuring_mode(arguments, source_root):
         version_data_file=get_dependency_version_data_file(
             build_root=build_root,
             target=build_target,
-            build_variant=arguments.build_variant
+            build_variant=arguments.build_variant,
+            tune=arguments.tune
         ),
         build_test=arguments.build_test,
         build_benchmark=arguments.build_benchmark,
         dry_run=arguments.dry_run,
-        print_debug=arguments.print_debug
+        print_debug=arguments.print_debug,
+        lto=arguments.lto if arguments.lto_dependencies else None,
+        tune=arguments.tune,
+        optimized_dependencies=arguments.optimized_dependencies,
+        shared_root=get_shared_dependencies_directory(build_root=build_root)
+        if arguments.share_dependencies else None
     )
 
     return 0
 
 
+def _compose(arguments, source_root, toolchain):
+    """
+    Builds the project with the given arguments into the composing
+    and destination roots of the build variant and the build tag of
+    the arguments. Returns the path to the destination root. This
+    function isn't pure as it builds the project.
+
+    arguments -- The namespace containing the parsed command line
+    arguments of the script.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+
+    toolchain -- The toolchain object of the run.
+    """
+    build_target = parse_target_from_argument_string(arguments.host_target)
+    destination_root = create_destination_root(
+        source_root=source_root,
+        in_tree_build=arguments.in_tree_build,
+        target=build_target,
+        cmake_generator=arguments.cmake_generator,
+        build_variant=arguments.build_variant,
+        version=arguments.anthem_version,
+        build_tag=arguments.build_tag
+    )
+    compose_project(
+        source_root=source_root,
+        toolchain=toolchain,
+        arguments=arguments,
+        host_system=current_platform(),
+        project_root=get_project_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build
+        ),
+        build_root=get_build_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build
+        ),
+        composing_root=create_composing_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build,
+            target=build_target,
+            cmake_generator=arguments.cmake_generator,
+            build_variant=arguments.build_variant,
+            build_tag=arguments.build_tag
+        ),
+        destination_root=destination_root,
+        dependencies_root=create_dependencies_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build,
+            target=build_target,
+            build_variant=arguments.build_variant,
+            tune=arguments.tune
+        )
+    )
+
+    return destination_root
+
+
 def run_in_composing_mode(arguments, source_root):
     """
     Runs the script in build mode. This function isn't pure as
@@ -207,11 +289,53 @@ def run_in_composing_mode(arguments, source_root):
     source_root -- Path to the directory that is the root of the
     script run.
     """
+    if arguments.artefact_compression_level is not None:
+        compression = "gz" \
+            if arguments.artefact_format == get_zip_artefact_format_name() \
+            else arguments.artefact_format.split(".")[-1]
+        lowest, highest = get_compression_level_range(compression)
+        if not lowest <= arguments.artefact_compression_level <= highest:
+            logging.critical(
+                "The compression level of the %s artefacts must be between "
+                "%d and %d",
+                arguments.artefact_format,
+                lowest,
+                highest
+            )
+            sys.exit(1)
+
     if arguments.clean:
         run.clean(arguments=arguments, source_root=source_root)
 
     build_target = parse_target_from_argument_string(arguments.host_target)
 
+    if arguments.stop_xvfb:
+        xvfb.stop_xvfb_servers(
+            arguments=arguments,
+            build_root=get_build_root(
+                source_root=source_root,
+                in_tree_build=arguments.in_tree_build
+            )
+        )
+        return 0
+
+    if arguments.lint_merge:
+        lint.merge_lint_shards(
+            arguments=arguments,
+            source_root=source_root,
+            composing_root=get_composing_directory(
+                build_root=get_build_root(
+                    source_root=source_root,
+                    in_tree_build=arguments.in_tree_build
+                ),
+                target=build_target,
+                cmake_generator=arguments.cmake_generator,
+                build_variant=arguments.build_variant,
+                build_tag=arguments.build_tag
+            )
+        )
+        return 0
+
     # Check the directories.
     tools_root = get_tools_directory(
         build_root=get_build_root(
@@ -253,41 +377,112 @@ def run_in_composing_mode(arguments, source_root):
 
     logging.debug("The created toolchain is %s", toolchain)
 
-    compose_project(
-        source_root=source_root,
-        toolchain=toolchain,
-        arguments=arguments,
-        host_system=current_platform(),
-        project_root=get_project_root(
-            source_root=source_root,
-            in_tree_build=arguments.in_tree_build
-        ),
-        build_root=build_root,
-        composing_root=create_composing_root(
-            source_root=source_root,
-            in_tree_build=arguments.in_tree_build,
-            target=build_target,
-            cmake_generator=arguments.cmake_generator,
-            build_variant=arguments.build_variant
-        ),
-        destination_root=create_destination_root(
+    # A merged profile doesn't need llvm-profdata, but its flags are
+    # only understood by Clang.
+    if arguments.pgo_profile \
+            and arguments.compiler_toolchain != get_clang_toolchain_name():
+        logging.critical(
+            "The profile-guided optimization requires the %s toolchain",
+            get_clang_toolchain_name()
+        )
+        sys.exit(1)
+
+    if arguments.pgo and not arguments.pgo_profile:
+        if not pgo.should_use_pgo(arguments=arguments, toolchain=toolchain):
+            logging.critical(
+                "The profile-guided optimization requires the %s toolchain "
+                "and llvm-profdata",
+                get_clang_toolchain_name()
+            )
+            sys.exit(1)
+        arguments.pgo_profile = pgo.prepare_pgo_profile(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=current_platform(),
             source_root=source_root,
-            in_tree_build=arguments.in_tree_build,
+            project_root=get_project_root(
+                source_root=source_root,
+                in_tree_build=arguments.in_tree_build
+            ),
+            compose=lambda composing_arguments: _compose(
+                arguments=composing_arguments,
+                source_root=source_root,
+                toolchain=toolchain
+            )
+        )
+
+    _compose(arguments=arguments, source_root=source_root, toolchain=toolchain)
+
+    if arguments.skip_build:
+        return 0
+
+    if arguments.run_tests or arguments.affected_tests:
+        composing_root = get_composing_directory(
+            build_root=build_root,
             target=build_target,
             cmake_generator=arguments.cmake_generator,
             build_variant=arguments.build_variant,
-            version=arguments.anthem_version
-        ),
-        dependencies_root=create_dependencies_root(
-            source_root=source_root,
-            in_tree_build=arguments.in_tree_build,
-            target=build_target,
-            build_variant=arguments.build_variant
+            build_tag=arguments.build_tag
+        )
+        gtest_filter = None
+        if arguments.affected_tests:
+            gtest_filter = tests.select_affected_tests(
+                arguments=arguments,
+                toolchain=toolchain,
+                project_root=get_project_root(
+                    source_root=source_root,
+                    in_tree_build=arguments.in_tree_build
+                ),
+                composing_root=composing_root
+            )
+        if gtest_filter == "":
+            logging.info("No tests are affected by the changes")
+        else:
+            tests.run_tests(
+                arguments=arguments,
+                toolchain=toolchain,
+                host_system=current_platform(),
+                build_root=build_root,
+                destination_root=get_destination_directory(
+                    build_root=build_root,
+                    target=build_target,
+                    cmake_generator=arguments.cmake_generator,
+                    build_variant=arguments.build_variant,
+                    version=arguments.anthem_version,
+                    build_tag=arguments.build_tag
+                ),
+                composing_root=composing_root,
+                gtest_filter=gtest_filter
+            )
+        tests.mark_tests_run(
+            arguments=arguments,
+            composing_root=composing_root
         )
-    )
 
-    if arguments.skip_build:
-        return 0
+    if arguments.bolt:
+        if not bolt.should_use_bolt(
+            toolchain=toolchain,
+            host_system=current_platform()
+        ):
+            logging.critical(
+                "BOLT can be used only on Linux and it requires llvm-bolt "
+                "and perf"
+            )
+            sys.exit(1)
+        bolt.optimize_binaries(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=current_platform(),
+            build_root=build_root,
+            destination_root=get_destination_directory(
+                build_root=build_root,
+                target=build_target,
+                cmake_generator=arguments.cmake_generator,
+                build_variant=arguments.build_variant,
+                version=arguments.anthem_version,
+                build_tag=arguments.build_tag
+            )
+        )
 
     install_running_copies(
         arguments=arguments,
@@ -297,7 +492,8 @@ def run_in_composing_mode(arguments, source_root):
             target=build_target,
             cmake_generator=arguments.cmake_generator,
             build_variant=arguments.build_variant,
-            version=arguments.anthem_version
+            version=arguments.anthem_version,
+            build_tag=arguments.build_tag
         )
     )
 
@@ -309,14 +505,96 @@ def run_in_composing_mode(arguments, source_root):
                 build_root=build_root,
                 target=build_target,
                 cmake_generator=arguments.cmake_generator,
-                build_variant=arguments.build_variant
+                build_variant=arguments.build_variant,
+                build_tag=arguments.build_tag
             )
         )
 
+    if arguments.skip_artefacts:
+        return 0
+
+    if arguments.split_debug_info:
+        separate_debug_symbols(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=current_platform(),
+            build_root=build_root
+        )
+
+    if arguments.strip_binaries:
+        strip_binaries(
+            arguments=arguments,
+            toolchain=toolchain,
+            host_system=current_platform(),
+            build_root=build_root
+        )
+
+    # The builds tuned for a CPU may not run on other machines so
+    # they aren't packaged by accident.
+    if arguments.tune and not arguments.package_tuned:
+        logging.warning(
+            "The build is tuned for the CPU '%s' so the artefacts aren't "
+            "created; use '--package-tuned' to create them anyway",
+            arguments.tune
+        )
+        return 0
+
     create_artefacts(
         arguments=arguments,
         host_system=current_platform(),
-        build_root=build_root
+        build_root=build_root,
+        project_root=get_project_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build
+        )
+    )
+
+    return 0
+
+
+def run_in_benchmarking_mode(arguments, source_root):
+    """
+    Runs the script in benchmarking mode. This function isn't pure
+    as the functions called by it run the benchmarks and modify the
+    file system.
+
+    arguments -- The namespace containing the parsed command line
+    arguments of the script.
+
+    source_root -- Path to the directory that is the root of the
+    script run.
+    """
+    build_target = parse_target_from_argument_string(arguments.host_target)
+    build_root = get_build_root(
+        source_root=source_root,
+        in_tree_build=arguments.in_tree_build
+    )
+
+    if arguments.shootout:
+        shootout.run_shootout(
+            arguments=arguments,
+            host_system=current_platform(),
+            source_root=source_root,
+            build_root=build_root
+        )
+        return 0
+
+    benchmarks.run_benchmarks(
+        arguments=arguments,
+        host_system=current_platform(),
+        project_root=get_project_root(
+            source_root=source_root,
+            in_tree_build=arguments.in_tree_build
+        ),
+        build_root=build_root,
+        destination_root=get_destination_directory(
+            build_root=build_root,
+            target=build_target,
+            cmake_generator=arguments.cmake_generator,
+            build_variant=arguments.build_variant,
+            version=arguments.anthem_version,
+            build_tag=arguments.build_tag
+        )
     )
 
     return 0
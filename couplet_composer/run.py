@@ -25,10 +25,14 @@ from .support.environment import \
 from .support.mode_names import get_configuring_mode_name
 
 from .support.tool_data import \
-    create_clang_apply_replacements_tool_data, create_clang_tidy_tool_data, \
-    create_clang_tool_data, create_cmake_tool_data, create_doxygen_tool_data, \
-    create_gcc_tool_data, create_git_tool_data, create_make_tool_data, \
-    create_msbuild_tool_data, create_msvc_tool_data, create_ninja_tool_data, \
+    create_bolt_tool_data, create_clang_apply_replacements_tool_data, \
+    create_clang_tidy_tool_data, create_clang_tool_data, \
+    create_cmake_tool_data, create_coverage_tool_data, \
+    create_doxygen_tool_data, create_dwp_tool_data, create_gcc_tool_data, \
+    create_git_tool_data, create_make_tool_data, create_msbuild_tool_data, \
+    create_msvc_tool_data, create_ninja_tool_data, \
+    create_objcopy_tool_data, create_perf_tool_data, \
+    create_profdata_tool_data, create_xvfb_server_tool_data, \
     create_xvfb_tool_data
 
 from .util.target import parse_target_from_argument_string
@@ -65,14 +69,16 @@ def clean(arguments, source_root):
         build_root=build_root,
         target=build_target,
         cmake_generator=arguments.cmake_generator,
-        build_variant=arguments.build_variant
+        build_variant=arguments.build_variant,
+        build_tag=arguments.build_tag
     )
     destination_root = get_destination_directory(
         build_root=build_root,
         target=build_target,
         cmake_generator=arguments.cmake_generator,
         build_variant=arguments.build_variant,
-        version=arguments.anthem_version
+        version=arguments.anthem_version,
+        build_tag=arguments.build_tag
     )
     tools_root = get_tools_directory(
         build_root=build_root,
@@ -81,12 +87,14 @@ def clean(arguments, source_root):
     dependencies_root = get_dependencies_directory(
         build_root=build_root,
         target=build_target,
-        build_variant=arguments.build_variant
+        build_variant=arguments.build_variant,
+        tune=arguments.tune
     )
     version_data_file = get_dependency_version_data_file(
             build_root=build_root,
             target=build_target,
-            build_variant=arguments.build_variant
+            build_variant=arguments.build_variant,
+            tune=arguments.tune
         )
 
     if arguments.composer_mode == get_configuring_mode_name():
@@ -232,5 +240,12 @@ def construct_tool_data(arguments, host_system):
             linter_required=arguments.lint,
             tool_path=arguments.clang_apply_replacements_binary
         ),
-        "xvfb": create_xvfb_tool_data()
+        "xvfb": create_xvfb_tool_data(),
+        "xvfb_server": create_xvfb_server_tool_data(),
+        "objcopy": create_objcopy_tool_data(),
+        "dwp": create_dwp_tool_data(),
+        "profdata": create_profdata_tool_data(),
+        "coverage": create_coverage_tool_data(),
+        "bolt": create_bolt_tool_data(bolt_required=arguments.bolt),
+        "perf": create_perf_tool_data()
     }
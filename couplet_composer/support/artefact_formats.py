@@ -0,0 +1,46 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This support module contains the names of the possible formats of
+the artefacts.
+"""
+
+
+def get_tar_gz_artefact_format_name():
+    """
+    Gives the name of the artefact format for tar archives
+    compressed with gzip.
+    """
+    return "tar.gz"
+
+
+def get_tar_xz_artefact_format_name():
+    """
+    Gives the name of the artefact format for tar archives
+    compressed with xz.
+    """
+    return "tar.xz"
+
+
+def get_tar_zst_artefact_format_name():
+    """
+    Gives the name of the artefact format for tar archives
+    compressed with Zstandard.
+    """
+    return "tar.zst"
+
+
+def get_zip_artefact_format_name():
+    """Gives the name of the artefact format for zip archives."""
+    return "zip"
+
+
+def get_artefact_format_names():
+    """Gives the names of the possible artefact formats."""
+    return [
+        get_tar_gz_artefact_format_name(),
+        get_tar_xz_artefact_format_name(),
+        get_tar_zst_artefact_format_name(),
+        get_zip_artefact_format_name()
+    ]
@@ -16,6 +16,8 @@ from functools import partial
 
 from .project_names import get_project_package_name
 
+from ..util.dependency_profiles import select_dependency_profile
+
 
 # The type 'DependencyData' represents the data to construct a
 # dependency. Thus, the tuple contains various functions that the
@@ -26,7 +28,10 @@ DependencyData = namedtuple("DependencyData", [
     "get_key",
     "get_name",
     "get_required_version",
+    "get_profile",
     "should_install",
+    "supports_lto",
+    "get_conflicting_dependencies",
     "install_dependency"
 ])
 
@@ -122,10 +127,17 @@ def create_dependency_data(module_name, data_node):
         get_key=lambda: module_name,
         get_name=lambda: data_node["name"],
         get_required_version=lambda target, host_system: data_node["version"],
+        get_profile=partial(select_dependency_profile, data_node=data_node),
         should_install=partial(
             _should_install_dependency,
             module=dependency_module,
             data_node=data_node
         ),
+        supports_lto=getattr(dependency_module, "supports_lto", None),
+        get_conflicting_dependencies=getattr(
+            dependency_module,
+            "get_conflicting_dependencies",
+            None
+        ),
         install_dependency=getattr(dependency_module, "install_dependency")
     )
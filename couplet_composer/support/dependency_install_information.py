@@ -40,6 +40,18 @@ from collections import namedtuple
 # the API.
 #
 # opengl_version -- The version of OpenGL that is used.
+#
+# lto -- The link-time optimization mode the dependency is built
+# with, or None if it's built without link-time optimization.
+#
+# tune -- The CPU the dependency is tuned for, or None.
+#
+# profile -- The dictionary of the configuration profile of the
+# dependency that is selected by the build variant.
+#
+# shared_root -- The root directory of the shared store of the
+# dependencies that don't depend on the build variant, or None if
+# the store isn't used.
 DependencyInstallInfo = namedtuple("DependencyInstallInfo", [
     "toolchain",
     "cmake_generator",
@@ -52,4 +64,8 @@ DependencyInstallInfo = namedtuple("DependencyInstallInfo", [
     "github_user_agent",
     "github_api_token",
     "opengl_version",
+    "lto",
+    "tune",
+    "profile",
+    "shared_root"
 ])
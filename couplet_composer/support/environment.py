@@ -56,12 +56,53 @@ def get_build_root(source_root, in_tree_build):
     return os.path.join(source_root, "build")
 
 
+def _add_build_tag(name, build_tag):
+    """
+    Gives the given directory name with the given build tag
+    appended to it if the tag is set.
+    """
+    return "{}-{}".format(name, build_tag) if build_tag else name
+
+
+@cached
+def get_tuned_build_tag(build_tag, tune):
+    """
+    Gives the build tag of a build that is tuned for the given CPU
+    so that the tuned builds are kept apart from the portable ones.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
+
+    tune -- The CPU the build is tuned for.
+    """
+    tune_tag = "tune-{}".format(tune)
+    return _add_build_tag(build_tag, tune_tag) if build_tag else tune_tag
+
+
+@cached
+def get_build_tag(build_tag, tune):
+    """
+    Gives the build tag of a build with the given options. The
+    builds tuned for a CPU get their own tag so that they are kept
+    apart from the portable builds.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
+
+    tune -- The CPU the build is tuned for, or None if the build
+    isn't tuned.
+    """
+    return get_tuned_build_tag(build_tag=build_tag, tune=tune) if tune \
+        else build_tag
+
+
 @cached
 def get_composing_directory(
     build_root,
     target,
     cmake_generator,
-    build_variant
+    build_variant,
+    build_tag=None
 ):
     """
     Gives the path to the directory in the build directory that
@@ -76,16 +117,19 @@ def get_composing_directory(
     cmake_generator -- The CMake generator that is used.
 
     build_variant -- The build variant used to build the project.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
     return os.path.join(
         build_root,
         "build",
-        "{}-{}-{}-{}".format(
+        _add_build_tag("{}-{}-{}-{}".format(
             target.system,
             target.machine,
             build_variant.lower(),
             cmake_generator.replace(" ", "_").lower()
-        )
+        ), build_tag)
     )
 
 
@@ -95,7 +139,8 @@ def get_destination_directory(
     target,
     cmake_generator,
     build_variant,
-    version
+    version,
+    build_tag=None
 ):
     """
     Gives the path to the directory where the built project is
@@ -112,54 +157,93 @@ def get_destination_directory(
     build_variant -- The build variant used to build the project.
 
     version -- The version number of the project.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
     return os.path.join(
         build_root,
         "dest",
         version,
-        "{}-{}-{}-{}".format(
+        _add_build_tag("{}-{}-{}-{}".format(
             target.system,
             target.machine,
             build_variant.lower(),
             cmake_generator.replace(" ", "_").lower()
-        )
+        ), build_tag)
     )
 
 
 @cached
-def get_artefact_directory(build_root):
+def get_artefact_directory(build_root, build_tag=None):
     """
     Gives the path to the directory where the built project
     artefacts are placed.
 
     build_root -- Path to the directory that is the root of the
     script build files.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
-    return os.path.join(build_root, "artefacts")
+    return os.path.join(build_root, _add_build_tag("artefacts", build_tag))
 
 
 @cached
-def get_running_directory(build_root):
+def get_running_directory(build_root, build_tag=None):
     """
     Gives the path to the directory where the latest built
     products for the system are placed for running them.
 
     build_root -- Path to the directory that is the root of the
     script build files.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
+    """
+    return os.path.join(build_root, _add_build_tag("run", build_tag))
+
+
+@cached
+def get_debug_symbols_directory(build_root, build_tag=None):
+    """
+    Gives the path to the directory where the debug symbols that
+    are separated from the latest built products are placed.
+
+    build_root -- Path to the directory that is the root of the
+    script build files.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
     """
-    return os.path.join(build_root, "run")
+    return os.path.join(build_root, _add_build_tag("debug", build_tag))
 
 
 @cached
-def get_documentation_directory(build_root):
+def get_documentation_directory(build_root, build_tag=None):
     """
     Gives the path to the directory where the latest built
     documentation is placed.
 
+    build_root -- Path to the directory that is the root of the
+    script build files.
+
+    build_tag -- The optional tag that separates the build from
+    the other builds of the same variant.
+    """
+    return os.path.join(build_root, _add_build_tag("docs", build_tag))
+
+
+@cached
+def get_lto_cache_directory(build_root):
+    """
+    Gives the path to the directory where the persistent ThinLTO
+    cache is kept.
+
     build_root -- Path to the directory that is the root of the
     script build files.
     """
-    return os.path.join(build_root, "docs")
+    return os.path.join(build_root, "lto-cache")
 
 
 @cached
@@ -183,7 +267,7 @@ def get_tools_directory(build_root, target):
 
 
 @cached
-def get_dependencies_directory(build_root, target, build_variant):
+def get_dependencies_directory(build_root, target, build_variant, tune=None):
     """
     Gives the path to the directory in the build directory that
     this script uses for all local tools.
@@ -195,17 +279,41 @@ def get_dependencies_directory(build_root, target, build_variant):
     Target.
 
     build_variant -- The build variant used to build the project.
+
+    tune -- The optional CPU the dependencies are tuned for.
     """
     return os.path.join(
         build_root,
         "local",
         "lib",
-        "{}-{}-{}".format(target.system, target.machine, build_variant.lower())
+        _add_build_tag("{}-{}-{}".format(
+            target.system,
+            target.machine,
+            build_variant.lower()
+        ), "tune-{}".format(tune) if tune else None)
     )
 
 
 @cached
-def get_dependency_version_data_file(build_root, target, build_variant):
+def get_shared_dependencies_directory(build_root):
+    """
+    Gives the path to the directory in the build directory that
+    contains the shared store of the dependencies that don't
+    depend on the build variant.
+
+    build_root -- Path to the directory that is the root of the
+    script build files.
+    """
+    return os.path.join(build_root, "local", "shared")
+
+
+@cached
+def get_dependency_version_data_file(
+    build_root,
+    target,
+    build_variant,
+    tune=None
+):
     """
     Gives path to the file in the build directory containing the
     currently installed versions of the dependencies.
@@ -217,15 +325,17 @@ def get_dependency_version_data_file(build_root, target, build_variant):
     Target.
 
     build_variant -- The build variant used to build the project.
+
+    tune -- The optional CPU the dependencies are tuned for.
     """
     return os.path.join(
         build_root,
         "local",
-        "versions-{}-{}-{}".format(
+        _add_build_tag("versions-{}-{}-{}".format(
             target.system,
             target.machine,
             build_variant.lower()
-        )
+        ), "tune-{}".format(tune) if tune else None)
     )
 
 
@@ -19,3 +19,8 @@ def get_configuring_mode_name():
 def get_composing_mode_name():
     """Gives the name of the composing mode."""
     return "compose"
+
+
+def get_benchmarking_mode_name():
+    """Gives the name of the benchmarking mode."""
+    return "benchmark"
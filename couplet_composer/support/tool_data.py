@@ -82,7 +82,14 @@ def list_tool_types():
         "doxygen",
         "linter",
         "linter_replacements",
-        "xvfb"
+        "xvfb",
+        "xvfb_server",
+        "objcopy",
+        "dwp",
+        "profdata",
+        "coverage",
+        "bolt",
+        "perf"
     ]
 
 
@@ -499,3 +506,118 @@ def create_xvfb_tool_data():
             ),
         install_tool=lambda install_info, dry_run, print_debug: None
     )
+
+
+def create_system_tool_data(tool_key, tool_name, searched_tool=None):
+    """
+    Creates the ToolData object of a tool that is only looked for
+    from the system and that isn't installed locally.
+
+    tool_key -- The simple lower-case name of the tool.
+
+    tool_name -- The name of the tool.
+
+    searched_tool -- An optional name that is used when the tool
+    is looked for from the system. The key of the tool is used by
+    default.
+    """
+    return ToolData(
+        get_tool_key=lambda: tool_key,
+        get_tool_name=lambda: tool_name,
+        get_searched_tool=lambda: searched_tool or tool_key,
+        use_predefined_path=lambda: False,
+        get_required_local_version=lambda target, host_system: None,
+        get_local_executable=(
+            lambda tools_root, version, target, host_system: None
+        ),
+        install_tool=lambda install_info, dry_run, print_debug: None
+    )
+
+
+def create_xvfb_server_tool_data():
+    """
+    Creates the ToolData object of the X virtual frame buffer
+    server for toolchain. It's used to run the persistent displays
+    of the tests.
+    """
+    return create_system_tool_data(
+        tool_key="xvfb_server",
+        tool_name="X virtual frame buffer server",
+        searched_tool="Xvfb"
+    )
+
+
+def create_objcopy_tool_data():
+    """
+    Creates the ToolData object of objcopy for toolchain. It's
+    used to separate the debug symbols from the built binaries.
+    """
+    return create_system_tool_data(tool_key="objcopy", tool_name="objcopy")
+
+
+def create_dwp_tool_data():
+    """
+    Creates the ToolData object of the DWARF packaging utility
+    for toolchain. It's used to package the split DWARF objects
+    of the built binaries.
+    """
+    return create_system_tool_data(
+        tool_key="dwp",
+        tool_name="DWARF packaging utility",
+        searched_tool="llvm-dwp"
+    )
+
+
+def create_profdata_tool_data():
+    """
+    Creates the ToolData object of the LLVM profile data tool for
+    toolchain. It's used to merge the raw profiles of the code
+    coverage.
+    """
+    return create_system_tool_data(
+        tool_key="profdata",
+        tool_name="LLVM profile data tool",
+        searched_tool="llvm-profdata"
+    )
+
+
+def create_coverage_tool_data():
+    """
+    Creates the ToolData object of the LLVM coverage tool for
+    toolchain. It's used to create the code coverage reports.
+    """
+    return create_system_tool_data(
+        tool_key="coverage",
+        tool_name="LLVM coverage tool",
+        searched_tool="llvm-cov"
+    )
+
+
+def create_bolt_tool_data(bolt_required):
+    """
+    Creates the ToolData object of BOLT for toolchain. It's used
+    to optimize the layout of the built binaries with a recorded
+    profile. BOLT is installed with LLVM only when it's required.
+
+    bolt_required -- Whether or not the current build
+    configuration requires BOLT.
+    """
+    if bolt_required:
+        return _create_tool_data(
+            module_name="llvm_bolt",
+            tool_name="BOLT",
+            tool_key="llvm-bolt"
+        )
+    return create_system_tool_data(
+        tool_key="bolt",
+        tool_name="BOLT",
+        searched_tool="llvm-bolt"
+    )
+
+
+def create_perf_tool_data():
+    """
+    Creates the ToolData object of perf for toolchain. It's used
+    to record the profiles of BOLT.
+    """
+    return create_system_tool_data(tool_key="perf", tool_name="perf")
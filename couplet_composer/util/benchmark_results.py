@@ -0,0 +1,129 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for reading and comparing the
+JSON reports of Google Benchmark.
+"""
+
+from collections import namedtuple
+
+from .statistics import mann_whitney_u, median
+
+
+BenchmarkComparison = namedtuple("BenchmarkComparison", [
+    "name",
+    "baseline",
+    "current",
+    "change",
+    "p_value",
+    "status"
+])
+
+
+_TIME_UNITS = {"ns": 1.0, "us": 1e3, "ms": 1e6, "s": 1e9}
+
+
+def read_benchmark_samples(report):
+    """
+    Reads the real times of the repetitions of the benchmarks from
+    the given Google Benchmark report. The aggregates and the runs
+    that had errors are skipped. Gives a dictionary that maps the
+    names of the benchmarks to the lists of their times in
+    nanoseconds.
+
+    report -- The parsed JSON report of Google Benchmark.
+    """
+    samples = {}
+    for benchmark in report.get("benchmarks", []):
+        if benchmark.get("run_type", "iteration") != "iteration":
+            continue
+        if benchmark.get("error_occurred"):
+            continue
+        name = benchmark.get("run_name", benchmark["name"])
+        samples.setdefault(name, []).append(
+            float(benchmark["real_time"])
+            * _TIME_UNITS[benchmark.get("time_unit", "ns")]
+        )
+    return samples
+
+
+def compare_benchmarks(baseline, current, alpha, threshold):
+    """
+    Compares the samples of the benchmarks with the samples of the
+    baseline by using the Mann-Whitney U test. A benchmark is
+    regressed if the difference is significant and its median time
+    has grown more than the threshold, and improved if the
+    difference is significant and its median time has shrunk more
+    than the threshold. Gives a list of the comparisons sorted by
+    the names of the benchmarks.
+
+    baseline -- A dictionary that maps the names of the benchmarks
+    to the samples of the baseline.
+
+    current -- A dictionary that maps the names of the benchmarks
+    to the current samples.
+
+    alpha -- The significance level of the test.
+
+    threshold -- The smallest relative change of the median that
+    is reported, for example 0.05 for five per cent.
+    """
+    comparisons = []
+    for name in sorted(set(baseline).intersection(current)):
+        baseline_median = median(baseline[name])
+        current_median = median(current[name])
+        change = current_median / baseline_median - 1.0 \
+            if baseline_median else 0.0
+        _, p_value = mann_whitney_u(baseline[name], current[name])
+        if p_value >= alpha or abs(change) <= threshold:
+            status = "unchanged"
+        elif change > 0:
+            status = "regressed"
+        else:
+            status = "improved"
+        comparisons.append(BenchmarkComparison(
+            name=name,
+            baseline=baseline_median,
+            current=current_median,
+            change=change,
+            p_value=p_value,
+            status=status
+        ))
+    return comparisons
+
+
+def format_time(nanoseconds):
+    """
+    Formats the given time with the largest fitting unit.
+
+    nanoseconds -- The time in nanoseconds.
+    """
+    for unit in ["s", "ms", "us"]:
+        if nanoseconds >= _TIME_UNITS[unit]:
+            return "{:.3f} {}".format(nanoseconds / _TIME_UNITS[unit], unit)
+    return "{:.3f} ns".format(nanoseconds)
+
+
+def format_table(header, rows):
+    """
+    Formats the given rows as a plain text table with aligned
+    columns. The first column is aligned to the left and the rest
+    to the right.
+
+    header -- The titles of the columns.
+
+    rows -- The rows of the table as lists of strings.
+    """
+    widths = [
+        max(len(row[i]) for row in [header] + list(rows))
+        for i in range(len(header))
+    ]
+    lines = []
+    for row in [header] + list(rows):
+        lines.append("  ".join(
+            cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i])
+            for i, cell in enumerate(row)
+        ).rstrip())
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
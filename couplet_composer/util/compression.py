@@ -0,0 +1,369 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains the compressors for the archives.
+The gzip compressor compresses the stream in blocks in parallel
+threads and produces the same kind of output as pigz.
+"""
+
+import struct
+import subprocess
+import time
+import zlib
+
+from contextlib import contextmanager
+
+from multiprocessing.pool import ThreadPool
+
+# The module 'lzma' isn't available on Python 2.
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def get_default_compression_level(compression):
+    """
+    Gives the default compression level of the given compression.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+    """
+    return {"gz": 6, "xz": 6, "zst": 3}[compression]
+
+
+def get_compression_level_range(compression):
+    """
+    Gives a tuple of the smallest and the largest compression level
+    of the given compression.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+    """
+    return {"gz": (0, 9), "xz": (0, 9), "zst": (1, 19)}[compression]
+
+
+def _get_gzip_block_size():
+    """
+    Gives the size of the blocks that are compressed in parallel.
+    """
+    return 128 * 1024
+
+
+def _get_gzip_dictionary_size():
+    """
+    Gives the size of the preset dictionary of a block that is
+    taken from the end of the previous block.
+    """
+    return 32 * 1024
+
+
+def _compress_gzip_block(block):
+    """
+    Compresses a single block of a parallel gzip stream. The block
+    is compressed to raw deflate data that is aligned to a byte
+    boundary so that the compressed blocks can be concatenated.
+
+    block -- A tuple containing the data, the preset dictionary,
+    the compression level, and whether the block is the last one.
+    """
+    data, dictionary, level, last = block
+    if dictionary:
+        compressor = zlib.compressobj(
+            level,
+            zlib.DEFLATED,
+            -zlib.MAX_WBITS,
+            zlib.DEF_MEM_LEVEL,
+            zlib.Z_DEFAULT_STRATEGY,
+            dictionary
+        )
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) \
+        + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelGzipFile(object):
+    """
+    A write-only file object that compresses the written data to
+    a single gzip member by compressing it in blocks in parallel
+    threads. Each block uses the end of the previous block as its
+    dictionary like pigz does.
+    """
+
+    def __init__(self, fileobj, level=6, jobs=1, mtime=None):
+        """
+        Creates the file object.
+
+        fileobj -- The file object the compressed data is written
+        to.
+
+        level -- The compression level.
+
+        jobs -- The number of blocks compressed in parallel.
+
+        mtime -- The modification time written to the header. The
+        current time is used by default.
+        """
+        self._fileobj = fileobj
+        self._level = level
+        self._jobs = max(1, jobs or 1)
+        self._pool = ThreadPool(self._jobs) if self._jobs > 1 else None
+        self._buffer = b""
+        self._pending = []
+        self._dictionary = b""
+        self._crc = 0
+        self._size = 0
+        if level >= 9:
+            extra_flags = 2
+        elif level <= 1:
+            extra_flags = 4
+        else:
+            extra_flags = 0
+        self._fileobj.write(b"\x1f\x8b\x08\x00" + struct.pack(
+            "<LBB",
+            int(time.time() if mtime is None else mtime) & 0xffffffff,
+            extra_flags,
+            255
+        ))
+
+    def _flush_pending(self, last=False):
+        """Compresses the pending blocks and writes them out."""
+        if not self._pending and not last:
+            return
+        blocks = []
+        for i, data in enumerate(self._pending):
+            blocks.append((
+                data,
+                self._dictionary,
+                self._level,
+                last and i == len(self._pending) - 1
+            ))
+            self._dictionary = (self._dictionary + data)[
+                -_get_gzip_dictionary_size():
+            ]
+        if not blocks:
+            blocks.append((b"", self._dictionary, self._level, True))
+        if self._pool:
+            compressed = self._pool.map(_compress_gzip_block, blocks)
+        else:
+            compressed = [_compress_gzip_block(b) for b in blocks]
+        for data in compressed:
+            self._fileobj.write(data)
+        self._pending = []
+
+    def write(self, data):
+        """Writes the given data to the compressed stream."""
+        data = bytes(data)
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        self._buffer += data
+        block_size = _get_gzip_block_size()
+        while len(self._buffer) >= block_size:
+            self._pending.append(self._buffer[:block_size])
+            self._buffer = self._buffer[block_size:]
+            if len(self._pending) >= self._jobs * 4:
+                self._flush_pending()
+        return len(data)
+
+    def close(self):
+        """
+        Compresses the rest of the data and writes the gzip trailer.
+        The underlying file object isn't closed.
+        """
+        if self._fileobj is None:
+            return
+        if self._buffer:
+            self._pending.append(self._buffer)
+            self._buffer = b""
+        self._flush_pending(last=True)
+        self._fileobj.write(struct.pack(
+            "<LL",
+            self._crc & 0xffffffff,
+            self._size & 0xffffffff
+        ))
+        if self._pool:
+            self._pool.close()
+            self._pool.join()
+        self._fileobj = None
+
+
+class _CountingFile(object):
+    """
+    A write-only file object that counts the bytes written to the
+    wrapped file object.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self._fileobj.write(data)
+
+
+def _find_zstd():
+    """
+    Gives the path to the Zstandard executable or None if it isn't
+    found. This function isn't pure as it looks for the executable
+    from the system.
+    """
+    # The helper is imported here as it uses the shell module that
+    # imports this module.
+    from .which import which
+    return which("zstd")
+
+
+def get_compression_command(compression, level, jobs):
+    """
+    Gives the command line equivalent of the compressor for
+    printing it.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+
+    level -- The compression level.
+
+    jobs -- The number of parallel compression jobs.
+    """
+    if compression == "gz":
+        return "pigz -{} -p {}".format(level, jobs or 1)
+    elif compression == "xz":
+        return "xz -{}".format(level)
+    return "zstd -{} -T{}".format(level, jobs or 1)
+
+
+def is_compression_available(compression):
+    """
+    Tells whether the given compression can be used. This
+    function isn't pure as it looks for the executables from the
+    system.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+    """
+    if compression == "zst":
+        return zstandard is not None or _find_zstd() is not None
+    elif compression == "xz":
+        return lzma is not None
+    return compression == "gz"
+
+
+def get_unavailable_compression_message(compression):
+    """
+    Gives the message that tells what the given compression
+    requires when it can't be used.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+    """
+    if compression == "zst":
+        return "The compression 'zst' requires either the Python module " \
+            "'zstandard' or the executable 'zstd'"
+    elif compression == "xz":
+        return "The compression 'xz' requires the Python module 'lzma'"
+    return "The compression '{}' isn't supported; use 'gz', 'xz', or " \
+        "'zst'".format(compression)
+
+
+@contextmanager
+def open_compressed(path, compression, level, jobs=None, mtime=None):
+    """
+    Opens a compressed file for writing. Yields a write-only file
+    object that has the number of the uncompressed bytes written
+    to it in the attribute 'count'.
+
+    path -- The path to the compressed file.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+
+    level -- The compression level.
+
+    jobs -- The number of parallel compression jobs.
+
+    mtime -- The modification time written to the gzip header.
+    """
+    if compression == "zst" and zstandard is None:
+        # Use the Zstandard executable when the Python bindings
+        # aren't installed.
+        with open(path, "wb") as f:
+            process = subprocess.Popen(
+                [
+                    _find_zstd(),
+                    "-q",
+                    "-{}".format(level),
+                    "-T{}".format(jobs or 1),
+                    "-c"
+                ],
+                stdin=subprocess.PIPE,
+                stdout=f
+            )
+            writer = _CountingFile(process.stdin)
+            try:
+                yield writer
+            finally:
+                process.stdin.close()
+                process.wait()
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode,
+                    "zstd"
+                )
+        return
+
+    with open(path, "wb") as f:
+        if compression == "gz":
+            compressor = ParallelGzipFile(
+                f,
+                level=level,
+                jobs=jobs,
+                mtime=mtime
+            )
+        elif compression == "xz":
+            compressor = lzma.LZMAFile(f, "wb", preset=level)
+        else:
+            compressor = zstandard.ZstdCompressor(
+                level=level,
+                threads=jobs or 0
+            ).stream_writer(f, closefd=False)
+        writer = _CountingFile(compressor)
+        yield writer
+        compressor.close()
+
+
+@contextmanager
+def open_decompressed(path, compression):
+    """
+    Opens a compressed file for reading. Yields a read-only file
+    object of the decompressed stream. Only the compressions that
+    the tarfile module can't read by itself are supported.
+
+    path -- The path to the compressed file.
+
+    compression -- The name of the compression, i.e. 'zst'.
+    """
+    if zstandard is None:
+        with open(path, "rb") as f:
+            process = subprocess.Popen(
+                [_find_zstd(), "-q", "-d", "-c"],
+                stdin=f,
+                stdout=subprocess.PIPE
+            )
+            try:
+                yield process.stdout
+            finally:
+                process.stdout.close()
+                process.wait()
+        return
+
+    with open(path, "rb") as f:
+        with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            yield reader
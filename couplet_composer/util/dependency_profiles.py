@@ -0,0 +1,53 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for selecting the
+configuration profiles of the dependencies by the build variant.
+"""
+
+import hashlib
+import json
+
+
+def get_default_profile_name():
+    """
+    Gives the name of the profile that applies to all of the
+    build variants.
+    """
+    return "default"
+
+
+def select_dependency_profile(data_node, build_variant):
+    """
+    Gives the configuration profile of the dependency for the given
+    build variant. The profile is the default profile of the
+    dependency updated with the profile of the build variant, the
+    name of which is compared case-insensitively.
+
+    data_node -- The entry in the dependency JSON file containing
+    the data for the dependency in question.
+
+    build_variant -- The build variant used to build the project.
+    """
+    profiles = data_node.get("profiles", {})
+    profile = dict(profiles.get(get_default_profile_name(), {}))
+    for name, values in sorted(profiles.items()):
+        if name != get_default_profile_name() \
+                and name.lower() == build_variant.lower():
+            profile.update(values)
+    return profile
+
+
+def get_profile_digest(profile):
+    """
+    Gives a short digest of the given profile that changes when any
+    of its values changes, or None if the profile is empty.
+
+    profile -- The configuration profile of the dependency.
+    """
+    if not profile:
+        return None
+    return hashlib.sha256(
+        json.dumps(profile, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:8]
@@ -0,0 +1,26 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for the shared store of the
+dependencies that don't depend on the build variant.
+"""
+
+import hashlib
+
+
+def get_store_entry_name(version, values):
+    """
+    Gives the name of the entry of a dependency in the shared
+    store. The name consists of the version and a digest of the
+    other values that the installed files depend on.
+
+    version -- The version of the dependency.
+
+    values -- The list of the other values as strings.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return "{}-{}".format(version, digest.hexdigest()[:8])
@@ -0,0 +1,88 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains parsers for the dependency
+information that the compilers and the build systems write.
+"""
+
+
+def _split_depfile_paths(text):
+    """
+    Splits the whitespace-separated paths of a Makefile depfile
+    rule. The backslash escapes spaces and hashes in the paths.
+    """
+    paths = []
+    current = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text) and text[i + 1] in " #":
+            current.append(text[i + 1])
+            i += 2
+            continue
+        if char == "$" and i + 1 < len(text) and text[i + 1] == "$":
+            current.append("$")
+            i += 2
+            continue
+        if char.isspace():
+            if current:
+                paths.append("".join(current))
+                current = []
+        else:
+            current.append(char)
+        i += 1
+    if current:
+        paths.append("".join(current))
+    return paths
+
+
+def parse_depfile(text):
+    """
+    Parses the contents of a depfile in the Makefile format that
+    the compilers write. Gives a dictionary that maps the targets
+    to the lists of their dependencies.
+
+    text -- The contents of the depfile.
+    """
+    dependencies = {}
+    # The rules can be continued on the next line with a
+    # backslash.
+    text = text.replace("\\\r\n", " ").replace("\\\n", " ")
+    for line in text.splitlines():
+        # The colon may be a part of a Windows drive letter so
+        # the separator is a colon followed by whitespace.
+        separator = line.find(": ")
+        if separator < 0 and line.rstrip().endswith(":"):
+            separator = len(line.rstrip()) - 1
+        if separator < 0:
+            continue
+        deps = _split_depfile_paths(line[separator + 1:])
+        for target in _split_depfile_paths(line[:separator]):
+            dependencies.setdefault(target, []).extend(deps)
+    return dependencies
+
+
+def parse_ninja_deps(text):
+    """
+    Parses the output of 'ninja -t deps'. Gives a dictionary that
+    maps the targets to the lists of their dependencies. The
+    targets that have out-of-date dependency information are left
+    out.
+
+    text -- The output of the command.
+    """
+    dependencies = {}
+    target = None
+    for line in text.splitlines():
+        if not line.strip():
+            target = None
+        elif not line[0].isspace():
+            target = None
+            separator = line.find(": #deps")
+            if separator >= 0 and line.rstrip().endswith("(VALID)"):
+                target = line[:separator]
+                dependencies[target] = []
+        elif target is not None:
+            dependencies[target].append(line.strip())
+    return dependencies
@@ -0,0 +1,67 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for handling the diagnostics
+printed by clang-tidy.
+"""
+
+import re
+
+
+_DIAGNOSTIC_PATTERN = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+): "
+    r"(?P<severity>warning|error): (?P<message>.*?)"
+    r"(?: \[(?P<check>[^\[\]]+)\])?$"
+)
+
+
+def split_diagnostics(output):
+    """
+    Splits the output of clang-tidy into diagnostics. Gives a list
+    of tuples that contain the key of the diagnostic and its text.
+    The key is a tuple of the file, the line, and the check of the
+    diagnostic. The notes, the code snippets, and the other lines
+    that follow a diagnostic belong to it. The lines that precede
+    the first diagnostic have None as their key.
+
+    output -- The output of clang-tidy.
+    """
+    diagnostics = []
+    key = None
+    lines = []
+    for line in output.splitlines(True):
+        match = _DIAGNOSTIC_PATTERN.match(line.rstrip("\r\n"))
+        if match:
+            if lines:
+                diagnostics.append((key, "".join(lines)))
+            key = (
+                match.group("file"),
+                int(match.group("line")),
+                match.group("check") or match.group("message")
+            )
+            lines = []
+        lines.append(line)
+    if lines:
+        diagnostics.append((key, "".join(lines)))
+    return diagnostics
+
+
+def deduplicate_diagnostics(output, seen):
+    """
+    Gives the output of clang-tidy without the diagnostics that
+    are already in the given set of keys. The keys of the new
+    diagnostics are added to the set.
+
+    output -- The output of clang-tidy.
+
+    seen -- The set of the keys of the diagnostics that are
+    already reported.
+    """
+    result = []
+    for key, text in split_diagnostics(output):
+        if key is None or key not in seen:
+            result.append(text)
+            if key is not None:
+                seen.add(key)
+    return "".join(result)
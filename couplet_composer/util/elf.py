@@ -0,0 +1,86 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for finding the ELF binaries
+from the built products.
+"""
+
+import os
+import struct
+
+
+def _get_elf_magic():
+    """Gives the magic number in the beginning of ELF files."""
+    return b"\x7fELF"
+
+
+def _get_linked_elf_types():
+    """
+    Gives the ELF object file types of the executables and the
+    shared objects.
+    """
+    return [2, 3]
+
+
+def _read_elf_type(path):
+    """
+    Gives the ELF object file type of the given file, or None if
+    the file isn't an ELF file. This function isn't pure as it
+    reads the file.
+
+    path -- The path to the file to check.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(18)
+    except (IOError, OSError):
+        return None
+    if len(header) < 18 or header[:4] != _get_elf_magic():
+        return None
+    # The fifth byte of the identification tells the endianness
+    # of the rest of the header.
+    byte_order = "<" if header[5:6] == b"\x01" else ">"
+    return struct.unpack("{}H".format(byte_order), header[16:18])[0]
+
+
+def is_elf_binary(path):
+    """
+    Tells whether the given file is a linked ELF binary, i.e. an
+    executable or a shared object. Symbolic links aren't
+    considered binaries so that every binary is handled only
+    once. This function isn't pure as it reads the file.
+
+    path -- The path to the file to check.
+    """
+    if os.path.islink(path) or not os.path.isfile(path):
+        return False
+    return _read_elf_type(path) in _get_linked_elf_types()
+
+
+def is_elf_shared_object(path):
+    """
+    Tells whether the given file is an ELF shared object. Note
+    that position-independent executables are shared objects too.
+    This function isn't pure as it reads the file.
+
+    path -- The path to the file to check.
+    """
+    return _read_elf_type(path) == 3
+
+
+def find_elf_binaries(path):
+    """
+    Gives a sorted list of the ELF binaries in the given
+    directory and its subdirectories. This function isn't pure as
+    it reads the file system.
+
+    path -- The directory where the binaries are looked for.
+    """
+    elf_files = []
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if is_elf_binary(file_path):
+                elf_files.append(file_path)
+    return sorted(elf_files)
@@ -0,0 +1,185 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains the backend for copying files. It
+uses the fastest copying method the platform and the file system
+support, and falls back to the standard library when none of them
+work.
+"""
+
+import errno
+import logging
+import os
+import shutil
+import sys
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# The request code of the 'FICLONE' ioctl on Linux.
+_FICLONE = 0x40049409
+
+
+def _get_fallback_errors():
+    """
+    Gives the error numbers on which a copying method is
+    considered unsupported and the next method is tried.
+    """
+    return [
+        getattr(errno, name) for name in [
+            "EBADF",
+            "EINVAL",
+            "ENOSYS",
+            "ENOTSUP",
+            "ENOTTY",
+            "EOPNOTSUPP",
+            "EPERM",
+            "EXDEV"
+        ] if hasattr(errno, name)
+    ]
+
+
+def _is_linux():
+    """Tells whether the script is run on Linux."""
+    return sys.platform.startswith("linux")
+
+
+def _reflink(src_file, dest_file, size):
+    """
+    Clones the contents of the file by using the 'FICLONE' ioctl
+    that shares the data blocks on copy-on-write file systems.
+    """
+    fcntl.ioctl(dest_file.fileno(), _FICLONE, src_file.fileno())
+
+
+def _copy_file_range(src_file, dest_file, size):
+    """
+    Copies the contents of the file in the kernel by using
+    'copy_file_range'.
+    """
+    copied = 0
+    while copied < size:
+        count = os.copy_file_range(
+            src_file.fileno(),
+            dest_file.fileno(),
+            size - copied
+        )
+        if count == 0:
+            break
+        copied += count
+
+
+def _sendfile(src_file, dest_file, size):
+    """Copies the contents of the file in the kernel by using 'sendfile'."""
+    copied = 0
+    while copied < size:
+        count = os.sendfile(
+            dest_file.fileno(),
+            src_file.fileno(),
+            copied,
+            size - copied
+        )
+        if count == 0:
+            break
+        copied += count
+
+
+def _get_kernel_copy_methods():
+    """
+    Gives the list of the methods for copying the file contents
+    without reading them to the user space that are available on
+    the current platform. The list contains tuples of the name of
+    the method and the function.
+    """
+    methods = []
+    if fcntl is not None and _is_linux():
+        methods.append(("reflink", _reflink))
+    if hasattr(os, "copy_file_range"):
+        methods.append(("copy_file_range", _copy_file_range))
+    if hasattr(os, "sendfile") and _is_linux():
+        methods.append(("sendfile", _sendfile))
+    return methods
+
+
+def _copy_in_kernel(src, dest):
+    """
+    Tries to copy the contents of a file by using the methods
+    that don't read the contents to the user space. Returns the
+    name of the method that was used or None if none of them
+    worked.
+    """
+    methods = _get_kernel_copy_methods()
+    if not methods:
+        return None
+    size = os.path.getsize(src)
+    with open(src, "rb") as src_file:
+        with open(dest, "wb") as dest_file:
+            for name, method in methods:
+                try:
+                    method(src_file, dest_file, size)
+                    return name
+                except (IOError, OSError) as e:
+                    if e.errno not in _get_fallback_errors():
+                        raise
+                    # Discard any partially copied data before
+                    # the next method is tried.
+                    dest_file.seek(0)
+                    dest_file.truncate()
+                    src_file.seek(0)
+    return None
+
+
+def copy_file(src, dest, allow_link=False):
+    """
+    Copies a file and its metadata by using the fastest method
+    available. The methods are tried in the following order: a
+    hard link if it's allowed, reflink, 'copy_file_range',
+    'sendfile', and finally the standard library. An existing
+    destination file is always replaced instead of written over
+    so that the files that are hard linked to it remain intact.
+    Returns the name of the used method.
+
+    src -- The file to copy.
+
+    dest -- The destination file or a directory to copy the file
+    to.
+
+    allow_link -- Whether the file may be hard linked instead of
+    copied. It should only be allowed for copies that are never
+    modified.
+    """
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    if os.path.islink(dest) or os.path.exists(dest):
+        os.remove(dest)
+
+    method = None
+
+    if allow_link:
+        try:
+            os.link(src, dest)
+            return "hardlink"
+        except (AttributeError, OSError):
+            pass
+
+    try:
+        method = _copy_in_kernel(src, dest)
+    except (IOError, OSError) as e:
+        logging.debug(
+            "Copying '%s' in kernel failed, falling back: %s",
+            src,
+            e
+        )
+
+    if method:
+        shutil.copystat(src, dest)
+        return method
+
+    if os.path.exists(dest):
+        os.remove(dest)
+    shutil.copy2(src, dest)
+    return "shutil"
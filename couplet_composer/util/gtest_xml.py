@@ -0,0 +1,120 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for handling the XML reports
+of googletest.
+"""
+
+import xml.etree.ElementTree as ElementTree
+
+
+def _get_counted_attributes():
+    """
+    Gives the names of the attributes of the test suites that are
+    summed when the reports are merged.
+    """
+    return ["tests", "failures", "disabled", "skipped", "errors"]
+
+
+def _add_attributes(target, source):
+    """
+    Adds the counts and the time of the source element to the
+    target element.
+    """
+    for name in _get_counted_attributes():
+        if name in source.attrib or name in target.attrib:
+            target.set(name, str(
+                int(target.get(name, "0")) + int(source.get(name, "0"))
+            ))
+    target.set("time", "{:.3f}".format(
+        float(target.get("time", "0")) + float(source.get("time", "0"))
+    ))
+
+
+def merge_test_reports(reports):
+    """
+    Merges the XML reports of googletest, e.g. from the shards of
+    a test run, into a single report. The test suites with the same
+    name are combined. Gives the root element of the merged report.
+
+    reports -- The contents of the XML reports.
+    """
+    merged = ElementTree.Element("testsuites", {
+        "name": "AllTests",
+        "tests": "0",
+        "failures": "0",
+        "disabled": "0",
+        "errors": "0",
+        "time": "0"
+    })
+    suites = {}
+    for report in reports:
+        root = ElementTree.fromstring(report)
+        for suite in root.findall("testsuite"):
+            name = suite.get("name")
+            if name not in suites:
+                suites[name] = ElementTree.SubElement(
+                    merged,
+                    "testsuite",
+                    {
+                        key: value for key, value in suite.attrib.items()
+                        if key not in _get_counted_attributes()
+                        and key != "time"
+                    }
+                )
+                suites[name].set("time", "0")
+            _add_attributes(suites[name], suite)
+            _add_attributes(merged, suite)
+            suites[name].extend(list(suite))
+    return merged
+
+
+def find_slowest_tests(root, count):
+    """
+    Gives a list of tuples containing the times and the names of
+    the slowest test cases in the given report.
+
+    root -- The root element of the report.
+
+    count -- The number of the test cases to give.
+    """
+    tests = []
+    for suite in root.findall("testsuite"):
+        for case in suite.findall("testcase"):
+            tests.append((
+                float(case.get("time", "0")),
+                "{}.{}".format(suite.get("name"), case.get("name"))
+            ))
+    return sorted(tests, key=lambda test: (-test[0], test[1]))[:count]
+
+
+def find_failed_tests(root):
+    """
+    Gives the sorted names of the failed test cases in the given
+    report.
+
+    root -- The root element of the report.
+    """
+    return sorted(
+        "{}.{}".format(suite.get("name"), case.get("name"))
+        for suite in root.findall("testsuite")
+        for case in suite.findall("testcase")
+        if case.find("failure") is not None
+    )
+
+
+def write_test_report(root, path):
+    """
+    Writes the given report to a file. This function isn't pure as
+    it writes the file.
+
+    root -- The root element of the report.
+
+    path -- The path to the file.
+    """
+    ElementTree.ElementTree(root).write(
+        path,
+        encoding="UTF-8",
+        xml_declaration=True
+    )
@@ -0,0 +1,119 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for the link-time
+optimization flags and tools.
+"""
+
+import os
+
+from ..support.platform_names import get_darwin_system_name
+
+from .which import which
+
+
+def get_thin_lto_name():
+    """Gives the name of the ThinLTO mode."""
+    return "thin"
+
+
+def get_full_lto_name():
+    """Gives the name of the full LTO mode."""
+    return "full"
+
+
+def get_lto_names():
+    """Gives the names of the link-time optimization modes."""
+    return [get_thin_lto_name(), get_full_lto_name()]
+
+
+def is_clang_compiler(compiler):
+    """
+    Tells whether the given compiler is Clang.
+
+    compiler -- The path to the compiler.
+    """
+    return "clang" in os.path.basename(compiler)
+
+
+def get_lto_flags(lto, compiler):
+    """
+    Gives the compiler and linker flags of the given link-time
+    optimization mode. GCC doesn't have ThinLTO so it uses its own
+    parallel link-time optimization in both modes.
+
+    lto -- The link-time optimization mode.
+
+    compiler -- The path to the compiler.
+    """
+    if not is_clang_compiler(compiler):
+        return ["-flto=auto"]
+    if lto == get_thin_lto_name():
+        return ["-flto=thin"]
+    return ["-flto"]
+
+
+def get_thin_lto_cache_flags(cache_directory, linker, host_system):
+    """
+    Gives the linker flags that make the linker keep the ThinLTO
+    cache in the given directory. The cache is pruned after a week
+    or when it grows over four gigabytes.
+
+    cache_directory -- The path to the cache directory.
+
+    linker -- The name of the linker, either 'lld' or 'gold'.
+
+    host_system -- The system this script is run on.
+    """
+    if host_system == get_darwin_system_name():
+        return ["-Wl,-cache_path_lto,{}".format(cache_directory)]
+    if linker == "lld":
+        return [
+            "-Wl,--thinlto-cache-dir={}".format(cache_directory),
+            "-Wl,--thinlto-cache-policy=prune_after=168h:"
+            "cache_size_bytes=4g"
+        ]
+    if linker == "gold":
+        return ["-Wl,-plugin-opt,cache-dir={}".format(cache_directory)]
+    return []
+
+
+def find_lld_or_gold():
+    """
+    Gives the name of LLD or, if it isn't found, gold, or None if
+    neither is found. Unlike the default BFD linker, they can link
+    the LLVM bitcode and create the GDB index. This function isn't
+    pure as it looks for the linkers from the system.
+    """
+    for linker in ["lld", "gold"]:
+        if which("ld.{}".format(linker)):
+            return linker
+    return None
+
+
+def find_lto_archivers(compiler):
+    """
+    Gives a tuple of the paths to the archiver and the index
+    generator that understand the intermediate code of the given
+    compiler, or None if they aren't found. This function isn't
+    pure as it looks for the tools from the system.
+
+    compiler -- The path to the compiler.
+    """
+    if is_clang_compiler(compiler):
+        names = ["llvm-ar", "llvm-ranlib"]
+    else:
+        names = ["gcc-ar", "gcc-ranlib"]
+    directory = os.path.dirname(compiler)
+    tools = []
+    for name in names:
+        local_tool = os.path.join(directory, name)
+        if directory and os.access(local_tool, os.X_OK):
+            tools.append(local_tool)
+        else:
+            tools.append(which(name))
+    if not all(tools):
+        return None
+    return tools[0], tools[1]
+
@@ -0,0 +1,211 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for creating and comparing
+the content manifests of the artefacts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import sys
+import tarfile
+import zipfile
+
+from .compression import \
+    get_unavailable_compression_message, is_compression_available, \
+    open_decompressed
+
+
+def get_manifest_version():
+    """Gives the version of the format of the manifests."""
+    return 1
+
+
+def _hash_stream(stream):
+    """
+    Calculates the SHA-256 hash of the contents of the given file
+    object.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _create_entry(digest, size, mode):
+    """Creates an entry of a single file in a manifest."""
+    return {"sha256": digest, "size": size, "mode": "{:o}".format(mode)}
+
+
+def create_manifest(directory):
+    """
+    Creates a manifest of the files in the given directory. The
+    manifest maps the relative paths of the files to their hashes,
+    sizes, and modes. This function isn't pure as it reads the
+    files.
+
+    directory -- The directory that the manifest is created for.
+    """
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            relpath = os.path.relpath(path, directory).replace(os.sep, "/")
+            if os.path.islink(path):
+                files[relpath] = _create_entry(
+                    hashlib.sha256(
+                        os.readlink(path).encode("utf-8")
+                    ).hexdigest(),
+                    0,
+                    stat.S_IFLNK | 0o777
+                )
+                continue
+            with open(path, "rb") as f:
+                digest = _hash_stream(f)
+            info = os.stat(path)
+            files[relpath] = _create_entry(
+                digest,
+                info.st_size,
+                stat.S_IMODE(info.st_mode)
+            )
+    return {"version": get_manifest_version(), "files": files}
+
+
+def _normalize_archive_name(name):
+    """
+    Normalizes a name of an archive member to a relative path
+    that is used in the manifests.
+    """
+    return os.path.normpath(name).replace(os.sep, "/").lstrip("/")
+
+
+def _create_tar_manifest_entries(archive):
+    """
+    Gives the manifest entries of the files in the given tar
+    archive. The archive is read in order so that it may be a
+    stream.
+    """
+    files = {}
+    for info in archive:
+        name = _normalize_archive_name(info.name)
+        if info.issym():
+            files[name] = _create_entry(
+                hashlib.sha256(info.linkname.encode("utf-8")).hexdigest(),
+                0,
+                stat.S_IFLNK | 0o777
+            )
+        elif info.isfile():
+            files[name] = _create_entry(
+                _hash_stream(archive.extractfile(info)),
+                info.size,
+                info.mode
+            )
+    return files
+
+
+def create_archive_manifest(path):
+    """
+    Creates a manifest of the files in the given archive. This
+    function isn't pure as it reads the archive.
+
+    path -- The path to the archive.
+    """
+    files = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.filename.endswith("/"):
+                    continue
+                with archive.open(info) as f:
+                    digest = _hash_stream(f)
+                files[_normalize_archive_name(info.filename)] = \
+                    _create_entry(
+                        digest,
+                        info.file_size,
+                        stat.S_IMODE(info.external_attr >> 16)
+                    )
+    elif path.endswith(".zst"):
+        # The tarfile module can't read Zstandard so the archive is
+        # decompressed separately.
+        if not is_compression_available("zst"):
+            logging.critical(
+                "Couldn't read %s: %s",
+                path,
+                get_unavailable_compression_message("zst")
+            )
+            sys.exit(1)
+        with open_decompressed(path, "zst") as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as archive:
+                files = _create_tar_manifest_entries(archive)
+    else:
+        with tarfile.open(path) as archive:
+            files = _create_tar_manifest_entries(archive)
+    return {"version": get_manifest_version(), "files": files}
+
+
+def read_manifest(path):
+    """
+    Reads the manifest from the given path. If the path points to
+    an archive, the manifest is created from the contents of the
+    archive. This function isn't pure as it reads the file.
+
+    path -- The path to a manifest file or to an artefact.
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    manifest_path = get_manifest_path(path)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    if os.path.isdir(path):
+        return create_manifest(path)
+    return create_archive_manifest(path)
+
+
+def write_manifest(manifest, path):
+    """
+    Writes the manifest to the given path in a stable format.
+    This function isn't pure as it writes the file.
+
+    manifest -- The manifest that is written.
+
+    path -- The path to the manifest file.
+    """
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def get_manifest_path(artefact_path):
+    """
+    Gives the path to the manifest of the given artefact.
+
+    artefact_path -- The path to the artefact.
+    """
+    return "{}.manifest.json".format(artefact_path)
+
+
+def compare_manifests(old, new):
+    """
+    Compares two manifests. Gives a tuple containing the sorted
+    lists of the files that are changed or added in the new
+    manifest and of the files that are removed from it.
+
+    old -- The manifest of the previous artefact.
+
+    new -- The manifest of the current artefact.
+    """
+    old_files = old["files"]
+    new_files = new["files"]
+    changed = sorted(
+        name for name, entry in new_files.items()
+        if old_files.get(name) != entry
+    )
+    removed = sorted(name for name in old_files if name not in new_files)
+    return changed, removed
@@ -0,0 +1,67 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for reading the build log of
+Ninja.
+"""
+
+import os
+
+
+def parse_ninja_log(text):
+    """
+    Parses the entries of the given Ninja build log. Ninja appends
+    the entries of every build to the log in the order the commands
+    finish, so the start times of a parallel build aren't ordered
+    but the end times are. The entries are thus split into builds
+    at the points where the end time goes back. Gives a list of
+    the builds, each of which is a list of tuples of the start and
+    end times in milliseconds and the output path.
+
+    text -- The contents of the '.ninja_log' file.
+    """
+    builds = []
+    previous_end = None
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        parts = line.split("\t")
+        if len(parts) < 4:
+            continue
+        start, end, output = int(parts[0]), int(parts[1]), parts[3]
+        if previous_end is None or end < previous_end:
+            builds.append([])
+        builds[-1].append((start, end, output))
+        previous_end = end
+    return builds
+
+
+def is_link_output(path):
+    """
+    Tells whether the given output of the build may be created by
+    the linker. The shared libraries and the outputs without an
+    extension, which are the executables on the Unix-like systems,
+    are linked while the object files, the static libraries, and
+    the internal files of CMake aren't.
+
+    path -- The output path relative to the build directory.
+    """
+    parts = path.replace("\\", "/").split("/")
+    if "CMakeFiles" in parts or parts[-1].startswith("."):
+        return False
+    name = parts[-1]
+    extension = os.path.splitext(name)[1]
+    return extension in (".so", ".dylib", ".exe", ".dll") \
+        or ".so." in name \
+        or not extension
+
+
+def is_compile_output(path):
+    """
+    Tells whether the given output of the build is an object file
+    that is created by compiling a translation unit.
+
+    path -- The output path relative to the build directory.
+    """
+    return os.path.splitext(path)[1] in (".o", ".obj")
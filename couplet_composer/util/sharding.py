@@ -0,0 +1,40 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for splitting work between
+shards.
+"""
+
+
+def partition_by_cost(items, costs, count, default_cost=None):
+    """
+    Partitions the given items deterministically into the given
+    number of shards so that the total costs of the shards are as
+    even as possible. The items are assigned from the most costly
+    to the least costly one to the shard with the smallest total
+    cost. Gives a list of sorted lists of the items in the shards.
+
+    items -- The items to partition.
+
+    costs -- A dictionary that maps the items to their costs. The
+    items without a cost get the default cost.
+
+    count -- The number of the shards.
+
+    default_cost -- The cost of the items that don't have a cost.
+    The median of the known costs is used by default.
+    """
+    if default_cost is None:
+        known = sorted(costs[item] for item in items if item in costs)
+        default_cost = known[len(known) // 2] if known else 1.0
+    shards = [[] for _ in range(count)]
+    totals = [0.0] * count
+    for item in sorted(
+        set(items),
+        key=lambda item: (-costs.get(item, default_cost), item)
+    ):
+        index = min(range(count), key=lambda i: (totals[i], i))
+        shards[index].append(item)
+        totals[index] += costs.get(item, default_cost)
+    return [sorted(shard) for shard in shards]
@@ -16,21 +16,35 @@ don't modify their parameters.
 
 from __future__ import print_function
 
+import hashlib
 import logging
 import os
 import pipes
 import shutil
+import stat
 import subprocess
 import sys
 import tarfile
+import time
 import zipfile
 
 from contextlib import contextmanager
 
+from functools import partial
+
+from multiprocessing.pool import ThreadPool
+
 from ..support.platform_names import get_darwin_system_name
 
 from .cache import cached
 
+from .compression import \
+    get_compression_command, get_default_compression_level, \
+    get_unavailable_compression_message, is_compression_available, \
+    open_compressed
+
+from .file_copy import copy_file
+
 from .target import current_platform
 
 
@@ -69,6 +83,14 @@ def _echo_command(dry_run, command, env=None, prompt="+ "):
     file.flush()
 
 
+def echo_command(command, env=None, dry_run=None):
+    """
+    Echoes a command that is run by other means than the helpers
+    of this module. Thus this function isn't pure.
+    """
+    _echo_command(dry_run, command, env=env)
+
+
 def call(command, stderr=None, env=None, dry_run=None, echo=None):
     """Runs the given command."""
     if dry_run or echo:
@@ -96,6 +118,60 @@ def call(command, stderr=None, env=None, dry_run=None, echo=None):
         sys.exit(1)
 
 
+def _run_parallel_command(command, env):
+    """
+    Runs a single command of a parallel call. Gives the exit status
+    of the command, or None if the command couldn't be run, and the
+    possible error message.
+    """
+    try:
+        return subprocess.call(command, env=env), None
+    except OSError as e:
+        return None, e.strerror
+
+
+def call_parallel(commands, jobs=None, env=None, dry_run=None, echo=None):
+    """
+    Runs the given commands in parallel. The commands are run in
+    threads as every command runs in its own process anyway. If any
+    of the commands fails, the execution is stopped after all of the
+    commands have finished.
+    """
+    if dry_run or echo:
+        for command in commands:
+            _echo_command(dry_run, command, env=env)
+    if dry_run or not commands:
+        return
+    _env = None
+    if env is not None:
+        _env = dict(os.environ)
+        _env.update(env)
+    pool = ThreadPool(jobs)
+    try:
+        results = pool.map(
+            partial(_run_parallel_command, env=_env),
+            commands
+        )
+    finally:
+        pool.close()
+        pool.join()
+    for command, (returncode, error) in zip(commands, results):
+        if error is not None:
+            logging.critical(
+                "Couldn't run '%s': %s",
+                quote_command(command),
+                error
+            )
+            sys.exit(1)
+        if returncode != 0:
+            logging.critical(
+                "Command '%s' ended with status %d, stopping",
+                quote_command(command),
+                returncode
+            )
+            sys.exit(returncode)
+
+
 def capture(
     command,
     stderr=None,
@@ -167,36 +243,239 @@ def makedirs(path, dry_run=None, echo=None):
         os.makedirs(path)
 
 
-def copytree(src, dest, dry_run=None, echo=None):
-    """Copies a directory and its contents."""
+def _copy_tree(src, dest, hardlink):
+    """
+    Copies the contents of a directory into the destination file
+    by file by using the fastest available copying method. The
+    existing files in the destination are kept.
+    """
+    directories = []
+    for dirpath, _, filenames in os.walk(src, followlinks=True):
+        dest_dir = os.path.normpath(
+            os.path.join(dest, os.path.relpath(dirpath, src))
+        )
+        if not os.path.isdir(dest_dir):
+            os.makedirs(dest_dir)
+        directories.append((dirpath, dest_dir))
+        for name in filenames:
+            copy_file(
+                os.path.join(dirpath, name),
+                os.path.join(dest_dir, name),
+                allow_link=hardlink
+            )
+    # The metadata of the directories is copied last as adding the
+    # files changes their modification times.
+    for dirpath, dest_dir in reversed(directories):
+        shutil.copystat(dirpath, dest_dir)
+
+
+def copytree(src, dest, hardlink=False, dry_run=None, echo=None):
+    """
+    Copies a directory and its contents. The files may be hard
+    linked instead of copied if the copy is never modified.
+    """
     if dry_run or echo:
-        _echo_command(dry_run, ["cp", "-r", src, dest])
+        _echo_command(dry_run, ["cp", "-rl" if hardlink else "-r", src, dest])
     if dry_run:
         return
-    # A workaround
-    if os.path.isdir(dest):
-        for item in os.listdir(src):
-            s = os.path.join(src, item)
-            d = os.path.join(dest, item)
-            if os.path.isdir(s):
-                shutil.copytree(s, d)  # , symlinks, ignore)
-            else:
-                shutil.copy2(s, d)
-    else:
-        shutil.copytree(src, dest)
+    _copy_tree(src, dest, hardlink=hardlink)
 
 
-def copy(src, dest, dry_run=None, echo=None):
-    """Copies a file."""
+def copy(src, dest, hardlink=False, dry_run=None, echo=None):
+    """
+    Copies a file. The file may be hard linked instead of copied
+    if the copy is never modified.
+    """
     if dry_run or echo:
-        _echo_command(dry_run, ["cp", "-p", src, dest])
+        _echo_command(dry_run, ["cp", "-pl" if hardlink else "-p", src, dest])
     if dry_run:
         return
     if os.path.islink(src):
         link = os.readlink(src)
         os.symlink(link, dest)
     else:
-        shutil.copy2(src, dest)
+        copy_file(src, dest, allow_link=hardlink)
+
+
+def _file_digest(path):
+    """Gives the SHA-256 digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _collect_sync_entries(sources, ignore):
+    """
+    Gives the files and the directories that a directory is
+    synchronized with. Returns a tuple that contains a dictionary
+    of the files where the keys are the paths relative to the
+    destination and the values are the source paths, and a set of
+    the relative paths of the directories.
+    """
+    files = {}
+    directories = set()
+    for src, subdir in sources:
+        for dirpath, dirnames, filenames in os.walk(src):
+            rel_dir = os.path.normpath(
+                os.path.join(subdir, os.path.relpath(dirpath, src))
+            )
+            if rel_dir != os.curdir:
+                directories.add(rel_dir)
+            # Symbolic links to directories are synchronized as
+            # links.
+            linked_dirs = [d for d in dirnames
+                           if os.path.islink(os.path.join(dirpath, d))]
+            dirnames[:] = [d for d in dirnames if d not in linked_dirs]
+            for name in filenames + linked_dirs:
+                if ignore and name in ignore:
+                    continue
+                files[os.path.normpath(os.path.join(rel_dir, name))] = \
+                    os.path.join(dirpath, name)
+    return files, directories
+
+
+def _is_synchronized(src, dest, checksum):
+    """
+    Tells whether the destination file is up to date with the
+    source file.
+    """
+    if os.path.islink(src):
+        return os.path.islink(dest) and os.readlink(src) == os.readlink(dest)
+    if os.path.islink(dest) or not os.path.isfile(dest):
+        return False
+    src_stat = os.stat(src)
+    dest_stat = os.stat(dest)
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return _file_digest(src) == _file_digest(dest)
+    return int(src_stat.st_mtime) == int(dest_stat.st_mtime)
+
+
+def _sync_file(paths):
+    """
+    Copies a file or a symbolic link over the destination that is
+    out of date. Returns the number of copied bytes.
+    """
+    src, dest = paths
+    if os.path.islink(dest) or os.path.isfile(dest):
+        os.remove(dest)
+    elif os.path.isdir(dest):
+        shutil.rmtree(dest)
+    if os.path.islink(src):
+        os.symlink(os.readlink(src), dest)
+        return 0
+    copy_file(src, dest)
+    return os.path.getsize(dest)
+
+
+def sync(
+    sources,
+    dest,
+    checksum=False,
+    delete=True,
+    ignore=None,
+    jobs=None,
+    dry_run=None,
+    echo=None
+):
+    """
+    Synchronizes a directory with the given source directories by
+    copying only the files that have changed and removing the
+    files that no longer exist in the sources.
+
+    sources -- The source directory or a list of tuples that
+    contain a source directory and the path relative to the
+    destination where it's synchronized to. Files from the later
+    sources override the ones from the earlier sources.
+
+    dest -- The directory that is synchronized.
+
+    checksum -- Whether the contents of the files are compared
+    instead of their modification times.
+
+    delete -- Whether the files and the directories that don't
+    exist in the sources are removed from the destination.
+
+    ignore -- Optional list of file names that aren't copied.
+
+    jobs -- The number of files copied in parallel.
+    """
+    if not isinstance(sources, list):
+        sources = [(sources, os.curdir)]
+    if dry_run or echo:
+        for src, subdir in sources:
+            command = ["rsync", "-a"]
+            if delete:
+                command.append("--delete")
+            if checksum:
+                command.append("--checksum")
+            for name in ignore or []:
+                command.append("--exclude={}".format(name))
+            command.extend([
+                os.path.join(src, ""),
+                os.path.join(os.path.normpath(os.path.join(dest, subdir)), "")
+            ])
+            _echo_command(dry_run, command)
+    if dry_run:
+        return
+
+    files, directories = _collect_sync_entries(sources=sources, ignore=ignore)
+
+    removed = 0
+    if delete and os.path.isdir(dest):
+        for dirpath, dirnames, filenames in os.walk(dest, topdown=False):
+            for name in filenames + dirnames:
+                path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(path, dest)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    if rel_path not in directories:
+                        shutil.rmtree(path)
+                        removed += 1
+                elif rel_path not in files:
+                    os.remove(path)
+                    removed += 1
+
+    for rel_dir in sorted(directories):
+        dir_path = os.path.join(dest, rel_dir)
+        if os.path.islink(dir_path) or os.path.isfile(dir_path):
+            os.remove(dir_path)
+        if not os.path.isdir(dir_path):
+            os.makedirs(dir_path)
+    if not os.path.isdir(dest):
+        os.makedirs(dest)
+
+    outdated = [
+        (src, os.path.join(dest, rel_path))
+        for rel_path, src in sorted(files.items())
+        if not _is_synchronized(
+            src=src,
+            dest=os.path.join(dest, rel_path),
+            checksum=checksum
+        )
+    ]
+
+    if jobs and jobs > 1 and len(outdated) > 1:
+        pool = ThreadPool(min(jobs, len(outdated)))
+        try:
+            copied_bytes = sum(pool.map(_sync_file, outdated))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        copied_bytes = sum([_sync_file(paths) for paths in outdated])
+
+    logging.debug(
+        "Synchronized %s: copied %d files (%d bytes), removed %d entries, "
+        "and %d files were up to date",
+        dest,
+        len(outdated),
+        copied_bytes,
+        removed,
+        len(files) - len(outdated)
+    )
 
 
 def rmtree(path, dry_run=None, echo=None):
@@ -271,28 +550,248 @@ def tar(path, dest=None, dry_run=None, echo=None):
                         archive.extractall()
 
 
-def create_tar(src, dest, dry_run=None, echo=None):
-    """Creates a .tar.gz archive."""
+def _log_compression(dest, input_size, start_time):
+    """
+    Logs the throughput of creating a compressed archive. Thus this
+    function isn't pure.
+    """
+    elapsed = max(time.time() - start_time, 1e-6)
+    output_size = os.path.getsize(dest)
+    mebibyte = 1024.0 * 1024.0
+    logging.info(
+        "Compressed %.1f MiB to %.1f MiB (ratio %.2f) in %.2f s "
+        "(%.1f MiB/s) for %s",
+        input_size / mebibyte,
+        output_size / mebibyte,
+        float(input_size) / output_size if output_size else 0.0,
+        elapsed,
+        input_size / mebibyte / elapsed,
+        dest
+    )
+
+
+def _list_archived_files(src, files):
+    """
+    Gives the sorted paths relative to the given directory of the
+    entries that are archived. If the files are given, only they
+    are archived.
+    """
+    if files is not None:
+        return sorted(files)
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(src):
+        dirnames.sort()
+        for name in sorted(dirnames) + sorted(filenames):
+            entries.append(os.path.relpath(os.path.join(dirpath, name), src))
+    return sorted(entries)
+
+
+def create_tar(
+    src,
+    dest,
+    arcname=os.curdir,
+    compression="gz",
+    level=None,
+    jobs=None,
+    mtime=None,
+    files=None,
+    dry_run=None,
+    echo=None
+):
+    """
+    Creates a compressed tar archive by streaming the files of the
+    given directory directly to the compressor. The gzip
+    compression is done in parallel blocks.
+
+    src -- The directory that is archived.
+
+    dest -- The path to the created archive.
+
+    arcname -- The name of the given directory in the archive.
+
+    compression -- The name of the compression, i.e. 'gz', 'xz',
+    or 'zst'.
+
+    level -- The compression level. The default level of the
+    compression is used if this is None.
+
+    jobs -- The number of parallel compression jobs.
+
+    mtime -- If this is given, the archive is made reproducible by
+    sorting the entries, setting their modification times to this
+    time, and removing the owner information.
+
+    files -- The paths of the files relative to the given directory
+    that are archived instead of the whole directory.
+    """
+    if level is None:
+        level = get_default_compression_level(compression)
     if dry_run or echo:
-        _echo_command(dry_run, ["tar", "-czf", dest, src])
+        command = [
+            "tar",
+            "-cf",
+            dest,
+            "-I",
+            get_compression_command(compression, level, jobs)
+        ]
+        if mtime is not None:
+            command.extend([
+                "--sort=name",
+                "--mtime=@{}".format(mtime),
+                "--owner=0",
+                "--group=0",
+                "--numeric-owner"
+            ])
+        command.extend(["-C", src])
+        command.extend(files if files is not None else [arcname])
+        _echo_command(dry_run, command)
     if dry_run:
         return
-    dest_file = dest
-    if dest_file.endswith(".tar.gz"):
-        dest_file = dest_file[:-7]
-    shutil.make_archive(dest_file, format="gztar", root_dir=src)
+    if not is_compression_available(compression):
+        logging.critical(get_unavailable_compression_message(compression))
+        sys.exit(1)
+
+    def _normalize(info):
+        if mtime is not None:
+            info.mtime = mtime
+            info.uid = 0
+            info.gid = 0
+            info.uname = ""
+            info.gname = ""
+        return info
+
+    start_time = time.time()
+    with open_compressed(
+        dest,
+        compression,
+        level,
+        jobs=jobs,
+        mtime=mtime
+    ) as stream:
+        with tarfile.open(fileobj=stream, mode="w|") as archive:
+            if mtime is None and files is None:
+                archive.add(src, arcname=arcname)
+            else:
+                if files is None:
+                    archive.add(
+                        src,
+                        arcname=arcname,
+                        recursive=False,
+                        filter=_normalize
+                    )
+                for name in _list_archived_files(src, files):
+                    archive.add(
+                        os.path.join(src, name),
+                        arcname=os.path.join(arcname, name),
+                        recursive=False,
+                        filter=_normalize
+                    )
+    _log_compression(dest, stream.count, start_time)
+
+
+def _get_zip_level_arguments(level):
+    """
+    Gives the keyword arguments that set the compression level of
+    the zip archives. The level can only be set on Python 3.7 and
+    later, and the default level is used on the older versions.
+    """
+    if level is None or sys.version_info < (3, 7):
+        return {}
+    return {"compresslevel": level}
+
+
+def _create_zip_info(path, archive_name, date_time):
+    """
+    Creates the zip entry information of the given file or
+    directory with a fixed modification time.
+
+    path -- The path to the file or the directory.
+
+    archive_name -- The name of the entry in the archive.
+
+    date_time -- The modification time of the entry as a tuple.
+    """
+    st = os.stat(path)
+    name = archive_name.replace(os.sep, "/")
+    if stat.S_ISDIR(st.st_mode):
+        name += "/"
+    info = zipfile.ZipInfo(name, date_time)
+    info.external_attr = (st.st_mode & 0xFFFF) << 16
+    if stat.S_ISDIR(st.st_mode):
+        # The MS-DOS directory flag.
+        info.external_attr |= 0x10
+    return info
+
+
+def create_zip(
+    src,
+    dest,
+    arcname=os.curdir,
+    level=None,
+    mtime=None,
+    files=None,
+    dry_run=None,
+    echo=None
+):
+    """
+    Creates a .zip archive by streaming the files of the given
+    directory directly to the archive.
+
+    src -- The directory that is archived.
+
+    dest -- The path to the created archive.
+
+    arcname -- The name of the given directory in the archive.
 
+    level -- The compression level. The default level of zlib is
+    used if this is None.
 
-def create_zip(src, dest, dry_run=None, echo=None):
-    """Creates a .zip archive."""
+    mtime -- If this is given, the archive is made reproducible by
+    setting the modification times of the entries to this time.
+
+    files -- The paths of the files relative to the given directory
+    that are archived instead of the whole directory.
+    """
     if dry_run or echo:
-        _echo_command(dry_run, ["zip", "-r", dest, src])
+        if files is not None:
+            _echo_command(dry_run, ["zip", dest] + files)
+        else:
+            _echo_command(dry_run, ["zip", "-r", dest, src])
     if dry_run:
         return
-    dest_file = dest
-    if dest_file.endswith(".zip"):
-        dest_file = dest_file[:-4]
-    shutil.make_archive(dest_file, format="zip", root_dir=src)
+    # Zip archives can't store times before 1980.
+    date_time = None if mtime is None \
+        else time.gmtime(max(mtime, 315532800))[:6]
+    start_time = time.time()
+    input_size = 0
+    with zipfile.ZipFile(
+        dest,
+        "w",
+        compression=zipfile.ZIP_DEFLATED,
+        **_get_zip_level_arguments(level)
+    ) as archive:
+        for name in _list_archived_files(src, files):
+            path = os.path.join(src, name)
+            archive_name = os.path.normpath(os.path.join(arcname, name))
+            if date_time is None:
+                archive.write(path, archive_name)
+            else:
+                info = _create_zip_info(path, archive_name, date_time)
+                if info.filename.endswith("/"):
+                    archive.writestr(info, b"")
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with open(path, "rb") as source:
+                        # An entry written by ZipInfo doesn't get the
+                        # level of the archive.
+                        archive.writestr(
+                            info,
+                            source.read(),
+                            **_get_zip_level_arguments(level)
+                        )
+            if os.path.isfile(path):
+                input_size += os.path.getsize(path)
+    _log_compression(dest, input_size, start_time)
 
 
 def curl(url, dest, env=None, dry_run=None, echo=None):
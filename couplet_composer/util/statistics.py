@@ -0,0 +1,113 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains the statistical helpers that are used
+for comparing the benchmark results.
+"""
+
+import math
+
+
+def median(values):
+    """
+    Gives the median of the given values.
+
+    values -- The values.
+    """
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def _rank(values):
+    """
+    Gives the ranks of the given values starting from one. The
+    tied values get the average of their ranks.
+    """
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) \
+                and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for i in range(start, end + 1):
+            ranks[order[i]] = (start + end) / 2.0 + 1
+        start = end + 1
+    return ranks
+
+
+def _count_rank_sums(first_count, second_count):
+    """
+    Gives the list of the numbers of the ways to get each value of
+    the Mann-Whitney U statistic when there are no ties.
+    """
+    # counts[n][u] is the number of the arrangements of n values
+    # of the first sample and the current number of the values of
+    # the second sample that give the statistic u.
+    counts = [[1] for _ in range(first_count + 1)]
+    for m in range(1, second_count + 1):
+        previous = counts
+        counts = [[1]]
+        for n in range(1, first_count + 1):
+            size = n * m + 1
+            row = [0] * size
+            for u, count in enumerate(previous[n]):
+                row[u] += count
+            for u, count in enumerate(counts[n - 1]):
+                row[u + m] += count
+            counts.append(row)
+    return counts[first_count]
+
+
+def mann_whitney_u(first, second):
+    """
+    Runs the two-sided Mann-Whitney U test on the given samples.
+    The exact distribution is used for small samples without ties
+    and the normal approximation with the tie correction
+    otherwise. Gives a tuple of the U statistic of the first sample
+    and the p-value.
+
+    first -- The values of the first sample.
+
+    second -- The values of the second sample.
+    """
+    first_count = len(first)
+    second_count = len(second)
+    if not first_count or not second_count:
+        raise ValueError("The samples of the Mann-Whitney U test are empty")
+
+    values = list(first) + list(second)
+    ranks = _rank(values)
+    statistic = sum(ranks[:first_count]) \
+        - first_count * (first_count + 1) / 2.0
+    mean = first_count * second_count / 2.0
+    has_ties = len(set(values)) < len(values)
+
+    if not has_ties and first_count + second_count <= 30:
+        counts = _count_rank_sums(first_count, second_count)
+        total = float(sum(counts))
+        distance = abs(statistic - mean)
+        extreme = sum(
+            count for u, count in enumerate(counts)
+            if abs(u - mean) >= distance
+        )
+        return statistic, min(1.0, extreme / total)
+
+    count = first_count + second_count
+    tie_sum = 0.0
+    for value in set(values):
+        tied = values.count(value)
+        tie_sum += tied ** 3 - tied
+    variance = first_count * second_count / 12.0 * (
+        count + 1 - tie_sum / (count * (count - 1))
+    )
+    if variance <= 0:
+        return statistic, 1.0
+    distance = max(0.0, abs(statistic - mean) - 0.5)
+    z = distance / math.sqrt(variance)
+    return statistic, min(1.0, math.erfc(z / math.sqrt(2)))
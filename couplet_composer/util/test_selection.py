@@ -0,0 +1,50 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for selecting the googletest
+tests to run.
+"""
+
+import re
+
+
+_TEST_PATTERN = re.compile(
+    r"^\s*(?:TEST|TEST_F|TEST_P|TYPED_TEST|TYPED_TEST_P)\s*\(\s*(\w+)\s*,",
+    re.MULTILINE
+)
+
+_INSTANTIATION_PATTERN = re.compile(
+    r"^\s*(?:INSTANTIATE_TEST_SUITE_P|INSTANTIATE_TEST_CASE_P|"
+    r"INSTANTIATE_TYPED_TEST_SUITE_P|INSTANTIATE_TYPED_TEST_CASE_P)"
+    r"\s*\(\s*(\w+)\s*,\s*(\w+)\s*,",
+    re.MULTILINE
+)
+
+
+def find_test_suites(text):
+    """
+    Gives the sorted names of the googletest test suites that are
+    defined in the given source code. The names of the
+    instantiations of the parameterized suites are given with
+    their prefixes.
+
+    text -- The source code.
+    """
+    suites = set(_TEST_PATTERN.findall(text))
+    for prefix, suite in _INSTANTIATION_PATTERN.findall(text):
+        suites.add("{}/{}".format(prefix, suite))
+    return sorted(suites)
+
+
+def create_gtest_filter(suites):
+    """
+    Creates a googletest filter that runs all of the tests in the
+    given test suites.
+
+    suites -- The names of the test suites.
+    """
+    return ":".join(
+        "{}.*".format(suite) if "/" not in suite else "{}*".format(suite)
+        for suite in sorted(set(suites))
+    )
@@ -0,0 +1,26 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This utility module contains helpers for the compiler flags of
+the builds that are tuned for a CPU.
+"""
+
+
+def get_native_tune_name():
+    """Gives the name of the tuning for the CPU of this machine."""
+    return "native"
+
+
+def get_tune_flags(tune):
+    """
+    Gives the compiler flags that tune the build for the given CPU.
+    The generic microarchitecture levels, like 'x86-64-v3', aren't
+    valid values of '-mtune', so only '-march' is given for the
+    named CPUs and the compiler tunes for them by default.
+
+    tune -- The CPU the build is tuned for.
+    """
+    if tune == get_native_tune_name():
+        return ["-march=native", "-mtune=native"]
+    return ["-march={}".format(tune)]
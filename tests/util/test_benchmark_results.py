@@ -0,0 +1,35 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the benchmark result utilities."""
+
+from couplet_composer.util.benchmark_results import \
+    compare_benchmarks, format_table, read_benchmark_samples
+
+
+def test_read_benchmark_samples():
+    report = {"benchmarks": [
+        {"name": "BM_a", "run_name": "BM_a", "run_type": "iteration",
+         "real_time": 2.0, "time_unit": "us"},
+        {"name": "BM_a", "run_name": "BM_a", "run_type": "iteration",
+         "real_time": 3.0, "time_unit": "us"},
+        {"name": "BM_a_mean", "run_name": "BM_a", "run_type": "aggregate",
+         "real_time": 2.5, "time_unit": "us"},
+        {"name": "BM_b", "real_time": 7.0, "error_occurred": True}
+    ]}
+    assert read_benchmark_samples(report) == {"BM_a": [2000.0, 3000.0]}
+
+
+def test_compare_benchmarks():
+    baseline = {"a": [10, 11, 12, 13, 14], "b": [10, 11, 12, 13, 14]}
+    current = {"a": [20, 21, 22, 23, 24], "b": [10, 12, 11, 14, 13]}
+    comparisons = compare_benchmarks(baseline, current, 0.05, 0.05)
+    assert [(c.name, c.status) for c in comparisons] == [
+        ("a", "regressed"),
+        ("b", "unchanged")
+    ]
+
+
+def test_format_table():
+    assert format_table(["name", "time"], [["a", "1.0"], ["bbb", "10.0"]]) \
+        == "name  time\n----  ----\na      1.0\nbbb   10.0"
@@ -0,0 +1,54 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the compression utilities."""
+
+import gzip
+import io
+import lzma
+import os
+
+from couplet_composer.util.compression import \
+    ParallelGzipFile, get_compression_level_range, open_compressed
+
+
+def _compress_in_parallel(data, jobs, chunk_size):
+    output = io.BytesIO()
+    compressor = ParallelGzipFile(output, level=6, jobs=jobs, mtime=0)
+    for i in range(0, len(data), chunk_size):
+        compressor.write(data[i:i + chunk_size])
+    compressor.close()
+    return output.getvalue()
+
+
+def test_parallel_gzip_round_trip():
+    data = os.urandom(200 * 1024) + b"anthem " * 300000
+    compressed = _compress_in_parallel(data, jobs=4, chunk_size=10000)
+    assert gzip.decompress(compressed) == data
+    assert len(compressed) < len(data)
+
+
+def test_parallel_gzip_is_independent_of_jobs():
+    data = b"".join(
+        "line {}\n".format(i).encode("utf-8") for i in range(100000)
+    )
+    assert _compress_in_parallel(data, jobs=1, chunk_size=4096) == \
+        _compress_in_parallel(data, jobs=8, chunk_size=65536)
+
+
+def test_parallel_gzip_empty():
+    assert gzip.decompress(_compress_in_parallel(b"", 2, 1)) == b""
+
+
+def test_open_compressed_xz(tmp_path):
+    dest = tmp_path / "data.xz"
+    with open_compressed(str(dest), "xz", 1) as stream:
+        stream.write(b"ode" * 1000)
+    assert stream.count == 3000
+    assert lzma.decompress(dest.read_bytes()) == b"ode" * 1000
+
+
+def test_get_compression_level_range():
+    assert get_compression_level_range("gz") == (0, 9)
+    assert get_compression_level_range("xz") == (0, 9)
+    assert get_compression_level_range("zst") == (1, 19)
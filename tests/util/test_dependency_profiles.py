@@ -0,0 +1,34 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the dependency profile utilities."""
+
+from couplet_composer.util.dependency_profiles import \
+    get_profile_digest, select_dependency_profile
+
+
+def test_select_dependency_profile():
+    data_node = {
+        "name": "Glad",
+        "version": "0.1.34",
+        "profiles": {
+            "default": {"generator": "c-debug", "buildVariant": "Release"},
+            "release": {"generator": "c"}
+        }
+    }
+    assert select_dependency_profile(data_node, "Release") == {
+        "generator": "c",
+        "buildVariant": "Release"
+    }
+    assert select_dependency_profile(data_node, "Debug") == {
+        "generator": "c-debug",
+        "buildVariant": "Release"
+    }
+    assert select_dependency_profile({"name": "Lua"}, "Debug") == {}
+
+
+def test_get_profile_digest():
+    assert get_profile_digest({}) is None
+    assert get_profile_digest({"a": 1, "b": 2}) \
+        == get_profile_digest({"b": 2, "a": 1})
+    assert get_profile_digest({"a": 1}) != get_profile_digest({"a": 2})
@@ -0,0 +1,18 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""
+This module defines the tests for the shared store of the
+dependencies.
+"""
+
+from couplet_composer.util.dependency_store import get_store_entry_name
+
+
+def test_get_store_entry_name():
+    name = get_store_entry_name("1.8.5", ["{}", "4.6"])
+    assert name.startswith("1.8.5-")
+    assert len(name) == len("1.8.5-") + 8
+    assert name == get_store_entry_name("1.8.5", ["{}", "4.6"])
+    assert name != get_store_entry_name("1.8.5", ["{}", "3.3"])
+    assert name != get_store_entry_name("1.8.5", ["{}4.6"])
@@ -0,0 +1,31 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the dependency file parsers."""
+
+from couplet_composer.util.depfile import parse_depfile, parse_ninja_deps
+
+
+def test_parse_depfile():
+    text = "src/anthem.cpp.o: ../src/anthem.cpp \\\n" \
+        "  ../include/anthem.h ../include/with\\ space.h\n"
+    assert parse_depfile(text) == {
+        "src/anthem.cpp.o": [
+            "../src/anthem.cpp",
+            "../include/anthem.h",
+            "../include/with space.h"
+        ]
+    }
+
+
+def test_parse_ninja_deps():
+    text = "src/anthem.cpp.o: #deps 2, deps mtime 123 (VALID)\n" \
+        "    ../src/anthem.cpp\n" \
+        "    ../include/anthem.h\n" \
+        "\n" \
+        "src/ode.cpp.o: #deps 1, deps mtime 123 (STALE)\n" \
+        "    ../src/ode.cpp\n" \
+        "\n"
+    assert parse_ninja_deps(text) == {
+        "src/anthem.cpp.o": ["../src/anthem.cpp", "../include/anthem.h"]
+    }
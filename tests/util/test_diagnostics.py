@@ -0,0 +1,36 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the diagnostics utilities."""
+
+from couplet_composer.util.diagnostics import \
+    deduplicate_diagnostics, split_diagnostics
+
+
+def _output(source):
+    return "{}:3:1: warning: bad name [readability-x]\n" \
+        "int a;\n" \
+        "^\n" \
+        "/src/anthem.h:1:5: warning: header [modernize-y]\n" \
+        "/src/anthem.h:1:1: note: declared here\n".format(source)
+
+
+def test_split_diagnostics():
+    diagnostics = split_diagnostics("Error while processing\n" +
+                                    _output("/src/a.cpp"))
+    assert [key for key, _ in diagnostics] == [
+        None,
+        ("/src/a.cpp", 3, "readability-x"),
+        ("/src/anthem.h", 1, "modernize-y")
+    ]
+    assert diagnostics[2][1] == "/src/anthem.h:1:5: warning: header " \
+        "[modernize-y]\n/src/anthem.h:1:1: note: declared here\n"
+
+
+def test_deduplicate_diagnostics():
+    seen = set()
+    first = deduplicate_diagnostics(_output("/src/a.cpp"), seen)
+    second = deduplicate_diagnostics(_output("/src/b.cpp"), seen)
+    assert first == _output("/src/a.cpp")
+    assert second == "/src/b.cpp:3:1: warning: bad name [readability-x]\n" \
+        "int a;\n^\n"
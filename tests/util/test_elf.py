@@ -0,0 +1,32 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the ELF utilities."""
+
+import os
+
+from couplet_composer.util import elf
+
+
+def _elf_header(elf_type):
+    return b"\x7fELF\x02\x01\x01" + b"\x00" * 9 + bytes([elf_type, 0])
+
+
+def test_find_elf_binaries(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "anthem").write_bytes(_elf_header(2))
+    (tmp_path / "lib" / "libode.so").write_bytes(_elf_header(3))
+    (tmp_path / "anthem.dwo").write_bytes(_elf_header(1))
+    (tmp_path / "launch").write_bytes(b"#!/bin/sh\n")
+    os.symlink("libode.so", str(tmp_path / "lib" / "libode.so.1"))
+    assert elf.find_elf_binaries(str(tmp_path)) == [
+        str(tmp_path / "anthem"),
+        str(tmp_path / "lib" / "libode.so")
+    ]
+
+
+def test_is_elf_shared_object(tmp_path):
+    (tmp_path / "anthem").write_bytes(_elf_header(2))
+    (tmp_path / "libode.so").write_bytes(_elf_header(3))
+    assert not elf.is_elf_shared_object(str(tmp_path / "anthem"))
+    assert elf.is_elf_shared_object(str(tmp_path / "libode.so"))
@@ -0,0 +1,50 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the file copying backend."""
+
+import os
+import stat
+
+from couplet_composer.util import file_copy
+
+
+def test_copy_file(tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    src.write_bytes(b"anthem" * 1024)
+    os.chmod(str(src), 0o755)
+    file_copy.copy_file(str(src), str(dest))
+    assert dest.read_bytes() == src.read_bytes()
+    assert stat.S_IMODE(os.stat(str(dest)).st_mode) == 0o755
+    assert not os.path.samefile(str(src), str(dest))
+
+
+def test_copy_file_to_directory(tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    src.write_bytes(b"ode")
+    file_copy.copy_file(str(src), str(dest))
+    assert (dest / "src").read_bytes() == b"ode"
+
+
+def test_copy_file_hardlink(tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    src.write_bytes(b"anthem")
+    assert file_copy.copy_file(str(src), str(dest), allow_link=True) \
+        == "hardlink"
+    assert os.path.samefile(str(src), str(dest))
+
+
+def test_copy_file_replaces_hardlinked_destination(tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    linked = tmp_path / "linked"
+    src.write_bytes(b"new")
+    dest.write_bytes(b"old")
+    os.link(str(dest), str(linked))
+    file_copy.copy_file(str(src), str(dest))
+    assert dest.read_bytes() == b"new"
+    assert linked.read_bytes() == b"old"
@@ -0,0 +1,43 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the googletest XML utilities."""
+
+from couplet_composer.util.gtest_xml import \
+    find_failed_tests, find_slowest_tests, merge_test_reports
+
+
+def _report(suite, cases):
+    return (
+        '<testsuites tests="{count}" failures="0" time="1">'
+        '<testsuite name="{suite}" tests="{count}" failures="{failures}" '
+        'disabled="0" errors="0" time="{time}">{cases}</testsuite>'
+        '</testsuites>'
+    ).format(
+        suite=suite,
+        count=len(cases),
+        failures=sum(1 for _, _, failed in cases if failed),
+        time=sum(time for _, time, _ in cases),
+        cases="".join(
+            '<testcase name="{}" time="{}">{}</testcase>'.format(
+                name,
+                time,
+                "<failure message=\"x\"/>" if failed else ""
+            ) for name, time, failed in cases
+        )
+    )
+
+
+def test_merge_test_reports():
+    merged = merge_test_reports([
+        _report("Ode", [("A", 0.5, False), ("B", 2.0, True)]),
+        _report("Ode", [("C", 1.0, False)]),
+        _report("Anthem", [("D", 0.25, False)])
+    ])
+    assert merged.get("tests") == "4"
+    assert merged.get("failures") == "1"
+    assert [s.get("name") for s in merged.findall("testsuite")] == \
+        ["Ode", "Anthem"]
+    assert merged.find("testsuite").get("tests") == "3"
+    assert find_slowest_tests(merged, 2) == [(2.0, "Ode.B"), (1.0, "Ode.C")]
+    assert find_failed_tests(merged) == ["Ode.B"]
@@ -0,0 +1,26 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the link-time optimization utilities."""
+
+from couplet_composer.util.lto import get_lto_flags, get_thin_lto_cache_flags
+
+
+def test_get_lto_flags():
+    assert get_lto_flags("thin", "/usr/bin/clang++") == ["-flto=thin"]
+    assert get_lto_flags("full", "/usr/bin/clang++-12") == ["-flto"]
+    assert get_lto_flags("thin", "/usr/bin/g++") == ["-flto=auto"]
+
+
+def test_get_thin_lto_cache_flags():
+    assert get_thin_lto_cache_flags("/c", "lld", "linux") == [
+        "-Wl,--thinlto-cache-dir=/c",
+        "-Wl,--thinlto-cache-policy=prune_after=168h:cache_size_bytes=4g"
+    ]
+    assert get_thin_lto_cache_flags("/c", "gold", "linux") == [
+        "-Wl,-plugin-opt,cache-dir=/c"
+    ]
+    assert get_thin_lto_cache_flags("/c", None, "darwin") == [
+        "-Wl,-cache_path_lto,/c"
+    ]
+    assert get_thin_lto_cache_flags("/c", None, "linux") == []
@@ -0,0 +1,65 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the manifest utilities."""
+
+import hashlib
+
+import pytest
+
+from couplet_composer.util import manifest, shell
+
+from couplet_composer.util.compression import is_compression_available
+
+
+def test_create_manifest(tmp_path):
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "launch").write_bytes(b"launch")
+    (tmp_path / "lib" / "anthem.lua").write_bytes(b"return {}")
+    files = manifest.create_manifest(str(tmp_path))["files"]
+    assert sorted(files) == ["launch", "lib/anthem.lua"]
+    assert files["launch"]["sha256"] == hashlib.sha256(b"launch").hexdigest()
+    assert files["lib/anthem.lua"]["size"] == 9
+
+
+def test_archive_manifest_matches_directory(tmp_path):
+    src = tmp_path / "run"
+    (src / "lib").mkdir(parents=True)
+    (src / "launch").write_bytes(b"launch")
+    (src / "lib" / "anthem.lua").write_bytes(b"return {}")
+    tar_path = str(tmp_path / "anthem.tar.gz")
+    zip_path = str(tmp_path / "anthem.zip")
+    shell.create_tar(str(src), tar_path, mtime=0)
+    shell.create_zip(str(src), zip_path, mtime=0)
+    expected = manifest.create_manifest(str(src))
+    assert manifest.create_archive_manifest(tar_path) == expected
+    assert manifest.create_archive_manifest(zip_path) == expected
+
+
+@pytest.mark.skipif(
+    not is_compression_available("zst"),
+    reason="Zstandard isn't available"
+)
+def test_zst_archive_manifest_matches_directory(tmp_path):
+    src = tmp_path / "run"
+    (src / "lib").mkdir(parents=True)
+    (src / "launch").write_bytes(b"launch")
+    (src / "lib" / "anthem.lua").write_bytes(b"return {}")
+    tar_path = str(tmp_path / "anthem.tar.zst")
+    shell.create_tar(str(src), tar_path, compression="zst", mtime=0)
+    expected = manifest.create_manifest(str(src))
+    assert manifest.create_archive_manifest(tar_path) == expected
+
+
+def test_compare_manifests():
+    old = {"files": {
+        "a": {"sha256": "1"},
+        "b": {"sha256": "2"},
+        "c": {"sha256": "3"}
+    }}
+    new = {"files": {
+        "a": {"sha256": "1"},
+        "b": {"sha256": "4"},
+        "d": {"sha256": "5"}
+    }}
+    assert manifest.compare_manifests(old, new) == (["b", "d"], ["c"])
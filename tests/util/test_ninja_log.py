@@ -0,0 +1,53 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the Ninja build log utilities."""
+
+from couplet_composer.util.ninja_log import \
+    is_compile_output, is_link_output, parse_ninja_log
+
+
+def test_parse_ninja_log():
+    text = "# ninja log v5\n" \
+        "0\t100\t1\tCMakeFiles/a.dir/a.cpp.o\tabc\n" \
+        "100\t400\t2\tbin/anthem\tdef\n" \
+        "0\t50\t3\tCMakeFiles/a.dir/a.cpp.o\tabc\n" \
+        "50\t250\t4\tbin/anthem\tdef\n"
+    assert parse_ninja_log(text) == [
+        [(0, 100, "CMakeFiles/a.dir/a.cpp.o"), (100, 400, "bin/anthem")],
+        [(0, 50, "CMakeFiles/a.dir/a.cpp.o"), (50, 250, "bin/anthem")]
+    ]
+
+
+def test_parse_ninja_log_with_parallel_entries():
+    text = "# ninja log v5\n" \
+        "0\t150\t1\tCMakeFiles/b.dir/b.cpp.o\tabc\n" \
+        "100\t200\t2\tCMakeFiles/a.dir/a.cpp.o\tdef\n" \
+        "0\t1000\t3\tbin/anthem\tghi\n" \
+        "0\t80\t4\tCMakeFiles/a.dir/a.cpp.o\tdef\n" \
+        "80\t300\t5\tbin/anthem\tghi\n"
+    assert parse_ninja_log(text) == [
+        [
+            (0, 150, "CMakeFiles/b.dir/b.cpp.o"),
+            (100, 200, "CMakeFiles/a.dir/a.cpp.o"),
+            (0, 1000, "bin/anthem")
+        ],
+        [(0, 80, "CMakeFiles/a.dir/a.cpp.o"), (80, 300, "bin/anthem")]
+    ]
+
+
+def test_is_link_output():
+    assert is_link_output("bin/anthem")
+    assert is_link_output("lib/libode.so.1.0")
+    assert is_link_output("libode.dylib")
+    assert not is_link_output("CMakeFiles/a.dir/a.cpp.o")
+    assert not is_link_output("lib/libode.a")
+    assert not is_link_output("CMakeFiles/install.util")
+    assert not is_link_output(".ninja_deps")
+
+
+def test_is_compile_output():
+    assert is_compile_output("CMakeFiles/a.dir/a.cpp.o")
+    assert is_compile_output("a.dir/Debug/a.obj")
+    assert not is_compile_output("bin/anthem")
+    assert not is_compile_output("lib/libode.a")
@@ -0,0 +1,26 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the sharding utilities."""
+
+from couplet_composer.util.sharding import partition_by_cost
+
+
+def test_partition_by_cost():
+    costs = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 4.0, "e": 1.0}
+    assert partition_by_cost(["e", "d", "c", "b", "a"], costs, 2) == [
+        ["a", "d"],
+        ["b", "c", "e"]
+    ]
+
+
+def test_partition_by_cost_uses_median_for_unknown():
+    costs = {"a": 1.0, "b": 3.0, "c": 5.0}
+    assert partition_by_cost(["a", "b", "c", "x"], costs, 2) == [
+        ["a", "c"],
+        ["b", "x"]
+    ]
+
+
+def test_partition_by_cost_more_shards_than_items():
+    assert partition_by_cost(["a"], {}, 3) == [["a"], [], []]
@@ -3,6 +3,10 @@
 
 """This module defines the tests for the shell utilities."""
 
+import os
+import tarfile
+import zipfile
+
 from couplet_composer.util import shell
 
 
@@ -10,3 +14,133 @@ def test_quote_command():
     cmd = ["app", "--option", "value", "--another-option=and-value"]
     expected = "app --option value --another-option=and-value"
     assert shell.quote_command(cmd) == expected
+
+
+class TestSync:
+    def test_sync_copies_and_removes(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        (src / "sub").mkdir(parents=True)
+        (src / "a.txt").write_text("a")
+        (src / "sub" / "b.txt").write_text("b")
+        (src / "CMakeLists.txt").write_text("ignored")
+        (dest / "stale").mkdir(parents=True)
+        (dest / "stale" / "c.txt").write_text("c")
+        shell.sync(str(src), str(dest), ignore=["CMakeLists.txt"])
+        assert sorted(p.name for p in dest.rglob("*")) == \
+            ["a.txt", "b.txt", "sub"]
+        assert (dest / "sub" / "b.txt").read_text() == "b"
+
+    def test_sync_overlays_sources(self, tmp_path):
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        dest = tmp_path / "dest"
+        first.mkdir()
+        second.mkdir()
+        (first / "a.txt").write_text("first")
+        (second / "a.txt").write_text("second")
+        shell.sync(
+            [(str(first), "."), (str(second), "."), (str(first), "lib")],
+            str(dest),
+            jobs=2
+        )
+        assert (dest / "a.txt").read_text() == "second"
+        assert (dest / "lib" / "a.txt").read_text() == "first"
+
+    def test_sync_skips_unchanged_files(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        src.mkdir()
+        (src / "a.txt").write_text("a")
+        shell.sync(str(src), str(dest))
+        (dest / "a.txt").write_text("b")
+        os.utime(
+            str(dest / "a.txt"),
+            (os.stat(str(src / "a.txt")).st_mtime,) * 2
+        )
+        shell.sync(str(src), str(dest))
+        assert (dest / "a.txt").read_text() == "b"
+        shell.sync(str(src), str(dest), checksum=True)
+        assert (dest / "a.txt").read_text() == "a"
+
+    def test_sync_keeps_other_files(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        src.mkdir()
+        dest.mkdir()
+        (src / "launch").write_text("launch")
+        (dest / "anthem").write_text("anthem")
+        shell.sync(str(src), str(dest), delete=False)
+        assert sorted(p.name for p in dest.iterdir()) == ["anthem", "launch"]
+
+
+def test_copytree_into_existing_directory(tmp_path):
+    src = tmp_path / "src"
+    dest = tmp_path / "dest"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "sub" / "b.txt").write_text("b")
+    dest.mkdir()
+    (dest / "c.txt").write_text("c")
+    shell.copytree(str(src), str(dest), hardlink=True)
+    assert sorted(p.name for p in dest.rglob("*")) == \
+        ["a.txt", "b.txt", "c.txt", "sub"]
+    assert (dest / "sub" / "b.txt").read_text() == "b"
+
+
+def test_create_tar(tmp_path):
+    src = tmp_path / "run"
+    (src / "lib").mkdir(parents=True)
+    (src / "launch").write_text("launch")
+    (src / "lib" / "anthem.lua").write_text("return {}")
+    dest = tmp_path / "anthem.tar.gz"
+    shell.create_tar(str(src), str(dest))
+    with tarfile.open(str(dest)) as archive:
+        assert sorted(archive.getnames()) == \
+            [".", "./launch", "./lib", "./lib/anthem.lua"]
+
+
+def test_create_zip(tmp_path):
+    src = tmp_path / "run"
+    (src / "lib").mkdir(parents=True)
+    (src / "launch").write_text("launch")
+    (src / "lib" / "anthem.lua").write_text("return {}")
+    dest = tmp_path / "anthem.zip"
+    shell.create_zip(str(src), str(dest))
+    with zipfile.ZipFile(str(dest)) as archive:
+        assert sorted(archive.namelist()) == \
+            ["launch", "lib/", "lib/anthem.lua"]
+
+
+def test_create_reproducible_zip_applies_level(tmp_path):
+    src = tmp_path / "run"
+    src.mkdir()
+    (src / "launch").write_bytes(b"launch" * 1000)
+    dest = tmp_path / "anthem.zip"
+    shell.create_zip(str(src), str(dest), level=9, mtime=1000)
+    with zipfile.ZipFile(str(dest)) as archive:
+        info = archive.getinfo("launch")
+        assert info.compress_size < info.file_size
+        assert archive.read(info) == b"launch" * 1000
+
+
+def test_create_tar_xz(tmp_path):
+    src = tmp_path / "run"
+    src.mkdir()
+    (src / "launch").write_text("launch")
+    dest = tmp_path / "anthem.tar.xz"
+    shell.create_tar(str(src), str(dest), compression="xz", level=1)
+    with tarfile.open(str(dest)) as archive:
+        assert archive.extractfile("./launch").read() == b"launch"
+
+
+def test_create_tar_is_reproducible(tmp_path):
+    src = tmp_path / "run"
+    src.mkdir()
+    (src / "launch").write_text("launch")
+    first = tmp_path / "first.tar.gz"
+    second = tmp_path / "second.tar.gz"
+    shell.create_tar(str(src), str(first), mtime=1000)
+    os.utime(str(src / "launch"), (2000, 2000))
+    shell.create_tar(str(src), str(second), mtime=1000)
+    assert first.read_bytes() == second.read_bytes()
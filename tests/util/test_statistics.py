@@ -0,0 +1,29 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the statistical utilities."""
+
+import pytest
+
+from couplet_composer.util.statistics import mann_whitney_u, median
+
+
+def test_median():
+    assert median([3, 1, 2]) == 2
+    assert median([4, 1, 3, 2]) == 2.5
+
+
+def test_mann_whitney_u_exact():
+    statistic, p_value = mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+    assert statistic == 0
+    assert p_value == pytest.approx(2.0 / 252)
+    statistic, p_value = mann_whitney_u([1, 3, 5], [2, 4, 6])
+    assert statistic == 3
+    assert p_value == pytest.approx(0.7)
+
+
+def test_mann_whitney_u_with_ties():
+    _, p_value = mann_whitney_u([1, 1, 1], [1, 1, 1])
+    assert p_value == 1.0
+    _, p_value = mann_whitney_u([1, 2, 2, 3] * 3, [5, 6, 6, 7] * 3)
+    assert p_value < 0.001
@@ -0,0 +1,22 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the test selection utilities."""
+
+from couplet_composer.util.test_selection import \
+    create_gtest_filter, find_test_suites
+
+
+def test_find_test_suites():
+    text = "TEST(Window, Opens)\n{\n}\n" \
+        "  TEST_F(ScriptFixture, Runs) {}\n" \
+        "TEST_P(Param, Works) {}\n" \
+        "INSTANTIATE_TEST_SUITE_P(Values, Param, testing::Values(1));\n" \
+        "// TEST(Commented, Out)\n"
+    assert find_test_suites(text) == \
+        ["Param", "ScriptFixture", "Values/Param", "Window"]
+
+
+def test_create_gtest_filter():
+    assert create_gtest_filter(["Window", "Values/Param", "Window"]) == \
+        "Values/Param*:Window.*"
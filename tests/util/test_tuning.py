@@ -0,0 +1,11 @@
+# Copyright (c) 2021 Antti Kivi
+# Licensed under the MIT License
+
+"""This module defines the tests for the CPU tuning utilities."""
+
+from couplet_composer.util.tuning import get_tune_flags
+
+
+def test_get_tune_flags():
+    assert get_tune_flags("native") == ["-march=native", "-mtune=native"]
+    assert get_tune_flags("x86-64-v3") == ["-march=x86-64-v3"]